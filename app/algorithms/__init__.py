@@ -3,5 +3,13 @@ from .base import RouteResult
 from .astar import AStarAlgorithm
 from .dijkstra import DijkstraAlgorithm
 from .greedy import GreedyAlgorithm
+from .dynamic_sssp import DynamicShortestPathTree, IncrementalSSSPEngine
+from .constrained import ConstrainedRouteSearch, RouteConstraints
+from .contraction import ContractionHierarchy, ContractionHierarchyAlgorithm, ContractionHierarchyIndex
+from .anytime import AnytimeRouteSearch
 
-__all__ = ['RouteResult', 'AStarAlgorithm', 'DijkstraAlgorithm', 'GreedyAlgorithm']
\ No newline at end of file
+__all__ = [
+    'RouteResult', 'AStarAlgorithm', 'DijkstraAlgorithm', 'GreedyAlgorithm',
+    'DynamicShortestPathTree', 'IncrementalSSSPEngine', 'ConstrainedRouteSearch', 'RouteConstraints',
+    'ContractionHierarchy', 'ContractionHierarchyAlgorithm', 'ContractionHierarchyIndex', 'AnytimeRouteSearch'
+]
\ No newline at end of file
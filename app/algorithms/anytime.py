@@ -0,0 +1,157 @@
+import heapq
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from .base import BaseAlgorithm, RouteResult
+
+DEFAULT_INITIAL_EPSILON = 3.0
+DEFAULT_EPSILON_STEP = 0.5
+DEFAULT_LANDMARK_COUNT = 8
+# Expansions between deadline / cancellation checks
+CHECK_INTERVAL = 256
+
+
+class AnytimeRouteSearch(BaseAlgorithm):
+    # ARA*: weighted A* with a shrinking inflation factor over the CSR, reusing earlier work between
+    # passes. Every completed pass yields a path within a known factor of optimal, so the search can be
+    # cut short at a deadline and still answer; run to the end it returns the optimal route
+    def __init__(self, graph_manager, initial_epsilon: Optional[float] = None, epsilon_step: Optional[float] = None,
+                 landmark_count: Optional[int] = None):
+        super().__init__(graph_manager)
+        if initial_epsilon is None:
+            initial_epsilon = float(os.environ.get("HEURISTIC_ANYTIME_EPSILON", DEFAULT_INITIAL_EPSILON))
+        if epsilon_step is None:
+            epsilon_step = float(os.environ.get("HEURISTIC_ANYTIME_EPSILON_STEP", DEFAULT_EPSILON_STEP))
+        if landmark_count is None:
+            landmark_count = int(os.environ.get("HEURISTIC_ANYTIME_LANDMARKS", DEFAULT_LANDMARK_COUNT))
+        self.initial_epsilon = max(1.0, initial_epsilon)
+        self.epsilon_step = epsilon_step
+        self.landmark_count = landmark_count
+        # Outcome of the last search: passes completed, and why it stopped early ('deadline', 'cancelled')
+        self.passes = 0
+        self.stopped: Optional[str] = None
+
+    def find_route(self, src: str, dst: str, deadline: Optional[float] = None,
+                   should_stop: Optional[Callable[[], bool]] = None) -> Optional[RouteResult]:
+        # deadline is a time.monotonic() instant; should_stop is polled alongside it
+        self.passes = 0
+        self.stopped = None
+        csr, landmarks = self.graph_manager.get_landmarks(self.landmark_count)
+        metrics_csr, edge_metrics = self.graph_manager.get_edge_metrics()
+        if metrics_csr is not csr:
+            # A new generation was published between the two reads
+            csr, landmarks = self.graph_manager.get_landmarks(self.landmark_count)
+            metrics_csr, edge_metrics = self.graph_manager.get_edge_metrics()
+            if metrics_csr is not csr:
+                return None
+
+        s, t = csr.node_index_map.get(src), csr.node_index_map.get(dst)
+        if s is None or t is None:
+            return None
+
+        def interrupted() -> bool:
+            if should_stop is not None and should_stop():
+                self.stopped = 'cancelled'
+            elif deadline is not None and time.monotonic() >= deadline:
+                self.stopped = 'deadline'
+            return self.stopped is not None
+
+        h = self._heuristic(landmarks, t)
+        ptr, adj, wts = csr.indptr.tolist(), csr.indices.tolist(), csr.weights.tolist()
+        inf = float('inf')
+        g: Dict[int, float] = {s: 0.0}
+        parent: Dict[int, int] = {s: -1}
+        parent_slot: Dict[int, int] = {s: -1}
+        closed = set()
+        incons = set()
+        eps = self.initial_epsilon
+        heap = [(eps * h[s], s)]
+        on_step = self._on_step
+        best_bound = inf
+        expanded = 0
+
+        while True:
+            # One weighted A* pass; closed nodes that improve wait in INCONS for the next pass
+            # instead of being reopened, which is what keeps later passes cheap
+            finished = True
+            while heap:
+                key, u = heap[0]
+                if u in closed or key != g[u] + eps * h[u]:
+                    heapq.heappop(heap)
+                    continue
+                if g.get(t, inf) <= key:
+                    break
+                heapq.heappop(heap)
+                closed.add(u)
+                expanded += 1
+                if on_step:
+                    self._emit_step({'algo': 'anytime', 'action': 'expand', 'node': csr.node_ids[u], 'dist': g[u], 'epsilon': eps})
+                if expanded % CHECK_INTERVAL == 0 and interrupted():
+                    finished = False
+                    break
+                gu = g[u]
+                for slot in range(ptr[u], ptr[u + 1]):
+                    v = adj[slot]
+                    nd = gu + wts[slot]
+                    if nd < g.get(v, inf):
+                        g[v] = nd
+                        parent[v] = u
+                        parent_slot[v] = slot
+                        if v in closed:
+                            incons.add(v)
+                        else:
+                            heapq.heappush(heap, (nd + eps * h[v], v))
+            self.nodes_expanded = expanded
+            if not finished:
+                break
+
+            goal = g.get(t, inf)
+            if goal == inf:
+                # Exhausted the component without reaching dst
+                return None
+            self.passes += 1
+            # Suboptimality of this pass: eps, or tighter when the frontier's lower bound says so
+            frontier = [g[v] + h[v] for _, v in heap if v not in closed] + [g[v] + h[v] for v in incons]
+            lower = min(frontier) if frontier else goal
+            best_bound = min(eps, goal / lower) if lower > 0 else 1.0
+            best_bound = max(1.0, best_bound)
+            if best_bound <= 1.0 or eps <= 1.0 or interrupted():
+                break
+
+            eps = max(1.0, eps - self.epsilon_step)
+            open_nodes = {v for _, v in heap if v not in closed} | incons
+            heap = [(g[v] + eps * h[v], v) for v in open_nodes]
+            heapq.heapify(heap)
+            closed = set()
+            incons = set()
+
+        if self.passes == 0:
+            # Stopped before the first pass finished: no path with a known bound
+            return None
+
+        nodes = [t]
+        while parent[nodes[-1]] >= 0:
+            nodes.append(parent[nodes[-1]])
+        nodes.reverse()
+        path = [csr.node_ids[i] for i in nodes]
+
+        slots = np.array([parent_slot[v] for v in nodes[1:]], dtype=np.int64)
+        self._emit_step({'algo': 'anytime', 'action': 'complete', 'path': path, 'node': dst, 'dist': g[t], 'bound': best_bound})
+
+        result = self._score_route(path, csr.weights[slots], edge_metrics[csr.edge_ids[slots]])
+        result.suboptimality_bound = best_bound
+        return result
+
+    @staticmethod
+    def _heuristic(landmarks: np.ndarray, t: int) -> List[float]:
+        # ALT lower bound max_L |d(L, t) - d(L, v)|; landmarks that cannot reach t say nothing
+        if len(landmarks) == 0:
+            return [0.0] * landmarks.shape[1]
+        rows = landmarks[np.isfinite(landmarks[:, t])]
+        if len(rows) == 0:
+            return [0.0] * landmarks.shape[1]
+        bound = np.abs(rows[:, t][:, None] - rows).max(axis=0)
+        return bound.tolist()
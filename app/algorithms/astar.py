@@ -1,11 +1,13 @@
-import networkx as nx
 from typing import Optional
 from .base import BaseAlgorithm, RouteResult
+from ..utils.lazy import lazy_import
+
+nx = lazy_import("networkx")
 
 
 class AStarAlgorithm(BaseAlgorithm):
     def find_route(self, src: str, dst: str) -> Optional[RouteResult]:
-        graph = self.graph_manager.get_graph_copy()
+        graph, csr, edge_metrics = self.graph_manager.get_route_views()
         
         if src not in graph or dst not in graph:
             return None
@@ -58,7 +60,7 @@ class AStarAlgorithm(BaseAlgorithm):
                         'g': g_score.get(dst, 0.0),
                         'f': f_score.get(dst, 0.0)
                     })
-                    return self._calculate_route_metrics(path, graph)
+                    return self._score_path(path, csr, edge_metrics)
 
                 for neighbor in graph.neighbors(current):
                     tentative_g = g_score[current] + graph[current][neighbor].get('weight', 1.0)
@@ -82,7 +84,7 @@ class AStarAlgorithm(BaseAlgorithm):
         except (nx.NetworkXNoPath, nx.NodeNotFound):
             return None
     
-    def _network_heuristic(self, u: str, v: str, graph: nx.Graph) -> float:
+    def _network_heuristic(self, u: str, v: str, graph: "nx.Graph") -> float:
         if u == v:
             return 0.0
         
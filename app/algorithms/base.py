@@ -1,6 +1,13 @@
 from typing import List, Optional, Callable, Dict, Any
 from dataclasses import dataclass
 
+import numpy as np
+
+from ..core.graph.csr_graph import CSRGraph, EDGE_METRIC_COLUMNS
+
+DELAY, JITTER, LOSS, BANDWIDTH, STABILITY = (
+    EDGE_METRIC_COLUMNS.index(column) for column in ('delay_ms', 'jitter_ms', 'loss_rate', 'bandwidth_mbps', 'stability'))
+
 
 @dataclass
 class RouteResult:
@@ -12,17 +19,28 @@ class RouteResult:
     min_bandwidth: float
     hop_count: int
     stability_score: float
+    # Set by anytime searches: the path costs at most this many times the optimum
+    suboptimality_bound: Optional[float] = None
+    # Lowest long-run stability score among the path's links
+    link_stability: float = 1.0
+
+
+# Step actions that correspond to a node being taken off the frontier
+EXPANSION_ACTIONS = frozenset(('expand', 'select'))
 
 
 class BaseAlgorithm:
     def __init__(self, graph_manager):
         self.graph_manager = graph_manager
         self._on_step: Optional[Callable[[Dict[str, Any]], None]] = None
+        self.nodes_expanded = 0
     
     def set_step_callback(self, cb: Optional[Callable[[Dict[str, Any]], None]]):
         self._on_step = cb
     
     def _emit_step(self, event: Dict[str, Any]):
+        if event.get('action') in EXPANSION_ACTIONS:
+            self.nodes_expanded += 1
         if self._on_step:
             try:
                 self._on_step(event)
@@ -32,7 +50,15 @@ class BaseAlgorithm:
     def find_route(self, src: str, dst: str) -> Optional[RouteResult]:
         raise NotImplementedError("Subclasses must implement find_route method")
     
-    def _calculate_route_metrics(self, path: List[str], graph) -> RouteResult:
+    def _score_path(self, path: List[str], csr: CSRGraph, edge_metrics: np.ndarray) -> RouteResult:
+        # Scores a path found on the graph of the generation csr and edge_metrics belong to;
+        # hops that are not edges of it are left out
+        slots = csr.path_slots(path)
+        slots = slots[slots >= 0]
+        return self._score_route(path, csr.weights[slots], edge_metrics[csr.edge_ids[slots]])
+    
+    def _score_route(self, path: List[str], weights: np.ndarray, metrics: np.ndarray) -> RouteResult:
+        # weights and metrics (EDGE_METRIC_COLUMNS rows) hold one entry per hop, gathered by the caller
         if len(path) < 2:
             return RouteResult(
                 path=path,
@@ -45,45 +71,23 @@ class BaseAlgorithm:
                 stability_score=1.0
             )
         
-        total_weight = 0.0
-        total_delay = 0.0
-        total_jitter = 0.0
-        total_loss_rate = 0.0
-        min_bandwidth = float('inf')
-        edge_count = 0
-        
-        for i in range(len(path) - 1):
-            src, dst = path[i], path[i + 1]
-            
-            if graph.has_edge(src, dst):
-                edge_data = graph[src][dst]
-                
-                total_weight += edge_data.get('weight', 1.0)
-                total_delay += edge_data.get('delay_ms', 0.0)
-                total_jitter += edge_data.get('jitter_ms', 0.0)
-                total_loss_rate += edge_data.get('loss_rate', 0.0)
-                
-                bandwidth = edge_data.get('bandwidth_mbps', 0.0)
-                if bandwidth > 0:
-                    min_bandwidth = min(min_bandwidth, bandwidth)
-                
-                edge_count += 1
-        
-        average_loss_rate = total_loss_rate / edge_count if edge_count > 0 else 0.0
-        
-        if min_bandwidth == float('inf'):
-            min_bandwidth = 0.0
+        edge_count = len(weights)
+        total_jitter = float(metrics[:, JITTER].sum()) if edge_count else 0.0
+        average_loss_rate = float(metrics[:, LOSS].mean()) if edge_count else 0.0
+        bandwidths = metrics[:, BANDWIDTH]
+        bandwidths = bandwidths[bandwidths > 0]
         
         stability_score = max(0.0, 1.0 - (total_jitter / 1000.0) - (average_loss_rate * 10.0))
         stability_score = min(1.0, stability_score)
         
         return RouteResult(
             path=path,
-            total_weight=total_weight,
-            total_delay=total_delay,
+            total_weight=float(weights.sum()),
+            total_delay=float(metrics[:, DELAY].sum()),
             total_jitter=total_jitter,
             average_loss_rate=average_loss_rate,
-            min_bandwidth=min_bandwidth,
+            min_bandwidth=float(bandwidths.min()) if len(bandwidths) else 0.0,
             hop_count=len(path) - 1,
-            stability_score=stability_score
-        )
\ No newline at end of file
+            stability_score=stability_score,
+            link_stability=float(metrics[:, STABILITY].min()) if edge_count else 1.0
+        )
@@ -0,0 +1,147 @@
+import heapq
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .base import BaseAlgorithm, RouteResult
+from ..core.graph.csr_graph import EDGE_METRIC_COLUMNS, shortest_path_tree
+
+DELAY = EDGE_METRIC_COLUMNS.index('delay_ms')
+BANDWIDTH = EDGE_METRIC_COLUMNS.index('bandwidth_mbps')
+DEFAULT_MAX_LABELS = 200000
+
+
+@dataclass(frozen=True)
+class RouteConstraints:
+    # 0 means "no limit" for every field, matching proto3 defaults
+    max_delay_ms: float = 0.0
+    min_bandwidth_mbps: float = 0.0
+    max_hops: int = 0
+
+    def is_empty(self) -> bool:
+        return self.max_delay_ms <= 0 and self.min_bandwidth_mbps <= 0 and self.max_hops <= 0
+
+
+class ConstrainedRouteSearch(BaseAlgorithm):
+    def __init__(self, graph_manager, max_labels: Optional[int] = None):
+        super().__init__(graph_manager)
+        if max_labels is None:
+            max_labels = int(os.environ.get("HEURISTIC_CONSTRAINED_MAX_LABELS", DEFAULT_MAX_LABELS))
+        self.max_labels = max_labels
+        self.label_limit_hit = False
+
+    def find_route(self, src: str, dst: str, constraints: Optional[RouteConstraints] = None) -> Optional[RouteResult]:
+        constraints = constraints or RouteConstraints()
+        self.label_limit_hit = False
+        csr, edge_metrics = self.graph_manager.get_edge_metrics()
+        s, t = csr.get_node_index(src), csr.get_node_index(dst)
+        if s is None or t is None:
+            return None
+        if s == t:
+            return self._score_route([src], np.empty(0), np.empty((0, len(EDGE_METRIC_COLUMNS))))
+
+        # Bandwidth is a per-edge filter: masked-out slots get an infinite weight and are never relaxed
+        slot_edges = csr.edge_ids
+        weights = csr.weights
+        delays = edge_metrics[slot_edges, DELAY]
+        if constraints.min_bandwidth_mbps > 0:
+            allowed = edge_metrics[slot_edges, BANDWIDTH] >= constraints.min_bandwidth_mbps
+            weights = np.where(allowed, weights, np.inf)
+            delays = np.where(allowed, delays, np.inf)
+
+        ptr, adj = csr.indptr.tolist(), csr.indices.tolist()
+        wts, dls = weights.tolist(), delays.tolist()
+
+        # Lower bounds to the destination (undirected, so a tree rooted at dst) guide and prune the search
+        cost_to_go, _ = shortest_path_tree(ptr, adj, wts, t)
+        cost_to_go = cost_to_go.tolist()
+        if cost_to_go[s] == float('inf'):
+            return None
+        delay_to_go = hops_to_go = None
+        max_delay = constraints.max_delay_ms if constraints.max_delay_ms > 0 else float('inf')
+        max_hops = constraints.max_hops if constraints.max_hops > 0 else float('inf')
+        if constraints.max_delay_ms > 0:
+            delay_to_go = shortest_path_tree(ptr, adj, dls, t)[0].tolist()
+            if delay_to_go[s] > max_delay:
+                return None
+        if constraints.max_hops > 0:
+            hops_to_go = shortest_path_tree(ptr, adj, [1.0 if w != float('inf') else w for w in wts], t)[0].tolist()
+            if hops_to_go[s] > max_hops:
+                return None
+
+        path_slots = self._label_setting(s, t, ptr, adj, wts, dls, cost_to_go, delay_to_go, hops_to_go, max_delay, max_hops)
+        if path_slots is None:
+            return None
+
+        path = [src]
+        node = s
+        for slot in path_slots:
+            node = adj[slot]
+            path.append(csr.node_ids[node])
+        slots = np.array(path_slots, dtype=np.int64)
+        return self._score_route(path, csr.weights[slots], edge_metrics[slot_edges[slots]])
+
+    def _label_setting(self, s: int, t: int, ptr: List[int], adj: List[int], wts: List[float], dls: List[float],
+                       cost_to_go: List[float], delay_to_go: Optional[List[float]], hops_to_go: Optional[List[float]],
+                       max_delay: float, max_hops: float) -> Optional[List[int]]:
+        inf = float('inf')
+        track_delay = delay_to_go is not None
+        track_hops = hops_to_go is not None
+
+        # Label: (cost, delay, hops, node, parent label id, slot used to reach node)
+        labels: List[Tuple[float, float, int, int, int, int]] = [(0.0, 0.0, 0, s, -1, -1)]
+        # Non-dominated label ids per node; a dominated label is dropped here and skipped when popped
+        frontier: Dict[int, List[int]] = {s: [0]}
+        alive = [True]
+        heap = [(cost_to_go[s], 0)]
+
+        while heap:
+            _, label_id = heapq.heappop(heap)
+            if not alive[label_id]:
+                continue
+            cost, delay, hops, u, _, _ = labels[label_id]
+            self.nodes_expanded += 1
+            if u == t:
+                # Costs are popped in order of cost + an admissible bound, so the first feasible arrival is optimal
+                slots = []
+                while labels[label_id][4] >= 0:
+                    slots.append(labels[label_id][5])
+                    label_id = labels[label_id][4]
+                slots.reverse()
+                return slots
+
+            for slot in range(ptr[u], ptr[u + 1]):
+                w = wts[slot]
+                if w == inf:
+                    continue
+                v = adj[slot]
+                new_cost = cost + w
+                new_delay = delay + dls[slot] if track_delay else 0.0
+                new_hops = hops + 1 if track_hops else 0
+                if track_delay and new_delay + delay_to_go[v] > max_delay:
+                    continue
+                if track_hops and new_hops + hops_to_go[v] > max_hops:
+                    continue
+
+                existing = frontier.setdefault(v, [])
+                if any(labels[i][0] <= new_cost and labels[i][1] <= new_delay and labels[i][2] <= new_hops for i in existing):
+                    continue
+                # The new label may in turn dominate labels already queued at v
+                survivors = []
+                for i in existing:
+                    if new_cost <= labels[i][0] and new_delay <= labels[i][1] and new_hops <= labels[i][2]:
+                        alive[i] = False
+                    else:
+                        survivors.append(i)
+                survivors.append(len(labels))
+                frontier[v] = survivors
+
+                labels.append((new_cost, new_delay, new_hops, v, label_id, slot))
+                alive.append(True)
+                heapq.heappush(heap, (new_cost + cost_to_go[v], len(labels) - 1))
+                if len(labels) > self.max_labels:
+                    self.label_limit_hit = True
+                    return None
+        return None
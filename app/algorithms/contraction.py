@@ -0,0 +1,290 @@
+import copy
+import heapq
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .base import BaseAlgorithm, RouteResult
+
+DEFAULT_CORE_DEGREE = 8
+
+
+class ContractionHierarchy:
+    # Customizable contraction hierarchy: the elimination order, shortcut arcs and their
+    # triangles depend only on topology; weights are filled in by customized()
+    def __init__(self, node_ids: List[str], edge_endpoints: np.ndarray, core_degree: int = DEFAULT_CORE_DEGREE):
+        start = time.perf_counter()
+        self.node_ids = list(node_ids)
+        self.node_index = {node: i for i, node in enumerate(self.node_ids)}
+        self.edge_endpoints = edge_endpoints
+        n = len(self.node_ids)
+
+        neighbors: List[set] = [set() for _ in range(n)]
+        for a, b in edge_endpoints.tolist():
+            if a != b:
+                neighbors[a].add(b)
+                neighbors[b].add(a)
+
+        # Greedy minimum-degree elimination; contracting v turns its remaining neighbours into a clique.
+        # Once every remaining node has more than core_degree neighbours the fill-in would explode, so the
+        # rest stays uncontracted as a core that queries search exhaustively
+        rank = [-1] * n
+        up: List[List[int]] = [[] for _ in range(n)]
+        heap = [(len(neighbors[v]), v) for v in range(n)]
+        heapq.heapify(heap)
+        order = 0
+        while heap:
+            degree, v = heapq.heappop(heap)
+            if rank[v] >= 0 or degree != len(neighbors[v]):
+                continue
+            if degree > core_degree:
+                break
+            rank[v] = order
+            order += 1
+            remaining = neighbors[v]
+            up[v] = list(remaining)
+            for u in remaining:
+                adjacent = neighbors[u]
+                adjacent.discard(v)
+                adjacent.update(remaining)
+                adjacent.discard(u)
+                heapq.heappush(heap, (len(adjacent), u))
+            neighbors[v] = set()
+
+        core = [v for v in range(n) if rank[v] < 0]
+        for v in core:
+            rank[v] = order
+            order += 1
+        for v in core:
+            up[v] = [u for u in neighbors[v] if rank[u] > rank[v]]
+        self.rank = rank
+        self.core_size = len(core)
+
+        # Upward arcs grouped by their lower endpoint (tail); arc ids index every per-arc list
+        self.arc_index: Dict[Tuple[int, int], int] = {}
+        self.up_ptr = [0] * (n + 1)
+        self.up_head: List[int] = []
+        self.arc_tail: List[int] = []
+        for v in range(n):
+            heads = sorted(up[v], key=rank.__getitem__)
+            for u in heads:
+                self.arc_index[(v, u)] = len(self.up_head)
+                self.up_head.append(u)
+                self.arc_tail.append(v)
+            self.up_ptr[v + 1] = len(self.up_head)
+            up[v] = heads
+
+        # Core nodes are searched in both directions over every core arc
+        self.core_links: Dict[int, List[Tuple[int, int]]] = {v: [] for v in core}
+        for v in core:
+            for arc in range(self.up_ptr[v], self.up_ptr[v + 1]):
+                u = self.up_head[arc]
+                self.core_links[v].append((u, arc))
+                self.core_links[u].append((v, arc))
+
+        # Lower triangles v < u < w (by rank) of contracted v: arcs v-u and v-w bound arc u-w. Ordered by
+        # v's rank so every arc is final before it is used as a triangle side
+        triangles: List[int] = []
+        for v in sorted(range(n), key=rank.__getitem__):
+            if v in self.core_links:
+                continue
+            heads = up[v]
+            base = self.up_ptr[v]
+            for i in range(len(heads)):
+                for j in range(i + 1, len(heads)):
+                    triangles.extend((base + i, base + j, self.arc_index[(heads[i], heads[j])]))
+        self.triangles = np.array(triangles, dtype=np.int32).reshape(-1, 3)
+
+        self.edge_arc = [self._arc(a, b) for a, b in edge_endpoints.tolist()]
+        self.arc_weights: List[float] = []
+        self.arc_via: List[int] = []
+        self.arc_edge: List[int] = []
+        self.edge_weights: Optional[np.ndarray] = None
+        self.edge_metrics: Optional[np.ndarray] = None
+        self.structure_ms = (time.perf_counter() - start) * 1000.0
+        self.customize_ms = 0.0
+        self.version = -1
+
+    @property
+    def arc_count(self) -> int:
+        return len(self.up_head)
+
+    @property
+    def shortcut_count(self) -> int:
+        return self.arc_count - len({arc for arc in self.edge_arc if arc >= 0})
+
+    def matches(self, node_ids: List[str], edge_endpoints: np.ndarray) -> bool:
+        return node_ids == self.node_ids and np.array_equal(edge_endpoints, self.edge_endpoints)
+
+    def customized(self, edge_weights: np.ndarray, edge_metrics: np.ndarray, version: int) -> 'ContractionHierarchy':
+        # Returns a copy sharing the topology, so queries on the previous weights are never disturbed
+        start = time.perf_counter()
+        weights = [float('inf')] * self.arc_count
+        via = [-1] * self.arc_count
+        arc_edge = [-1] * self.arc_count
+        for edge, (arc, w) in enumerate(zip(self.edge_arc, edge_weights.tolist())):
+            if arc >= 0 and w < weights[arc]:
+                weights[arc] = w
+                arc_edge[arc] = edge
+
+        tails = self.arc_tail
+        for vu, vw, uw in self.triangles.tolist():
+            candidate = weights[vu] + weights[vw]
+            if candidate < weights[uw]:
+                weights[uw] = candidate
+                via[uw] = tails[vu]
+
+        hierarchy = copy.copy(self)
+        hierarchy.arc_weights = weights
+        hierarchy.arc_via = via
+        hierarchy.arc_edge = arc_edge
+        hierarchy.edge_weights = edge_weights
+        hierarchy.edge_metrics = edge_metrics
+        hierarchy.version = version
+        hierarchy.customize_ms = (time.perf_counter() - start) * 1000.0
+        return hierarchy
+
+    def query(self, s: int, t: int) -> Tuple[float, List[int], int]:
+        if s == t:
+            return 0.0, [s], 0
+        inf = float('inf')
+        ptr, head, weights, core_links = self.up_ptr, self.up_head, self.arc_weights, self.core_links
+        dist = ({s: 0.0}, {t: 0.0})
+        parent = ({s: -1}, {t: -1})
+        heaps = ([(0.0, s)], [(0.0, t)])
+        settled = (set(), set())
+        best = inf
+        meet = -1
+        settled_count = 0
+
+        # Both searches climb in rank until they reach the core, which they search like plain Dijkstra;
+        # either way some vertex of the shortest path is settled by both
+        while heaps[0] or heaps[1]:
+            for side in (0, 1):
+                heap = heaps[side]
+                if not heap:
+                    continue
+                d, u = heapq.heappop(heap)
+                if d >= best:
+                    heap.clear()
+                    continue
+                if u in settled[side]:
+                    continue
+                settled[side].add(u)
+                settled_count += 1
+                other = dist[1 - side].get(u)
+                if other is not None and d + other < best:
+                    best = d + other
+                    meet = u
+                own, links = dist[side], parent[side]
+                arcs = core_links[u] if u in core_links else [(head[arc], arc) for arc in range(ptr[u], ptr[u + 1])]
+                for v, arc in arcs:
+                    nd = d + weights[arc]
+                    if nd < own.get(v, inf):
+                        own[v] = nd
+                        links[v] = u
+                        heapq.heappush(heap, (nd, v))
+        if meet < 0:
+            return inf, [], settled_count
+
+        forward = self._descend(meet, parent[0])
+        backward = self._descend(meet, parent[1])
+        return best, forward[::-1] + backward[1:], settled_count
+
+    def path_edges(self, path: List[int]) -> List[int]:
+        # Consecutive nodes of an unpacked path are joined by unshortcut arcs, i.e. original edges
+        return [self.arc_edge[self._arc(a, b)] for a, b in zip(path, path[1:])]
+
+    def _descend(self, node: int, parent: Dict[int, int]) -> List[int]:
+        # From the meeting vertex back to the search root, expanding shortcuts on the way
+        path = [node]
+        previous = parent[node]
+        while previous >= 0:
+            path.extend(self._unpack(path[-1], previous))
+            previous = parent[previous]
+        return path
+
+    def _unpack(self, a: int, b: int) -> List[int]:
+        # Nodes after a on the original path from a to b, where a and b share an arc; shortcuts
+        # are only ever created through a lower contracted node, so the recursion bottoms out
+        via = self.arc_via[self._arc(a, b)]
+        if via < 0:
+            return [b]
+        return self._unpack(a, via) + self._unpack(via, b)
+
+    def _arc(self, a: int, b: int) -> int:
+        if a == b:
+            return -1
+        low, high = (a, b) if self.rank[a] < self.rank[b] else (b, a)
+        return self.arc_index[(low, high)]
+
+
+class ContractionHierarchyIndex:
+    # The hierarchy for the latest graph version, shared by every search that uses it
+    def __init__(self, graph_manager, core_degree: Optional[int] = None):
+        self.graph_manager = graph_manager
+        if core_degree is None:
+            core_degree = int(os.environ.get("HEURISTIC_CH_CORE_DEGREE", DEFAULT_CORE_DEGREE))
+        self.core_degree = core_degree
+        self.hierarchy: Optional[ContractionHierarchy] = None
+        self.rebuilds = 0
+        self.customizations = 0
+        self._lock = threading.Lock()
+
+    def prepare(self) -> ContractionHierarchy:
+        csr, edge_metrics = self.graph_manager.get_edge_metrics()
+        with self._lock:
+            hierarchy = self.hierarchy
+            if hierarchy is not None and hierarchy.version == csr.version:
+                return hierarchy
+            if hierarchy is None or not hierarchy.matches(csr.node_ids, csr.edge_endpoints):
+                hierarchy = ContractionHierarchy(csr.node_ids, csr.edge_endpoints, self.core_degree)
+                self.rebuilds += 1
+            else:
+                # Same topology: only the arc weights need recomputing
+                self.customizations += 1
+            edge_weights = np.empty(csr.num_edges, dtype=np.float64)
+            edge_weights[csr.edge_ids] = csr.weights
+            self.hierarchy = hierarchy.customized(edge_weights, edge_metrics, csr.version)
+            return self.hierarchy
+
+    def get_stats(self) -> Dict[str, float]:
+        hierarchy = self.hierarchy
+        stats = {'rebuilds': self.rebuilds, 'customizations': self.customizations}
+        if hierarchy is not None:
+            stats.update({
+                'version': hierarchy.version,
+                'nodes': len(hierarchy.node_ids),
+                'arcs': hierarchy.arc_count,
+                'shortcuts': hierarchy.shortcut_count,
+                'core': hierarchy.core_size,
+                'triangles': len(hierarchy.triangles),
+                'structure_ms': hierarchy.structure_ms,
+                'customize_ms': hierarchy.customize_ms
+            })
+        return stats
+
+
+class ContractionHierarchyAlgorithm(BaseAlgorithm):
+    def __init__(self, graph_manager, index: Optional[ContractionHierarchyIndex] = None):
+        super().__init__(graph_manager)
+        self.index = index or ContractionHierarchyIndex(graph_manager)
+
+    def find_route(self, src: str, dst: str) -> Optional[RouteResult]:
+        hierarchy = self.index.prepare()
+        s, t = hierarchy.node_index.get(src), hierarchy.node_index.get(dst)
+        if s is None or t is None:
+            return None
+
+        cost, nodes, settled = hierarchy.query(s, t)
+        self.nodes_expanded = settled
+        if not nodes:
+            return None
+
+        path = [hierarchy.node_ids[i] for i in nodes]
+        edges = np.array(hierarchy.path_edges(nodes), dtype=np.int64)
+        self._emit_step({'algo': 'ch', 'action': 'complete', 'path': path, 'node': dst, 'dist': cost})
+        return self._score_route(path, hierarchy.edge_weights[edges], hierarchy.edge_metrics[edges])
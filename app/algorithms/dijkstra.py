@@ -1,11 +1,13 @@
-import networkx as nx
 from typing import Optional
 from .base import BaseAlgorithm, RouteResult
+from ..utils.lazy import lazy_import
+
+nx = lazy_import("networkx")
 
 
 class DijkstraAlgorithm(BaseAlgorithm):
     def find_route(self, src: str, dst: str) -> Optional[RouteResult]:
-        graph = self.graph_manager.get_graph_copy()
+        graph, csr, edge_metrics = self.graph_manager.get_route_views()
         
         if src not in graph or dst not in graph:
             return None
@@ -55,7 +57,7 @@ class DijkstraAlgorithm(BaseAlgorithm):
                 'node': dst,
                 'dist': dist.get(dst, 0.0)
             })
-            return self._calculate_route_metrics(path, graph)
+            return self._score_path(path, csr, edge_metrics)
             
         except (nx.NetworkXNoPath, nx.NodeNotFound):
             return None
\ No newline at end of file
@@ -0,0 +1,240 @@
+import heapq
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+DEFAULT_MAX_TREES = 32
+DEFAULT_HOT_THRESHOLD = 3
+
+EdgeKey = Tuple[str, str]
+
+
+class CSRAdjacency:
+    def __init__(self, csr):
+        self.version = csr.version
+        self.node_ids = csr.node_ids
+        self.node_index_map = csr.node_index_map
+        self.indptr = csr.indptr.tolist()
+        self.indices = csr.indices.tolist()
+        self.weights = csr.weights.tolist()
+
+    def neighbors(self, node_id: str):
+        i = self.node_index_map.get(node_id)
+        if i is None:
+            return
+        node_ids, indices, weights = self.node_ids, self.indices, self.weights
+        for slot in range(self.indptr[i], self.indptr[i + 1]):
+            yield node_ids[indices[slot]], weights[slot]
+
+
+class DynamicShortestPathTree:
+    def __init__(self, source: str):
+        self.source = source
+        self.dist: Dict[str, float] = {}
+        self.parent: Dict[str, Optional[str]] = {}
+        self.children: Dict[str, Set[str]] = {}
+
+    def build(self, adjacency: CSRAdjacency):
+        self.dist = {self.source: 0.0}
+        self.parent = {self.source: None}
+        self.children = {self.source: set()}
+        self._propagate(adjacency, [(0.0, self.source)])
+
+    def repair(self, adjacency: CSRAdjacency, changes: List[Tuple[str, str, float, float]], removed_nodes: Set[str]) -> int:
+        # Phase 1: every subtree hanging below an edge that got more expensive (or vanished) loses its labels
+        affected: Set[str] = set()
+        for node in removed_nodes:
+            if node in self.dist:
+                affected.update(self._subtree(node))
+        for u, v, old_w, new_w in changes:
+            if new_w <= old_w:
+                continue
+            if self.parent.get(v) == u:
+                affected.update(self._subtree(v))
+            elif self.parent.get(u) == v:
+                affected.update(self._subtree(u))
+
+        for node in affected:
+            self._detach(node)
+        for node in removed_nodes:
+            self.dist.pop(node, None)
+            self.parent.pop(node, None)
+            self.children.pop(node, None)
+
+        heap = []
+        # Re-seed affected nodes from their unaffected neighbours, whose labels are still valid upper bounds
+        for node in affected:
+            if node in removed_nodes:
+                continue
+            best, best_parent = float('inf'), None
+            for neighbor, weight in adjacency.neighbors(node):
+                d = self.dist.get(neighbor)
+                if d is not None and d + weight < best:
+                    best, best_parent = d + weight, neighbor
+            if best_parent is not None:
+                self._attach(node, best_parent, best)
+                heap.append((best, node))
+
+        # Phase 2: edges that got cheaper (or appeared) can only shorten paths through them
+        for u, v, old_w, new_w in changes:
+            if new_w >= old_w:
+                continue
+            for a, b in ((u, v), (v, u)):
+                da = self.dist.get(a)
+                if da is not None and da + new_w < self.dist.get(b, float('inf')):
+                    self._attach(b, a, da + new_w)
+                    heap.append((da + new_w, b))
+
+        heapq.heapify(heap)
+        return len(affected) + self._propagate(adjacency, heap)
+
+    def path_to(self, node: str) -> Optional[List[str]]:
+        if node not in self.dist:
+            return None
+        path = [node]
+        while self.parent.get(node) is not None:
+            node = self.parent[node]
+            path.append(node)
+        path.reverse()
+        return path
+
+    def _propagate(self, adjacency: CSRAdjacency, heap: list) -> int:
+        dist = self.dist
+        touched = 0
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist.get(u, float('inf')):
+                continue
+            touched += 1
+            for v, weight in adjacency.neighbors(u):
+                nd = d + weight
+                if nd < dist.get(v, float('inf')):
+                    self._attach(v, u, nd)
+                    heapq.heappush(heap, (nd, v))
+        return touched
+
+    def _attach(self, node: str, parent: str, dist: float):
+        old_parent = self.parent.get(node)
+        if old_parent is not None:
+            self.children[old_parent].discard(node)
+        self.parent[node] = parent
+        self.dist[node] = dist
+        self.children.setdefault(parent, set()).add(node)
+        self.children.setdefault(node, set())
+
+    def _detach(self, node: str):
+        old_parent = self.parent.pop(node, None)
+        if old_parent is not None and old_parent in self.children:
+            self.children[old_parent].discard(node)
+        self.dist.pop(node, None)
+
+    def _subtree(self, root: str) -> Set[str]:
+        nodes = set()
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node in nodes:
+                continue
+            nodes.add(node)
+            stack.extend(self.children.get(node, ()))
+        return nodes
+
+
+class IncrementalSSSPEngine:
+    def __init__(self, graph_manager, max_trees: Optional[int] = None, hot_threshold: Optional[int] = None):
+        self.graph_manager = graph_manager
+        if max_trees is None:
+            max_trees = int(os.environ.get("HEURISTIC_SSSP_MAX_TREES", DEFAULT_MAX_TREES))
+        if hot_threshold is None:
+            hot_threshold = int(os.environ.get("HEURISTIC_SSSP_HOT_THRESHOLD", DEFAULT_HOT_THRESHOLD))
+        self.max_trees = max_trees
+        self.hot_threshold = hot_threshold
+
+        self.trees: "OrderedDict[str, DynamicShortestPathTree]" = OrderedDict()
+        self._query_counts: Dict[str, int] = {}
+        self._adjacency: Optional[CSRAdjacency] = None
+        self._edge_states: Dict[EdgeKey, Tuple[float, bool]] = {}
+        self.version: Optional[int] = None
+
+        self.stats = {'builds': 0, 'repairs': 0, 'repaired_nodes': 0, 'tree_hits': 0}
+        self._lock = threading.RLock()
+
+    def get_path(self, src: str, dst: str) -> Optional[List[str]]:
+        if self.max_trees <= 0:
+            return None
+
+        with self._lock:
+            self.sync()
+            tree = self.trees.get(src)
+            if tree is None:
+                count = self._query_counts.get(src, 0) + 1
+                self._query_counts[src] = count
+                if count < self.hot_threshold or src not in self._adjacency.node_index_map:
+                    return None
+                tree = self._add_tree(src)
+
+            self.trees.move_to_end(src)
+            self.stats['tree_hits'] += 1
+            return tree.path_to(dst)
+
+    def sync(self):
+        with self._lock:
+            # One generation for the version, CSR and edge states: reading them separately could
+            # repair a tree against one graph and stamp it with another's version
+            generation = self.graph_manager.get_generation()
+            version = generation.version
+            if version == self.version:
+                return
+
+            adjacency = CSRAdjacency(self.graph_manager.get_csr(generation=generation))
+            edge_states = self.graph_manager.get_edge_states(generation=generation)
+
+            if self.trees:
+                changes, removed_nodes = self._diff(self._edge_states, edge_states, adjacency)
+                for source in list(self.trees):
+                    if source in removed_nodes or source not in adjacency.node_index_map:
+                        del self.trees[source]
+                        continue
+                    if changes or removed_nodes:
+                        self.stats['repaired_nodes'] += self.trees[source].repair(adjacency, changes, removed_nodes)
+                        self.stats['repairs'] += 1
+
+            # Popularity is per graph version so stale hot sources age out
+            self._query_counts.clear()
+            self._adjacency = adjacency
+            self._edge_states = edge_states
+            self.version = version
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['trees'] = len(self.trees)
+            return stats
+
+    def _add_tree(self, src: str) -> DynamicShortestPathTree:
+        tree = DynamicShortestPathTree(src)
+        tree.build(self._adjacency)
+        self.trees[src] = tree
+        self.stats['builds'] += 1
+
+        while len(self.trees) > self.max_trees:
+            self.trees.popitem(last=False)
+        return tree
+
+    def _diff(self, old_states, new_states, adjacency: CSRAdjacency):
+        inf = float('inf')
+        changes = []
+        for key, (weight, _available) in new_states.items():
+            previous = old_states.get(key)
+            old_weight = previous[0] if previous is not None else inf
+            if old_weight != weight:
+                changes.append((key[0], key[1], old_weight, weight))
+        for key in old_states.keys() - new_states.keys():
+            changes.append((key[0], key[1], old_states[key][0], inf))
+
+        removed_nodes = {
+            node for node in (self._adjacency.node_ids if self._adjacency else ())
+            if node not in adjacency.node_index_map
+        }
+        return changes, removed_nodes
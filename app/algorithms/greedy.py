@@ -4,7 +4,7 @@ from .base import BaseAlgorithm, RouteResult
 
 class GreedyAlgorithm(BaseAlgorithm):
     def find_route(self, src: str, dst: str) -> Optional[RouteResult]:
-        graph = self.graph_manager.get_graph_copy()
+        graph, csr, edge_metrics = self.graph_manager.get_route_views()
         
         if src not in graph or dst not in graph:
             return None
@@ -52,7 +52,7 @@ class GreedyAlgorithm(BaseAlgorithm):
             'path': path,
             'node': dst
         })
-        return self._calculate_route_metrics(path, graph)
+        return self._score_path(path, csr, edge_metrics)
     
     def _simple_heuristic(self, u: str, v: str, graph) -> float:
         if u == v:
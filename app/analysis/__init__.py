@@ -1,10 +1,10 @@
 # Analysis package for network stability and metrics
 from .metrics import MetricSnapshot, StabilityMetrics, MetricsCalculator
-from .history_manager import MetricsHistoryManager
+from .history_manager import MetricsHistoryManager, HistoryColumns
 from .stability_calculator import StabilityCalculator
 from .stability_analyzer import StabilityAnalyzer
 
 __all__ = [
     'MetricSnapshot', 'StabilityMetrics', 'MetricsCalculator',
-    'MetricsHistoryManager', 'StabilityCalculator', 'StabilityAnalyzer'
+    'MetricsHistoryManager', 'HistoryColumns', 'StabilityCalculator', 'StabilityAnalyzer'
 ]
\ No newline at end of file
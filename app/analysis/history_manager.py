@@ -1,15 +1,126 @@
+import os
 import threading
-from typing import Dict
-from datetime import datetime
-from collections import defaultdict, deque
+from typing import Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from collections import OrderedDict, defaultdict, deque
 
-from .metrics import MetricSnapshot
+import numpy as np
+
+from .metrics import LINK_METRIC_WEIGHTS, MetricSnapshot
+from .rollups import DEFAULT_TIERS, RollupSeries, RollupSummary, parse_tiers, summarize
+
+NODE_SERIES = 0
+LINK_SERIES = 1
+
+DEFAULT_TTL_S = 3600.0
+DEFAULT_MAX_MISSED_VERSIONS = 200
+DEFAULT_MAX_ENTITIES = 100000
+
+# Rough CPython footprint, measured with tracemalloc: a MetricSnapshot with its datetime and float,
+# a deque with its first block and dict slot, and an entity's per-kind dicts
+SAMPLE_BYTES = 170
+SERIES_BYTES = 700
+ENTITY_BYTES = 600
+
+EntityKey = Tuple[int, str]
+
+
+@dataclass
+class HistoryColumns:
+    # One row per (entity, metric) series; series i owns values[offsets[i]:offsets[i + 1]]
+    kinds: np.ndarray
+    entities: np.ndarray
+    metrics: np.ndarray
+    offsets: np.ndarray
+    timestamps: np.ndarray
+    values: np.ndarray
+    ema: np.ndarray
+    # Rollups of every series, absent when saved without tiers: series i owns
+    # rollup_closed[rollup_offsets[i]:rollup_offsets[i + 1]] (empty if it has no closed bucket), one
+    # head and size per tier, and one open bucket per tier with NaN rows where none is open
+    rollup_tiers: Optional[np.ndarray] = None
+    rollup_offsets: Optional[np.ndarray] = None
+    rollup_closed: Optional[np.ndarray] = None
+    rollup_heads: Optional[np.ndarray] = None
+    rollup_sizes: Optional[np.ndarray] = None
+    rollup_open: Optional[np.ndarray] = None
+
+
+class WindowMatrix:
+    # The raw windows of one entity kind as a single (rows, metrics, window) ring array, so scoring
+    # thousands of entities is a few array operations rather than a walk over their deques
+    def __init__(self, metrics: List[str], window: int, capacity: int = 1024):
+        self.columns = {name: j for j, name in enumerate(metrics)}
+        self.window = window
+        self.values = np.zeros((capacity, len(metrics), window), dtype=np.float64)
+        # Samples ever written per series; the next one goes to slot total % window
+        self.totals = np.zeros((capacity, len(metrics)), dtype=np.int64)
+        self.rows: Dict[str, int] = {}
+        self._free: List[int] = []
+    
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + self.totals.nbytes
+    
+    def add(self, entity_id: str, metric_name: str, value: float):
+        column = self.columns.get(metric_name)
+        if column is None:
+            return
+        row = self.rows.get(entity_id)
+        if row is None:
+            row = self._allocate(entity_id)
+        total = self.totals[row, column]
+        self.values[row, column, total % self.window] = value
+        self.totals[row, column] = total + 1
+    
+    def remove(self, entity_id: str):
+        row = self.rows.pop(entity_id, None)
+        if row is not None:
+            # Unfilled slots are kept at zero, so sums over a whole window need no mask
+            self.values[row] = 0.0
+            self.totals[row] = 0
+            self._free.append(row)
+    
+    def windows(self, entity_ids: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # (values, starts, counts) for the given entities: each window's ring, the slot of its oldest
+        # sample and how many slots are filled. Unknown entities get empty (all-zero) windows
+        rows = np.array([self.rows.get(entity_id, -1) for entity_id in entity_ids], dtype=np.int64)
+        known = rows >= 0
+        rows = np.where(known, rows, 0)
+        values = self.values[rows]
+        values[~known] = 0.0
+        totals = np.where(known[:, None], self.totals[rows], 0)
+        starts = np.where(totals > self.window, totals % self.window, 0)
+        return values, starts, np.minimum(totals, self.window)
+    
+    def _allocate(self, entity_id: str) -> int:
+        if not self._free:
+            capacity = len(self.values)
+            self.values = np.concatenate((self.values, np.zeros_like(self.values)))
+            self.totals = np.concatenate((self.totals, np.zeros_like(self.totals)))
+            self._free = list(range(2 * capacity - 1, capacity - 1, -1))
+        row = self._free.pop()
+        self.rows[entity_id] = row
+        return row
 
 
 class MetricsHistoryManager:
-    def __init__(self, history_window: int = 50, smoothing_factor: float = 0.3):
+    def __init__(self, history_window: int = 50, smoothing_factor: float = 0.3, ttl_s: Optional[float] = None,
+                 max_missed_versions: Optional[int] = None, max_entities: Optional[int] = None, tiers: Optional[str] = None):
         self.history_window = history_window
         self.smoothing_factor = smoothing_factor
+        # Entities that left the topology (drones, handsets) are forgotten once they have been absent
+        # for ttl_s of snapshot time or max_missed_versions snapshots; max_entities caps the rest (LRU)
+        if ttl_s is None:
+            ttl_s = float(os.environ.get("HEURISTIC_HISTORY_TTL_S", DEFAULT_TTL_S))
+        if max_missed_versions is None:
+            max_missed_versions = int(os.environ.get("HEURISTIC_HISTORY_MAX_MISSED_VERSIONS", DEFAULT_MAX_MISSED_VERSIONS))
+        if max_entities is None:
+            max_entities = int(os.environ.get("HEURISTIC_HISTORY_MAX_ENTITIES", DEFAULT_MAX_ENTITIES))
+        self.ttl_s = ttl_s
+        self.max_missed_versions = max_missed_versions
+        self.max_entities = max_entities
         
         self.node_metrics_history: Dict[str, Dict[str, deque]] = defaultdict(
             lambda: defaultdict(lambda: deque(maxlen=history_window))
@@ -22,12 +133,37 @@ class MetricsHistoryManager:
         self.node_ema: Dict[str, Dict[str, float]] = defaultdict(dict)
         self.link_ema: Dict[str, Dict[str, float]] = defaultdict(dict)
         
+        # Downsampled tiers behind the raw window, e.g. "60:120,900:96" = 2 h of 1-minute and
+        # 24 h of 15-minute buckets per series
+        if tiers is None:
+            tiers = os.environ.get("HEURISTIC_HISTORY_TIERS", DEFAULT_TIERS)
+        self.tiers = parse_tiers(tiers)
+        self.node_rollups: Dict[str, Dict[str, RollupSeries]] = defaultdict(dict)
+        self.link_rollups: Dict[str, Dict[str, RollupSeries]] = defaultdict(dict)
+        
+        # Link windows again in array form, for scoring every link of a snapshot at once
+        self.link_windows = WindowMatrix(list(LINK_METRIC_WEIGHTS), history_window)
+        
+        # Series restored from a checkpoint are only materialised when an entity is first touched
+        self._pending: Optional[HistoryColumns] = None
+        self._pending_nodes: Dict[str, List[int]] = {}
+        self._pending_links: Dict[str, List[int]] = {}
+        self._pending_rollups = False
+        
+        # (version, snapshot time) each entity was last updated at, least recently updated first
+        self._last_seen: "OrderedDict[EntityKey, Tuple[int, float]]" = OrderedDict()
+        self._touched: Set[EntityKey] = set()
+        self.stats = {'evicted_ttl': 0, 'evicted_missed': 0, 'evicted_lru': 0}
+        
         self._lock = threading.RLock()
     
     def add_node_metric(self, node_id: str, metric_name: str, value: float, timestamp: datetime):
         with self._lock:
+            self._hydrate_node(node_id)
+            self._touched.add((NODE_SERIES, node_id))
             snapshot = MetricSnapshot(timestamp, value)
             self.node_metrics_history[node_id][metric_name].append(snapshot)
+            self._add_rollup(self.node_rollups, node_id, metric_name, timestamp, value)
             
             if metric_name not in self.node_ema[node_id]:
                 self.node_ema[node_id][metric_name] = value
@@ -39,8 +175,12 @@ class MetricsHistoryManager:
     
     def add_link_metric(self, link_id: str, metric_name: str, value: float, timestamp: datetime):
         with self._lock:
+            self._hydrate_link(link_id)
+            self._touched.add((LINK_SERIES, link_id))
             snapshot = MetricSnapshot(timestamp, value)
             self.link_metrics_history[link_id][metric_name].append(snapshot)
+            self._add_rollup(self.link_rollups, link_id, metric_name, timestamp, value)
+            self.link_windows.add(link_id, metric_name, value)
             
             if metric_name not in self.link_ema[link_id]:
                 self.link_ema[link_id][metric_name] = value
@@ -52,40 +192,296 @@ class MetricsHistoryManager:
     
     def get_node_history(self, node_id: str, metric_name: str) -> deque:
         with self._lock:
+            self._hydrate_node(node_id)
             return self.node_metrics_history.get(node_id, {}).get(metric_name, deque())
     
     def get_link_history(self, link_id: str, metric_name: str) -> deque:
         with self._lock:
+            self._hydrate_link(link_id)
             return self.link_metrics_history.get(link_id, {}).get(metric_name, deque())
     
+    def get_node_summary(self, node_id: str, metric_name: str, horizon_s: float) -> Optional[RollupSummary]:
+        with self._lock:
+            self._hydrate_node(node_id)
+            return self._summary(self.node_metrics_history, self.node_rollups, node_id, metric_name, horizon_s)
+    
+    def get_link_summary(self, link_id: str, metric_name: str, horizon_s: float) -> Optional[RollupSummary]:
+        with self._lock:
+            self._hydrate_link(link_id)
+            return self._summary(self.link_metrics_history, self.link_rollups, link_id, metric_name, horizon_s)
+    
+    def get_link_windows(self, link_ids: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        with self._lock:
+            if self._pending_links:
+                for link_id in link_ids:
+                    self._hydrate_link(link_id)
+            return self.link_windows.windows(link_ids)
+    
     def get_node_ema(self, node_id: str, metric_name: str) -> float:
         with self._lock:
+            self._hydrate_node(node_id)
             return self.node_ema.get(node_id, {}).get(metric_name, 0.0)
     
     def has_node_metric(self, node_id: str, metric_name: str) -> bool:
         with self._lock:
+            self._hydrate_node(node_id)
             return (node_id in self.node_metrics_history and 
                     metric_name in self.node_metrics_history[node_id] and
                     len(self.node_metrics_history[node_id][metric_name]) >= 2)
     
     def has_link_metric(self, link_id: str, metric_name: str) -> bool:
         with self._lock:
+            self._hydrate_link(link_id)
             return (link_id in self.link_metrics_history and 
                     metric_name in self.link_metrics_history[link_id] and
                     len(self.link_metrics_history[link_id][metric_name]) >= 2)
     
     def get_all_node_ids(self) -> list:
         with self._lock:
-            return list(self.node_metrics_history.keys())
+            return list(self.node_metrics_history.keys()) + [n for n in self._pending_nodes if n not in self.node_metrics_history]
     
     def get_all_link_ids(self) -> list:
         with self._lock:
-            return list(self.link_metrics_history.keys())
+            return list(self.link_metrics_history.keys()) + [l for l in self._pending_links if l not in self.link_metrics_history]
     
     def get_node_metric_names(self, node_id: str) -> list:
         with self._lock:
+            self._hydrate_node(node_id)
             return list(self.node_metrics_history.get(node_id, {}).keys())
     
     def get_link_metric_names(self, link_id: str) -> list:
         with self._lock:
-            return list(self.link_metrics_history.get(link_id, {}).keys())
\ No newline at end of file
+            self._hydrate_link(link_id)
+            return list(self.link_metrics_history.get(link_id, {}).keys())
+    
+    def sweep(self, version: int, now: datetime) -> int:
+        # Called once per snapshot: stamps everything updated since the last sweep, then evicts
+        # from the least recently updated end. Returns the number of entities evicted
+        now_s = now.timestamp()
+        with self._lock:
+            last_seen = self._last_seen
+            for key in self._touched:
+                last_seen[key] = (version, now_s)
+                last_seen.move_to_end(key)
+            self._touched.clear()
+            
+            evicted = 0
+            while last_seen:
+                key, (seen_version, seen_s) = next(iter(last_seen.items()))
+                if version - seen_version > self.max_missed_versions:
+                    self.stats['evicted_missed'] += 1
+                elif now_s - seen_s > self.ttl_s:
+                    self.stats['evicted_ttl'] += 1
+                elif len(last_seen) > self.max_entities:
+                    self.stats['evicted_lru'] += 1
+                else:
+                    break
+                self._evict(key)
+                evicted += 1
+            return evicted
+    
+    def get_memory_stats(self) -> Dict[str, float]:
+        with self._lock:
+            series = 0
+            samples = 0
+            for history in (self.node_metrics_history, self.link_metrics_history):
+                for windows in history.values():
+                    series += len(windows)
+                    samples += sum(len(window) for window in windows.values())
+            rollup_bytes = sum(
+                rollup.nbytes for rollups in (self.node_rollups, self.link_rollups)
+                for entity in rollups.values() for rollup in entity.values())
+            entities = len(self.node_metrics_history) + len(self.link_metrics_history)
+            pending_bytes = 0
+            if self._pending is not None:
+                pending_bytes = sum(getattr(self._pending, name).nbytes for name in HistoryColumns.__dataclass_fields__)
+            return {
+                'entities': entities + len(self._pending_nodes) + len(self._pending_links),
+                'series': series,
+                'samples': samples,
+                'rollup_bytes': rollup_bytes,
+                'window_matrix_bytes': self.link_windows.nbytes,
+                'bytes': (samples * SAMPLE_BYTES + series * SERIES_BYTES + entities * ENTITY_BYTES + rollup_bytes +
+                          self.link_windows.nbytes + pending_bytes),
+                **self.stats
+            }
+    
+    def _evict(self, key: EntityKey):
+        kind, entity_id = key
+        self._last_seen.pop(key, None)
+        self._touched.discard(key)
+        if kind == NODE_SERIES:
+            self.node_metrics_history.pop(entity_id, None)
+            self.node_ema.pop(entity_id, None)
+            self.node_rollups.pop(entity_id, None)
+            self._pending_nodes.pop(entity_id, None)
+        else:
+            self.link_metrics_history.pop(entity_id, None)
+            self.link_ema.pop(entity_id, None)
+            self.link_rollups.pop(entity_id, None)
+            self.link_windows.remove(entity_id)
+            self._pending_links.pop(entity_id, None)
+        if not self._pending_nodes and not self._pending_links:
+            self._pending = None
+    
+    def _add_rollup(self, rollups: Dict[str, Dict[str, RollupSeries]], entity_id: str, metric_name: str, timestamp: datetime, value: float):
+        if not self.tiers:
+            return
+        series = rollups[entity_id].get(metric_name)
+        if series is None:
+            series = rollups[entity_id][metric_name] = RollupSeries(self.tiers)
+        series.add(timestamp.timestamp(), value)
+    
+    def _summary(self, history, rollups, entity_id: str, metric_name: str, horizon_s: float) -> Optional[RollupSummary]:
+        window = history.get(entity_id, {}).get(metric_name, ())
+        series = rollups.get(entity_id, {}).get(metric_name)
+        raw = [(snapshot.timestamp.timestamp(), snapshot.value) for snapshot in window]
+        # Horizons are measured back from the series' newest sample
+        latest = raw[-1][0] if raw else None
+        if series is not None and series.open[0] is not None:
+            latest = max(latest or series.open[0][0], series.open[0][0])
+        if latest is None:
+            return None
+        return summarize(series, raw, latest - horizon_s)
+    
+    def export_columns(self) -> HistoryColumns:
+        kinds, entities, metrics, counts, emas = [], [], [], [], []
+        timestamps: List[float] = []
+        values: List[float] = []
+        rollup_states = []
+        
+        for kind, ids, history, ema, rollups, pending in (
+            (NODE_SERIES, self.get_all_node_ids(), self.node_metrics_history, self.node_ema, self.node_rollups, self._pending_nodes),
+            (LINK_SERIES, self.get_all_link_ids(), self.link_metrics_history, self.link_ema, self.link_rollups, self._pending_links)
+        ):
+            for entity_id in ids:
+                # Per-entity locking keeps writers on the event loop from stalling behind a full export
+                with self._lock:
+                    rows = pending.get(entity_id)
+                    if rows is not None:
+                        # Never-touched restored entities are copied straight from the columns
+                        series = [(*self._pending_series(row), self._pending_rollup(row)) for row in rows]
+                    else:
+                        entity_ema = ema.get(entity_id, {})
+                        entity_rollups = rollups.get(entity_id, {})
+                        series = [
+                            (name, [s.timestamp.timestamp() for s in window], [s.value for s in window], entity_ema.get(name, 0.0),
+                             entity_rollups[name].export() if name in entity_rollups else None)
+                            for name, window in history.get(entity_id, {}).items()
+                        ]
+                
+                for name, window_ts, window_values, series_ema, rollup in series:
+                    kinds.append(kind)
+                    entities.append(entity_id)
+                    metrics.append(name)
+                    counts.append(len(window_values))
+                    emas.append(series_ema)
+                    timestamps.extend(window_ts)
+                    values.extend(window_values)
+                    rollup_states.append(rollup)
+        
+        offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return HistoryColumns(
+            kinds=np.array(kinds, dtype=np.int8),
+            entities=np.array(entities, dtype=str),
+            metrics=np.array(metrics, dtype=str),
+            offsets=offsets,
+            timestamps=np.array(timestamps, dtype=np.float64),
+            values=np.array(values, dtype=np.float64),
+            ema=np.array(emas, dtype=np.float64),
+            **self._rollup_columns(rollup_states)
+        )
+    
+    def _rollup_columns(self, states) -> Dict[str, np.ndarray]:
+        if not self.tiers:
+            return {}
+        tier_count = len(self.tiers)
+        empty = (np.empty((0, 6)), [0] * tier_count, [0] * tier_count, np.full((tier_count, 6), np.nan))
+        states = [state if state is not None else empty for state in states]
+        offsets = np.zeros(len(states) + 1, dtype=np.int64)
+        np.cumsum([len(state[0]) for state in states], out=offsets[1:])
+        return {
+            'rollup_tiers': np.array(self.tiers, dtype=np.float64).reshape(-1, 2),
+            'rollup_offsets': offsets,
+            'rollup_closed': np.concatenate([state[0] for state in states]) if states else np.empty((0, 6)),
+            'rollup_heads': np.array([state[1] for state in states], dtype=np.int64).reshape(-1, tier_count),
+            'rollup_sizes': np.array([state[2] for state in states], dtype=np.int64).reshape(-1, tier_count),
+            'rollup_open': np.array([state[3] for state in states], dtype=np.float64).reshape(-1, tier_count, 6)
+        }
+    
+    def attach_columns(self, columns: HistoryColumns):
+        pending_nodes: Dict[str, List[int]] = {}
+        pending_links: Dict[str, List[int]] = {}
+        for i, (kind, entity_id) in enumerate(zip(columns.kinds.tolist(), columns.entities.tolist())):
+            target = pending_nodes if kind == NODE_SERIES else pending_links
+            target.setdefault(entity_id, []).append(i)
+        
+        # Rollups saved under other tiers do not line up with this manager's buckets and are dropped
+        rollups_match = columns.rollup_tiers is not None and bool(self.tiers) and \
+            tuple((float(width), int(capacity)) for width, capacity in columns.rollup_tiers.tolist()) == self.tiers
+        
+        with self._lock:
+            self._pending = columns
+            self._pending_rollups = rollups_match
+            self._pending_nodes = {n: rows for n, rows in pending_nodes.items() if n not in self.node_metrics_history}
+            self._pending_links = {l: rows for l, rows in pending_links.items() if l not in self.link_metrics_history}
+            # Restored entities age from their newest sample, behind everything already live
+            latest_version = max((seen[0] for seen in self._last_seen.values()), default=0)
+            for kind, pending in ((NODE_SERIES, self._pending_nodes), (LINK_SERIES, self._pending_links)):
+                for entity_id, rows in pending.items():
+                    ends = [int(columns.offsets[row + 1]) for row in rows if columns.offsets[row + 1] > columns.offsets[row]]
+                    seen_s = float(max(columns.timestamps[end - 1] for end in ends)) if ends else 0.0
+                    self._last_seen[(kind, entity_id)] = (latest_version, seen_s)
+                    self._last_seen.move_to_end((kind, entity_id), last=False)
+    
+    def _hydrate_node(self, node_id: str):
+        if self._pending_nodes:
+            self._hydrate(node_id, self._pending_nodes, self.node_metrics_history, self.node_ema, self.node_rollups)
+    
+    def _hydrate_link(self, link_id: str):
+        if self._pending_links:
+            self._hydrate(link_id, self._pending_links, self.link_metrics_history, self.link_ema, self.link_rollups, self.link_windows)
+    
+    def _hydrate(self, entity_id: str, pending: Dict[str, List[int]], history, ema, rollups,
+                 windows: Optional[WindowMatrix] = None):
+        rows = pending.pop(entity_id, None)
+        if rows is None:
+            return
+        
+        for row in rows:
+            name, window_ts, window_values, series_ema = self._pending_series(row)
+            window = history[entity_id][name]
+            for ts, value in zip(window_ts, window_values):
+                window.append(MetricSnapshot(datetime.fromtimestamp(ts, tz=timezone.utc), value))
+                if windows is not None:
+                    windows.add(entity_id, name, value)
+            ema[entity_id][name] = series_ema
+            rollup = self._pending_rollup(row)
+            if rollup is not None:
+                rollups[entity_id][name] = RollupSeries.restore(self.tiers, *rollup)
+        
+        if not self._pending_nodes and not self._pending_links:
+            self._pending = None
+    
+    def _pending_rollup(self, row: int):
+        # A restored series' rollup state as RollupSeries.export gives it, or None if it had none
+        columns = self._pending
+        if not self._pending_rollups:
+            return None
+        opened = columns.rollup_open[row]
+        if not columns.rollup_sizes[row].any() and np.isnan(opened[:, 0]).all():
+            return None
+        start, end = int(columns.rollup_offsets[row]), int(columns.rollup_offsets[row + 1])
+        return columns.rollup_closed[start:end], columns.rollup_heads[row].tolist(), columns.rollup_sizes[row].tolist(), opened
+    
+    def _pending_series(self, row: int):
+        columns = self._pending
+        start, end = int(columns.offsets[row]), int(columns.offsets[row + 1])
+        start = max(start, end - self.history_window)
+        return (
+            str(columns.metrics[row]),
+            columns.timestamps[start:end].tolist(),
+            columns.values[start:end].tolist(),
+            float(columns.ema[row])
+        )
@@ -2,6 +2,20 @@ from typing import List
 from dataclasses import dataclass
 from datetime import datetime
 
+# Share of each metric in an entity's overall stability score
+NODE_METRIC_WEIGHTS = {
+    'cpu_load': 0.3,
+    'jitter_ms': 0.3,
+    'queue_len': 0.2,
+    'throughput_mbps': 0.2
+}
+LINK_METRIC_WEIGHTS = {
+    'delay_ms': 0.35,
+    'jitter_ms': 0.35,
+    'loss_rate': 0.2,
+    'bandwidth_mbps': 0.1
+}
+
 
 @dataclass
 class MetricSnapshot:
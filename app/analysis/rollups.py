@@ -0,0 +1,172 @@
+import math
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# (bucket seconds, buckets kept) per tier, finest first: 1 minute for 2 hours, then 15 minutes for a day
+DEFAULT_TIERS = "60:120,900:96"
+
+# Columns of a bucket row
+START, COUNT, MEAN, M2, MIN, MAX = range(6)
+
+
+def parse_tiers(spec: str) -> Tuple[Tuple[float, int], ...]:
+    tiers = []
+    for part in spec.split(","):
+        if part.strip():
+            width, capacity = part.split(":")
+            tiers.append((float(width), int(capacity)))
+    for (width, capacity), (next_width, _) in zip(tiers, tiers[1:]):
+        # Coarser buckets are filled from closed finer ones, so they must line up and the finer
+        # tier must span at least one coarser bucket
+        if next_width % width or width * capacity < next_width:
+            raise ValueError(f"Rollup tier {next_width:g}s must be a multiple of {width:g}s and covered by its {capacity} buckets")
+    return tuple(tiers)
+
+
+def merge(a: Sequence[float], b: Sequence[float]) -> List[float]:
+    # Chan et al. pairwise combination of (start, count, mean, M2, min, max)
+    count = a[COUNT] + b[COUNT]
+    delta = b[MEAN] - a[MEAN]
+    mean = a[MEAN] + delta * b[COUNT] / count
+    m2 = a[M2] + b[M2] + delta * delta * a[COUNT] * b[COUNT] / count
+    return [min(a[START], b[START]), count, mean, m2, min(a[MIN], b[MIN]), max(a[MAX], b[MAX])]
+
+
+class RollupSeries:
+    # Downsampled history of one metric series. Each tier has an open bucket and a ring of closed ones;
+    # a closing bucket is folded into the next tier's open bucket, so a sample is only handled once
+    __slots__ = ('tiers', 'open', 'closed', 'heads', 'sizes')
+
+    def __init__(self, tiers: Tuple[Tuple[float, int], ...]):
+        self.tiers = tiers
+        self.open: List[Optional[List[float]]] = [None] * len(tiers)
+        # Rings share one array, allocated when the first bucket closes so short-lived series stay small
+        self.closed: Optional[np.ndarray] = None
+        self.heads = [0] * len(tiers)
+        self.sizes = [0] * len(tiers)
+
+    @property
+    def nbytes(self) -> int:
+        return (self.closed.nbytes if self.closed is not None else 0) + 104 * sum(b is not None for b in self.open)
+
+    def add(self, timestamp: float, value: float):
+        self._accumulate(0, [timestamp, 1, value, 0.0, value, value])
+
+    def _accumulate(self, tier: int, bucket: List[float]):
+        width = self.tiers[tier][0]
+        start = bucket[START] - bucket[START] % width
+        current = self.open[tier]
+        if current is not None and start > current[START]:
+            self._close(tier, current)
+            current = None
+        if current is None:
+            bucket[START] = start
+            self.open[tier] = bucket
+        else:
+            # Late samples land in the open bucket rather than reopening a closed one
+            self.open[tier] = merge(current, bucket)
+            self.open[tier][START] = current[START]
+
+    def _close(self, tier: int, bucket: List[float]):
+        if self.closed is None:
+            self.closed = np.empty((sum(capacity for _, capacity in self.tiers), 6), dtype=np.float64)
+        offset = sum(capacity for _, capacity in self.tiers[:tier])
+        capacity = self.tiers[tier][1]
+        self.closed[offset + self.heads[tier]] = bucket
+        self.heads[tier] = (self.heads[tier] + 1) % capacity
+        self.sizes[tier] = min(self.sizes[tier] + 1, capacity)
+        if tier + 1 < len(self.tiers):
+            self._accumulate(tier + 1, list(bucket))
+
+    def export(self) -> Tuple[np.ndarray, List[int], List[int], np.ndarray]:
+        # (closed rings, empty if none closed yet; heads; sizes; open buckets with NaN rows for none)
+        closed = self.closed if self.closed is not None else np.empty((0, 6))
+        opened = np.array([bucket if bucket is not None else [math.nan] * 6 for bucket in self.open],
+                          dtype=np.float64).reshape(-1, 6)
+        return closed, list(self.heads), list(self.sizes), opened
+
+    @classmethod
+    def restore(cls, tiers: Tuple[Tuple[float, int], ...], closed: np.ndarray, heads: Sequence[int],
+                sizes: Sequence[int], opened: np.ndarray) -> 'RollupSeries':
+        series = cls(tiers)
+        # Copied, so a series restored from a memory-mapped checkpoint does not pin the file
+        series.closed = np.array(closed, dtype=np.float64) if len(closed) else None
+        series.heads = [int(head) for head in heads]
+        series.sizes = [int(size) for size in sizes]
+        series.open = [None if math.isnan(row[START]) else row for row in np.asarray(opened).tolist()]
+        return series
+
+    def buckets(self, tier: int) -> np.ndarray:
+        # Closed buckets of a tier, oldest first
+        size = self.sizes[tier]
+        if size == 0:
+            return np.empty((0, 6))
+        offset = sum(capacity for _, capacity in self.tiers[:tier])
+        capacity = self.tiers[tier][1]
+        ring = self.closed[offset:offset + capacity]
+        if size < capacity:
+            return ring[:size]
+        head = self.heads[tier]
+        return np.concatenate((ring[head:], ring[:head]))
+
+
+@dataclass
+class RollupSummary:
+    count: int
+    mean: float
+    variance: float
+    minimum: float
+    maximum: float
+    span_s: float
+    # (mid time, mean, count) of every sample or bucket used, oldest first; the basis of trends
+    points: List[Tuple[float, float, float]] = field(default_factory=list)
+
+
+def summarize(series: Optional[RollupSeries], raw: Iterable[Tuple[float, float]], since: float) -> Optional[RollupSummary]:
+    # Raw (timestamp, value) samples cover the newest stretch, then ever coarser buckets further back.
+    # Level j (0 = raw) is used for cuts[j + 1] <= time < cuts[j]; every cut falls on a boundary of the
+    # coarser level, so no sample is counted twice
+    raw = list(raw)
+    tiers = series.tiers if series is not None else ()
+    cuts = [math.inf] + [-math.inf] * (len(tiers) + 1)
+    for j, (width, _) in enumerate(tiers, start=1):
+        tier = j - 1
+        if series.open[tier] is None:
+            break
+        if j == 1:
+            covered_from = raw[0][0] if raw else math.inf
+        else:
+            # A finer tier is complete from its oldest closed bucket (it has one, or this tier would be empty)
+            covered_from = series.buckets(tier - 1)[0, START]
+        cuts[j] = math.ceil(covered_from / width) * width if math.isfinite(covered_from) else covered_from
+    for j in range(len(tiers), 1, -1):
+        # A finer level that retains less than the next coarser one hands over at the coarser cut
+        cuts[j - 1] = max(cuts[j - 1], cuts[j])
+
+    parts: List[Tuple[List[float], float]] = []
+    for j, (width, _) in enumerate(tiers, start=1):
+        rows = series.buckets(j - 1).tolist()
+        if series.open[j - 1] is not None:
+            rows.append(series.open[j - 1])
+        parts.extend((row, row[START] + width / 2) for row in rows
+                     if cuts[j + 1] <= row[START] < cuts[j] and row[START] + width > since)
+    parts.extend(([ts, 1, value, 0.0, value, value], ts) for ts, value in raw if ts >= cuts[1] and ts >= since)
+    if not parts:
+        return None
+
+    parts.sort(key=lambda part: part[1])
+    total = parts[0][0]
+    for row, _ in parts[1:]:
+        total = merge(total, row)
+    count = int(total[COUNT])
+    return RollupSummary(
+        count=count,
+        mean=total[MEAN],
+        variance=total[M2] / (count - 1) if count > 1 else 0.0,
+        minimum=total[MIN],
+        maximum=total[MAX],
+        span_s=parts[-1][1] - parts[0][1],
+        points=[(mid, row[MEAN], row[COUNT]) for row, mid in parts]
+    )
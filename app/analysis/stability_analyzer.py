@@ -1,6 +1,8 @@
 from typing import Dict, List, Optional
 from datetime import datetime
 
+import numpy as np
+
 from .history_manager import MetricsHistoryManager
 from .stability_calculator import StabilityCalculator
 from .metrics import StabilityMetrics, MetricSnapshot
@@ -19,25 +21,48 @@ class StabilityAnalyzer:
         for metric_name, value in metrics.items():
             self.history_manager.add_link_metric(link_id, metric_name, value, timestamp)
     
-    def calculate_node_stability(self, node_id: str, metric_name: str) -> Optional[StabilityMetrics]:
+    def sweep_history(self, version: int, now: datetime) -> int:
+        return self.history_manager.sweep(version, now)
+    
+    def get_history_stats(self) -> Dict[str, float]:
+        return self.history_manager.get_memory_stats()
+    
+    def get_link_stability_scores(self, link_ids: List[str], default: float = 1.0) -> np.ndarray:
+        # get_overall_link_stability for many links in one vectorised pass; links with too little
+        # history get the default
+        values, positions, counts = self.history_manager.get_link_windows(link_ids)
+        scores = self.calculator.calculate_stability_scores(values, positions, counts)
+        overall = self.calculator.calculate_weighted_stabilities(scores, counts >= 2, 'link')
+        return np.where(np.isnan(overall), default, overall)
+    
+    def calculate_node_stability(self, node_id: str, metric_name: str, horizon_s: Optional[float] = None) -> Optional[StabilityMetrics]:
         if not self.history_manager.has_node_metric(node_id, metric_name):
             return None
         
+        if horizon_s is not None:
+            # Score over the horizon from the raw window plus the downsampled tiers behind it
+            summary = self.history_manager.get_node_summary(node_id, metric_name, horizon_s)
+            return self.calculator.calculate_summary_stability(summary) if summary else None
+        
         history = self.history_manager.get_node_history(node_id, metric_name)
         return self.calculator.calculate_stability_metrics(history)
     
-    def calculate_link_stability(self, link_id: str, metric_name: str) -> Optional[StabilityMetrics]:
+    def calculate_link_stability(self, link_id: str, metric_name: str, horizon_s: Optional[float] = None) -> Optional[StabilityMetrics]:
         if not self.history_manager.has_link_metric(link_id, metric_name):
             return None
         
+        if horizon_s is not None:
+            summary = self.history_manager.get_link_summary(link_id, metric_name, horizon_s)
+            return self.calculator.calculate_summary_stability(summary) if summary else None
+        
         history = self.history_manager.get_link_history(link_id, metric_name)
         return self.calculator.calculate_stability_metrics(history)
     
-    def get_overall_node_stability(self, node_id: str) -> Optional[float]:
+    def get_overall_node_stability(self, node_id: str, horizon_s: Optional[float] = None) -> Optional[float]:
         stability_scores = []
         
         for metric_name in self.history_manager.get_node_metric_names(node_id):
-            stability = self.calculate_node_stability(node_id, metric_name)
+            stability = self.calculate_node_stability(node_id, metric_name, horizon_s)
             if stability:
                 stability_scores.append(stability.stability_score)
         
@@ -46,11 +71,11 @@ class StabilityAnalyzer:
         
         return self.calculator.calculate_weighted_stability(stability_scores, 'node')
     
-    def get_overall_link_stability(self, link_id: str) -> Optional[float]:
+    def get_overall_link_stability(self, link_id: str, horizon_s: Optional[float] = None) -> Optional[float]:
         stability_scores = []
         
         for metric_name in self.history_manager.get_link_metric_names(link_id):
-            stability = self.calculate_link_stability(link_id, metric_name)
+            stability = self.calculate_link_stability(link_id, metric_name, horizon_s)
             if stability:
                 stability_scores.append(stability.stability_score)
         
@@ -59,17 +84,17 @@ class StabilityAnalyzer:
         
         return self.calculator.calculate_weighted_stability(stability_scores, 'link')
     
-    def get_network_stability(self) -> Dict[str, float]:
+    def get_network_stability(self, horizon_s: Optional[float] = None) -> Dict[str, float]:
         node_stabilities = []
         link_stabilities = []
         
         for node_id in self.history_manager.get_all_node_ids():
-            stability = self.get_overall_node_stability(node_id)
+            stability = self.get_overall_node_stability(node_id, horizon_s)
             if stability is not None:
                 node_stabilities.append(stability)
         
         for link_id in self.history_manager.get_all_link_ids():
-            stability = self.get_overall_link_stability(link_id)
+            stability = self.get_overall_link_stability(link_id, horizon_s)
             if stability is not None:
                 link_stabilities.append(stability)
         
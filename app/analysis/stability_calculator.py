@@ -2,7 +2,8 @@ import numpy as np
 from typing import Optional, List
 from collections import deque
 
-from .metrics import StabilityMetrics, MetricsCalculator, MetricSnapshot
+from .metrics import LINK_METRIC_WEIGHTS, NODE_METRIC_WEIGHTS, StabilityMetrics, MetricsCalculator, MetricSnapshot
+from .rollups import RollupSummary
 
 
 class StabilityCalculator:
@@ -33,25 +34,80 @@ class StabilityCalculator:
             stability_score=stability_score
         )
     
+    @staticmethod
+    def calculate_summary_stability(summary: RollupSummary) -> StabilityMetrics:
+        # Same score as calculate_stability_metrics, from a summary combining raw samples and rollups
+        mean = summary.mean
+        variance = summary.variance
+        std_deviation = np.sqrt(variance)
+        
+        cv = std_deviation / mean if mean != 0 else float('inf')
+        
+        if len(summary.points) >= 3 and summary.span_s > 0:
+            # Count-weighted fit over sample and bucket means, rescaled from per second to per sample
+            # so it is comparable with the raw-window trend
+            times, means, counts = (np.array(column) for column in zip(*summary.points))
+            slope = np.polyfit(times - times[0], means, 1, w=np.sqrt(counts))[0]
+            trend = slope * summary.span_s / max(summary.count - 1, 1)
+        else:
+            trend = 0.0
+        
+        stability_score = MetricsCalculator.calculate_stability_score(cv, abs(trend), mean)
+        
+        return StabilityMetrics(
+            mean=mean,
+            variance=variance,
+            std_deviation=std_deviation,
+            coefficient_of_variation=cv,
+            trend=trend,
+            stability_score=stability_score
+        )
+    
+    @staticmethod
+    def calculate_stability_scores(values: np.ndarray, starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        # calculate_stability_metrics' score for many windows at once. Each window values[i, j] is a ring
+        # whose oldest sample sits at slot starts[i, j]; only its first counts[i, j] slots are filled and
+        # the rest are zero
+        window = values.shape[-1]
+        slots = np.arange(window)
+        n = np.maximum(counts, 1)
+        mean = values.sum(axis=-1) / n
+        deviation = values - mean[..., None]
+        deviation *= slots < counts[..., None]
+        variance = np.where(counts > 1, np.einsum('...k,...k->...', deviation, deviation) / np.maximum(counts - 1, 1), 0.0)
+        
+        # Least-squares slope over positions 0..n-1, as polyfit(arange(n), values, 1). The deviations
+        # sum to zero, so positions need no centring, and rotating the ring only moves the slots before
+        # the start to the end: sum(position * d) = sum(slot * d) + window * sum(d before start)
+        sxy = deviation @ slots.astype(np.float64)
+        sxy += window * np.einsum('...k,...k->...', deviation, slots < starts[..., None])
+        sxx = n * (n * n - 1) / 12.0
+        trend = np.where(counts >= 3, sxy / np.maximum(sxx, 1.0), 0.0)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cv = np.where(mean != 0, np.sqrt(variance) / mean, np.inf)
+        cv_score = np.maximum(0.0, 1.0 - cv / 2.0)
+        trend_score = np.maximum(0.0, 1.0 - np.abs(trend) / (mean + 0.001) * 10.0)
+        return np.clip(0.6 * cv_score + 0.4 * trend_score, 0.0, 1.0)
+    
+    @staticmethod
+    def calculate_weighted_stabilities(scores: np.ndarray, valid: np.ndarray, entity_type: str = 'node') -> np.ndarray:
+        # calculate_weighted_stability per row of a (entities, metrics) score array laid out in the
+        # metric weights' order; rows without any valid score are NaN
+        metric_weights = NODE_METRIC_WEIGHTS if entity_type == 'node' else LINK_METRIC_WEIGHTS
+        weights = np.array(list(metric_weights.values()))
+        present = valid.sum(axis=1)
+        masked = np.where(valid, scores, 0.0)
+        with np.errstate(invalid='ignore'):
+            mean = masked.sum(axis=1) / present
+        return np.where(present == len(weights), masked @ weights, mean)
+    
     @staticmethod
     def calculate_weighted_stability(stability_scores: List[float], entity_type: str = 'node') -> float:
         if not stability_scores:
             return 0.0
         
-        if entity_type == 'node':
-            metric_weights = {
-                'cpu_load': 0.3,
-                'jitter_ms': 0.3,
-                'queue_len': 0.2,
-                'throughput_mbps': 0.2
-            }
-        else: 
-            metric_weights = {
-                'delay_ms': 0.35,
-                'jitter_ms': 0.35,
-                'loss_rate': 0.2,
-                'bandwidth_mbps': 0.1
-            }
+        metric_weights = NODE_METRIC_WEIGHTS if entity_type == 'node' else LINK_METRIC_WEIGHTS
         
         if len(stability_scores) == len(metric_weights):
             weighted_sum = sum(
@@ -1,11 +1,18 @@
 # Graph components
 from .data_structures import NodeData, LinkData
 from .adjacency_manager import AdjacencyManager
-from .graph_operations import GraphOperations
+from .component_index import ComponentIndex
+from .csr_graph import CSRGraph
+from .generation import GraphGeneration
+from .graph_operations import GraphBuilder, GraphOperations
+from .critical_nodes import CriticalNode, CriticalNodeIndex
 from .graph_stats import GraphStats
-from .graph_manager import GraphManager
+from .weight_profiles import WeightProfile
+from .graph_manager import GraphManager, WeightProfileView
 
 __all__ = [
-    'NodeData', 'LinkData', 'AdjacencyManager', 
-    'GraphOperations', 'GraphStats', 'GraphManager'
+    'NodeData', 'LinkData', 'AdjacencyManager', 'ComponentIndex', 'CSRGraph',
+    'GraphGeneration', 'GraphBuilder', 'GraphOperations', 'GraphStats', 'GraphManager',
+    'CriticalNode', 'CriticalNodeIndex',
+    'WeightProfile', 'WeightProfileView'
 ]
\ No newline at end of file
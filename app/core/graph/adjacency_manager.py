@@ -1,57 +1,69 @@
 import numpy as np
-import threading
-from typing import Dict, Optional
+from typing import Dict, NamedTuple, Optional
+
+
+class AdjacencyState(NamedTuple):
+    matrix: Optional[np.ndarray]
+    node_index_map: Dict[str, int]
+    index_node_map: Dict[int, str]
+
+
+EMPTY_ADJACENCY = AdjacencyState(None, {}, {})
 
 
 class AdjacencyManager:
+    # Same scheme as GraphOperations: a new state is built aside and swapped in whole, so readers never lock
     def __init__(self):
-        self.adjacency_matrix: Optional[np.ndarray] = None
-        self.node_index_map: Dict[str, int] = {}
-        self.index_node_map: Dict[int, str] = {}
-        self._lock = threading.RLock()
+        self._state = EMPTY_ADJACENCY
+    
+    @property
+    def adjacency_matrix(self) -> Optional[np.ndarray]:
+        return self._state.matrix
+    
+    @property
+    def node_index_map(self) -> Dict[str, int]:
+        return self._state.node_index_map
+    
+    @property
+    def index_node_map(self) -> Dict[int, str]:
+        return self._state.index_node_map
     
     def build_adjacency_matrix(self, graph):
-        with self._lock:
-            if not graph.nodes():
-                self.adjacency_matrix = None
-                self.node_index_map.clear()
-                self.index_node_map.clear()
-                return
-                
-            nodes = list(graph.nodes())
-            n = len(nodes)
-            
-            self.node_index_map = {node: i for i, node in enumerate(nodes)}
-            self.index_node_map = {i: node for i, node in enumerate(nodes)}
-            
-            self.adjacency_matrix = np.full((n, n), np.inf, dtype=np.float64)
-            
-            np.fill_diagonal(self.adjacency_matrix, 0)
+        if not graph.nodes():
+            self._state = EMPTY_ADJACENCY
+            return
+        
+        nodes = list(graph.nodes())
+        n = len(nodes)
+        
+        node_index_map = {node: i for i, node in enumerate(nodes)}
+        index_node_map = {i: node for i, node in enumerate(nodes)}
+        
+        adjacency_matrix = np.full((n, n), np.inf, dtype=np.float64)
+        
+        np.fill_diagonal(adjacency_matrix, 0)
+        
+        for src, dst, data in graph.edges(data=True):
+            i = node_index_map[src]
+            j = node_index_map[dst]
+            weight = data.get('weight', 1.0)
             
-            for src, dst, data in graph.edges(data=True):
-                i = self.node_index_map[src]
-                j = self.node_index_map[dst]
-                weight = data.get('weight', 1.0)
-                
-                self.adjacency_matrix[i][j] = weight
-                self.adjacency_matrix[j][i] = weight
+            adjacency_matrix[i][j] = weight
+            adjacency_matrix[j][i] = weight
+        
+        self._state = AdjacencyState(adjacency_matrix, node_index_map, index_node_map)
     
     def get_adjacency_matrix(self) -> Optional[np.ndarray]:
-        with self._lock:
-            if self.adjacency_matrix is not None:
-                return self.adjacency_matrix.copy()
-            return None
+        matrix = self._state.matrix
+        if matrix is not None:
+            return matrix.copy()
+        return None
     
     def get_node_index(self, node_id: str) -> Optional[int]:
-        with self._lock:
-            return self.node_index_map.get(node_id)
+        return self._state.node_index_map.get(node_id)
     
     def get_node_by_index(self, index: int) -> Optional[str]:
-        with self._lock:
-            return self.index_node_map.get(index)
+        return self._state.index_node_map.get(index)
     
     def clear(self):
-        with self._lock:
-            self.adjacency_matrix = None
-            self.node_index_map.clear()
-            self.index_node_map.clear()
\ No newline at end of file
+        self._state = EMPTY_ADJACENCY
@@ -0,0 +1,98 @@
+import numpy as np
+from typing import Dict, List, Optional
+
+
+class ComponentIndex:
+    def __init__(self):
+        self.node_index_map: Dict[str, int] = {}
+        self._parent: List[int] = []
+        self._size: List[int] = []
+        self._labels: Optional[np.ndarray] = None
+        self._component_count = 0
+        self._dirty = False
+
+    def clear(self):
+        self.node_index_map.clear()
+        self._parent.clear()
+        self._size.clear()
+        self._labels = None
+        self._component_count = 0
+        self._dirty = False
+
+    def add_node(self, node_id: str) -> int:
+        idx = self.node_index_map.get(node_id)
+        if idx is None:
+            idx = len(self._parent)
+            self.node_index_map[node_id] = idx
+            self._parent.append(idx)
+            self._size.append(1)
+            self._component_count += 1
+            self._labels = None
+        return idx
+
+    def add_edge(self, src: str, dst: str):
+        root_a = self._find(self.add_node(src))
+        root_b = self._find(self.add_node(dst))
+        if root_a == root_b:
+            return
+
+        # Union by size keeps trees shallow between label rebuilds
+        if self._size[root_a] < self._size[root_b]:
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+        self._size[root_a] += self._size[root_b]
+        self._component_count -= 1
+        self._labels = None
+
+    def mark_dirty(self):
+        # Union-find cannot split components; a link going away forces a relabel
+        self._dirty = True
+        self._labels = None
+
+    def is_dirty(self) -> bool:
+        return self._dirty
+
+    def rebuild(self, graph):
+        self.clear()
+        for node in graph.nodes():
+            self.add_node(node)
+        for src, dst, available in graph.edges(data='available', default=True):
+            if available:
+                self.add_edge(src, dst)
+        self.get_labels()
+
+    def get_labels(self) -> np.ndarray:
+        if self._labels is None:
+            self._labels = np.fromiter(
+                (self._find(i) for i in range(len(self._parent))),
+                dtype=np.int64,
+                count=len(self._parent)
+            )
+        return self._labels
+
+    def is_connected(self, src: str, dst: str) -> bool:
+        i = self.node_index_map.get(src)
+        j = self.node_index_map.get(dst)
+        if i is None or j is None:
+            return False
+
+        labels = self.get_labels()
+        return bool(labels[i] == labels[j])
+
+    def get_component_count(self) -> int:
+        return self._component_count
+
+    def get_component_size(self, node_id: str) -> int:
+        idx = self.node_index_map.get(node_id)
+        if idx is None:
+            return 0
+        return self._size[self._find(idx)]
+
+    def _find(self, idx: int) -> int:
+        parent = self._parent
+        root = idx
+        while parent[root] != root:
+            root = parent[root]
+        while parent[idx] != root:
+            parent[idx], idx = root, parent[idx]
+        return root
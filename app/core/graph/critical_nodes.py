@@ -0,0 +1,154 @@
+import heapq
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .csr_graph import CSRGraph
+
+# Search sources sampled for betweenness and closeness; graphs with no more nodes than this are scored exactly
+DEFAULT_CRITICAL_SAMPLES = 64
+
+# Weight of each centrality in a node's criticality score
+DEGREE_WEIGHT = 0.4
+BETWEENNESS_WEIGHT = 0.4
+CLOSENESS_WEIGHT = 0.2
+
+
+@dataclass
+class CriticalNode:
+    node_id: str
+    score: float
+    degree: float
+    betweenness: float
+    closeness: float
+
+
+def approximate_centralities(csr: CSRGraph, samples: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Hop-count degree, betweenness and closeness centrality, scaled like networkx's normalised ones.
+    # Betweenness and closeness share one Brandes search per sampled source: dependencies accumulate
+    # into betweenness, and the hop distances from the sources estimate every node's total distance
+    # (Eppstein-Wang). Closeness is 0 on a disconnected graph, as in GraphStats.get_node_centralities
+    n = csr.num_nodes
+    if n <= 1:
+        return np.ones(n), np.zeros(n), np.zeros(n)
+    degree = np.diff(csr.indptr) / (n - 1)
+
+    sources = list(range(n)) if samples >= n else random.Random(seed).sample(range(n), samples)
+    # Plain lists are much faster than ndarray indexing in the search loops
+    ptr = csr.indptr.tolist()
+    adj = csr.indices.tolist()
+    betweenness = [0.0] * n
+    distances = np.zeros(n, dtype=np.float64)
+    connected = True
+
+    for s in sources:
+        dist = [-1] * n
+        sigma = [0] * n
+        dist[s] = 0
+        sigma[s] = 1
+        order = [s]
+        for v in order:
+            next_dist = dist[v] + 1
+            paths = sigma[v]
+            for w in adj[ptr[v]:ptr[v + 1]]:
+                if dist[w] < 0:
+                    dist[w] = next_dist
+                    sigma[w] = paths
+                    order.append(w)
+                elif dist[w] == next_dist:
+                    sigma[w] += paths
+        connected = connected and len(order) == n
+
+        # Predecessors are the neighbours one hop closer to the source, so none need to be stored
+        delta = [0.0] * n
+        for w in reversed(order):
+            coeff = (1.0 + delta[w]) / sigma[w]
+            prev_dist = dist[w] - 1
+            for v in adj[ptr[w]:ptr[w + 1]]:
+                if dist[v] == prev_dist:
+                    delta[v] += sigma[v] * coeff
+            betweenness[w] += delta[w]
+        betweenness[s] -= delta[s]
+        if connected:
+            distances += dist
+
+    scale = n / len(sources)
+    between = np.asarray(betweenness) * (scale / ((n - 1) * (n - 2)) if n > 2 else 0.0)
+    closeness = np.zeros(n)
+    if connected:
+        totals = distances * scale
+        np.divide(n - 1, totals, out=closeness, where=totals > 0)
+    return degree, between, closeness
+
+
+class CriticalNodeIndex:
+    # Nodes ranked by criticality for the latest graph version, scored once per version. The
+    # centralities only depend on topology, so a version that changed nothing but link metrics keeps
+    # the previous scores. The ranking is popped off a heap as far as queries have asked for
+    def __init__(self, graph_operations, samples: Optional[int] = None, seed: int = 0):
+        self.graph_ops = graph_operations
+        if samples is None:
+            samples = int(os.environ.get("HEURISTIC_CRITICAL_SAMPLES", DEFAULT_CRITICAL_SAMPLES))
+        self.samples = samples
+        self.seed = seed
+        self.version = -1
+        self.rescores = 0
+        self.reuses = 0
+        self.score_ms = 0.0
+        self._node_ids: List[str] = []
+        self._edge_endpoints: Optional[np.ndarray] = None
+        self._centralities = np.empty((3, 0))
+        self._heap: List[Tuple[float, int]] = []
+        self._ranked: List[CriticalNode] = []
+        self._lock = threading.Lock()
+
+    def prepare(self):
+        csr = self.graph_ops.get_csr()
+        with self._lock:
+            if self.version == csr.version:
+                return
+            if self._edge_endpoints is not None and self._node_ids == csr.node_ids \
+                    and np.array_equal(self._edge_endpoints, csr.edge_endpoints):
+                self.reuses += 1
+            else:
+                start = time.perf_counter()
+                self._centralities = np.vstack(approximate_centralities(csr, self.samples, self.seed))
+                scores = np.array([DEGREE_WEIGHT, BETWEENNESS_WEIGHT, CLOSENESS_WEIGHT]) @ self._centralities
+                # Ties go to the lower node index, which keeps the ranking stable across rescoring
+                self._heap = list(zip((-scores).tolist(), range(csr.num_nodes)))
+                heapq.heapify(self._heap)
+                self._ranked = []
+                self._node_ids = csr.node_ids
+                self._edge_endpoints = csr.edge_endpoints
+                self.score_ms = (time.perf_counter() - start) * 1000.0
+                self.rescores += 1
+            self.version = csr.version
+
+    def get_ranking(self, top_n: int) -> Tuple[int, List[CriticalNode]]:
+        # (graph version scored, the top_n most critical nodes, most critical first)
+        self.prepare()
+        with self._lock:
+            while len(self._ranked) < top_n and self._heap:
+                score, i = heapq.heappop(self._heap)
+                degree, betweenness, closeness = self._centralities[:, i].tolist()
+                self._ranked.append(CriticalNode(self._node_ids[i], -score, degree, betweenness, closeness))
+            return self.version, self._ranked[:top_n]
+
+    def get_critical_nodes(self, top_n: int = 5) -> List[str]:
+        return [node.node_id for node in self.get_ranking(top_n)[1]]
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            'version': self.version,
+            'nodes': len(self._node_ids),
+            'samples': self.samples,
+            'rescores': self.rescores,
+            'reuses': self.reuses,
+            'ranked': len(self._ranked),
+            'score_ms': self.score_ms
+        }
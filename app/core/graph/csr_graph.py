@@ -0,0 +1,164 @@
+import heapq
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Per-edge metric columns kept alongside the CSR (rows follow edge_endpoints); stability is the
+# link's long-run score from the stability analyser
+EDGE_METRIC_COLUMNS = ('delay_ms', 'jitter_ms', 'loss_rate', 'bandwidth_mbps', 'stability')
+
+
+class CSRGraph:
+    def __init__(
+        self,
+        node_ids: List[str],
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        weights: np.ndarray,
+        edge_ids: np.ndarray,
+        edge_endpoints: np.ndarray,
+        version: int = 0
+    ):
+        self.node_ids = node_ids
+        self.node_index_map: Dict[str, int] = {node: i for i, node in enumerate(node_ids)}
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.edge_ids = edge_ids
+        self.edge_endpoints = edge_endpoints
+        self.version = version
+        # Filled on demand by GraphOperations.get_edge_metrics
+        self.edge_metrics: Optional[np.ndarray] = None
+        # Slot keys (src * num_nodes + dst) in sorted order and the slots they belong to, for path_slots
+        self._slot_keys: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    @classmethod
+    def from_graph(cls, graph, version: int = 0) -> 'CSRGraph':
+        node_ids = list(graph.nodes())
+        index = {node: i for i, node in enumerate(node_ids)}
+        n = len(node_ids)
+
+        edges = list(graph.edges(data='weight', default=1.0))
+        m = len(edges)
+        edge_endpoints = np.empty((m, 2), dtype=np.int32)
+        edge_weights = np.empty(m, dtype=np.float64)
+        for e, (u, v, w) in enumerate(edges):
+            edge_endpoints[e, 0] = index[u]
+            edge_endpoints[e, 1] = index[v]
+            edge_weights[e] = w
+
+        # Each undirected edge occupies one slot per direction
+        src = np.concatenate([edge_endpoints[:, 0], edge_endpoints[:, 1]])
+        dst = np.concatenate([edge_endpoints[:, 1], edge_endpoints[:, 0]])
+        slot_edges = np.concatenate([np.arange(m, dtype=np.int32)] * 2)
+
+        order = np.argsort(src, kind='stable')
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+
+        return cls(
+            node_ids=node_ids,
+            indptr=indptr,
+            indices=dst[order].astype(np.int32),
+            weights=edge_weights[slot_edges[order]],
+            edge_ids=slot_edges[order],
+            edge_endpoints=edge_endpoints,
+            version=version
+        )
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.edge_endpoints)
+
+    def get_node_index(self, node_id: str) -> Optional[int]:
+        return self.node_index_map.get(node_id)
+
+    def neighbors(self, idx: int) -> np.ndarray:
+        return self.indices[self.indptr[idx]:self.indptr[idx + 1]]
+
+    def shortest_path_tree(self, source: int, weights: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        return shortest_path_tree(
+            self.indptr, self.indices,
+            self.weights if weights is None else weights,
+            source
+        )
+
+    def path_slots(self, path: Sequence[str]) -> np.ndarray:
+        # Slot of every hop of a path in one vectorised lookup; -1 where the graph has no such edge
+        if self._slot_keys is None:
+            src = np.repeat(np.arange(self.num_nodes, dtype=np.int64), np.diff(self.indptr))
+            keys = src * self.num_nodes + self.indices
+            order = np.argsort(keys, kind='stable')
+            self._slot_keys = (keys[order], order)
+        keys, order = self._slot_keys
+        nodes = np.array([self.node_index_map.get(node, -1) for node in path], dtype=np.int64)
+        hops = nodes[:-1] * self.num_nodes + nodes[1:]
+        if not len(keys):
+            return np.full(len(hops), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(keys, hops), len(keys) - 1)
+        found = (nodes[:-1] >= 0) & (nodes[1:] >= 0) & (keys[pos] == hops)
+        return np.where(found, order[pos], -1)
+
+    def path_to_root(self, parent: np.ndarray, node: int) -> List[str]:
+        path = [self.node_ids[node]]
+        while parent[node] >= 0:
+            node = parent[node]
+            path.append(self.node_ids[node])
+        return path
+
+    def with_weights(self, edge_weights: np.ndarray) -> 'CSRGraph':
+        # Same topology under other edge weights (indexed like edge_endpoints)
+        csr = CSRGraph(self.node_ids, self.indptr, self.indices, edge_weights[self.edge_ids],
+                       self.edge_ids, self.edge_endpoints, self.version)
+        csr.edge_metrics = self.edge_metrics
+        csr._slot_keys = self._slot_keys
+        return csr
+
+    def landmark_distances(self, count: int) -> np.ndarray:
+        # (count, num_nodes) exact distances from landmarks picked by farthest-point selection,
+        # which spreads them across the topology; the basis of ALT lower bounds
+        if count <= 0 or self.num_nodes == 0:
+            return np.empty((0, self.num_nodes), dtype=np.float64)
+        rows = []
+        closest = np.full(self.num_nodes, np.inf)
+        landmark = 0
+        for _ in range(min(count, self.num_nodes)):
+            dist, _parent = self.shortest_path_tree(landmark)
+            rows.append(dist)
+            closest = np.minimum(closest, dist)
+            reachable = np.where(np.isfinite(closest), closest, -1.0)
+            landmark = int(np.argmax(reachable))
+        return np.vstack(rows)
+
+
+def shortest_path_tree(indptr: Sequence[int], indices: Sequence[int], weights: Sequence[float], source: int) -> Tuple[np.ndarray, np.ndarray]:
+    n = len(indptr) - 1
+    # Plain lists are much faster than ndarray indexing in the heap loop
+    ptr = indptr.tolist() if isinstance(indptr, np.ndarray) else indptr
+    adj = indices.tolist() if isinstance(indices, np.ndarray) else indices
+    wts = weights.tolist() if isinstance(weights, np.ndarray) else weights
+
+    inf = float('inf')
+    dist = [inf] * n
+    parent = [-1] * n
+    done = [False] * n
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+
+    while heap:
+        d, u = heapq.heappop(heap)
+        if done[u]:
+            continue
+        done[u] = True
+        for slot in range(ptr[u], ptr[u + 1]):
+            v = adj[slot]
+            nd = d + wts[slot]
+            if nd < dist[v]:
+                dist[v] = nd
+                parent[v] = u
+                heapq.heappush(heap, (nd, v))
+
+    return np.asarray(dist, dtype=np.float64), np.asarray(parent, dtype=np.int32)
@@ -0,0 +1,63 @@
+import threading
+import weakref
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from .data_structures import NodeData, LinkData
+from .component_index import ComponentIndex
+from ...utils.lazy import lazy_import
+
+nx = lazy_import("networkx")
+
+# Every generation still referenced by a reader (or the current pointer); collected with its last reference
+_LIVE_GENERATIONS: "weakref.WeakSet[GraphGeneration]" = weakref.WeakSet()
+
+
+class GraphGeneration:
+    # One published version of the graph. Nothing in it changes after publish, so readers use it
+    # without locking; views derived from it (CSR, edge states, centralities) are built once on demand
+    def __init__(self, graph: Optional["nx.Graph"], nodes_data: Dict[str, NodeData], links_data: Dict[str, LinkData],
+                 components: ComponentIndex, version: int, last_update: Optional[datetime],
+                 profile_weights: Optional[Dict[str, np.ndarray]] = None, edge_stability: Optional[np.ndarray] = None):
+        self._graph = graph
+        self.nodes_data = nodes_data
+        self.links_data = links_data
+        self.components = components
+        self.version = version
+        self.last_update = last_update
+        # Edge weights (graph.edges() order) under each non-default weight profile
+        self.profile_weights = profile_weights or {}
+        # Long-run stability score of every edge (graph.edges() order), scored as the generation was built
+        self.edge_stability = edge_stability
+        self._derived: Dict[str, Any] = {}
+        self._derive_locks: Dict[str, threading.Lock] = {}
+        _LIVE_GENERATIONS.add(self)
+
+    @classmethod
+    def empty(cls) -> 'GraphGeneration':
+        # No graph until first access, so importing networkx stays off the startup path
+        return cls(None, {}, {}, ComponentIndex(), 0, None)
+
+    @property
+    def graph(self) -> "nx.Graph":
+        if self._graph is None:
+            return self.derived('graph', lambda: nx.freeze(nx.Graph()))
+        return self._graph
+
+    def derived(self, key: str, build: Callable[[], Any]) -> Any:
+        value = self._derived.get(key)
+        if value is None:
+            # Only the first reader of a view builds it and later ones never lock; one lock per view,
+            # so a slow view (betweenness) does not hold up a cheap one (CSR)
+            with self._derive_locks.setdefault(key, threading.Lock()):
+                value = self._derived.get(key)
+                if value is None:
+                    value = build()
+                    self._derived[key] = value
+        return value
+
+
+def live_generation_count() -> int:
+    return len(_LIVE_GENERATIONS)
@@ -1,9 +1,19 @@
+import threading
 from datetime import datetime
+from typing import Callable, List, Optional
+
+import numpy as np
 from proto import heuristic_pb2
 
-from .graph_operations import GraphOperations
+from .generation import GraphGeneration, live_generation_count
+from .graph_operations import GraphBuilder, GraphOperations
 from .adjacency_manager import AdjacencyManager
 from .graph_stats import GraphStats
+from .weight_profiles import WEIGHT_PROFILES
+from ...utils.instrumentation import INGEST_SECONDS
+from ...utils.logger import PerformanceLogger, get_logger, log_graph_update
+
+logger = get_logger(__name__)
 
 
 class GraphManager:
@@ -11,26 +21,46 @@ class GraphManager:
         self.graph_ops = GraphOperations()
         self.adjacency_mgr = AdjacencyManager()
         self.stats = GraphStats(self.graph_ops)
+        # Writers only; readers go through graph_ops without locking
+        self._update_lock = threading.Lock()
+        # Scores a list of link ids for the stability column and cost term; unset means all stable
+        self._stability_source: Optional[Callable[[List[str]], np.ndarray]] = None
+    
+    def set_stability_source(self, source: Optional[Callable[[List[str]], np.ndarray]]):
+        self._stability_source = source
     
     def update_graph(self, snapshot: heuristic_pb2.GraphSnapshot) -> bool:
         try:
-            timestamp = datetime.fromisoformat(snapshot.timestamp.replace('Z', '+00:00'))
-            
-            self.graph_ops.clear_graph()
-            self.adjacency_mgr.clear()
-            
-            for node_pb in snapshot.nodes:
-                self.graph_ops.add_node_from_proto(node_pb, timestamp)
-            
-            for link_pb in snapshot.links:
-                self.graph_ops.add_link_from_proto(link_pb, timestamp)
-            
-            self.adjacency_mgr.build_adjacency_matrix(self.graph_ops.graph)
-            self.graph_ops.last_update = timestamp
+            with self._update_lock, PerformanceLogger("graph update", logger, INGEST_SECONDS.labels('total')) as perf:
+                timestamp = datetime.fromisoformat(snapshot.timestamp.replace('Z', '+00:00'))
+                
+                # Readers keep seeing the previous generation until publish; a failed snapshot leaves it in place
+                builder = GraphBuilder()
+                with INGEST_SECONDS.labels('nodes').time():
+                    for node_pb in snapshot.nodes:
+                        builder.add_node_from_proto(node_pb, timestamp)
+                
+                with INGEST_SECONDS.labels('links').time():
+                    for link_pb in snapshot.links:
+                        builder.add_link_from_proto(link_pb, timestamp)
+                
+                if self._stability_source is not None:
+                    # Scored from the history as of the previous snapshot: this one's metrics are
+                    # recorded once it has been applied
+                    with INGEST_SECONDS.labels('stability').time():
+                        builder.score_stability(self._stability_source)
+                
+                with INGEST_SECONDS.labels('components').time():
+                    generation = builder.build(self.graph_ops.version + 1, timestamp)
+                with INGEST_SECONDS.labels('adjacency').time():
+                    self.adjacency_mgr.build_adjacency_matrix(generation.graph)
+                self.graph_ops.publish(generation)
             
+            log_graph_update(len(snapshot.nodes), len(snapshot.links), perf.elapsed_ms, generation.version)
             return True
             
         except Exception as e:
+            logger.opt(exception=e).error("Failed to apply graph snapshot: {}", e)
             return False
     
     def get_neighbors(self, node_id: str):
@@ -45,12 +75,48 @@ class GraphManager:
     def get_edge_count(self):
         return self.graph_ops.get_edge_count()
     
+    def get_graph(self, profile: Optional[str] = None):
+        return self.graph_ops.get_graph(profile)
+    
     def get_graph_copy(self):
         return self.graph_ops.get_graph_copy()
     
     def is_connected(self, src: str, dst: str):
         return self.graph_ops.is_connected(src, dst)
     
+    def get_component_count(self):
+        return self.graph_ops.get_component_count()
+    
+    def get_csr(self, profile: Optional[str] = None, generation: Optional[GraphGeneration] = None):
+        return self.graph_ops.get_csr(profile, generation)
+    
+    def get_edge_metrics(self, profile: Optional[str] = None, generation: Optional[GraphGeneration] = None):
+        return self.graph_ops.get_edge_metrics(profile, generation)
+    
+    def get_route_views(self, profile: Optional[str] = None):
+        return self.graph_ops.get_route_views(profile)
+    
+    def get_landmarks(self, count: int, profile: Optional[str] = None, generation: Optional[GraphGeneration] = None):
+        return self.graph_ops.get_landmarks(count, profile, generation)
+    
+    def get_edge_states(self, profile: Optional[str] = None, generation: Optional[GraphGeneration] = None):
+        return self.graph_ops.get_edge_states(profile, generation)
+    
+    def has_weight_profile(self, profile: str) -> bool:
+        return profile in WEIGHT_PROFILES
+    
+    def profile_view(self, profile: str) -> 'WeightProfileView':
+        return WeightProfileView(self, profile)
+    
+    def get_version(self):
+        return self.graph_ops.version
+    
+    def get_generation(self):
+        return self.graph_ops.current()
+    
+    def get_live_generation_count(self):
+        return live_generation_count()
+    
     def get_adjacency_matrix(self):
         return self.adjacency_mgr.get_adjacency_matrix()
     
@@ -67,4 +133,42 @@ class GraphManager:
         return self.stats.get_node_centralities()
     
     def get_critical_nodes(self, top_n: int = 5):
-        return self.stats.get_critical_nodes(top_n)
\ No newline at end of file
+        return self.stats.get_critical_nodes(top_n)
+    
+    def get_critical_ranking(self, top_n: int = 5):
+        return self.stats.get_critical_ranking(top_n)
+    
+    def prepare_critical_nodes(self):
+        self.stats.critical_nodes.prepare()
+    
+    def get_critical_node_stats(self):
+        return self.stats.critical_nodes.get_stats()
+
+
+class WeightProfileView:
+    # The graph priced under one weight profile. Algorithms and caches take it in place of the
+    # GraphManager; everything not weight-dependent is passed through
+    def __init__(self, graph_manager: GraphManager, profile: str):
+        self.graph_manager = graph_manager
+        self.profile = profile
+    
+    def __getattr__(self, name: str):
+        return getattr(self.graph_manager, name)
+    
+    def get_graph(self):
+        return self.graph_manager.get_graph(self.profile)
+    
+    def get_csr(self, generation: Optional[GraphGeneration] = None):
+        return self.graph_manager.get_csr(self.profile, generation)
+    
+    def get_edge_metrics(self, generation: Optional[GraphGeneration] = None):
+        return self.graph_manager.get_edge_metrics(self.profile, generation)
+    
+    def get_route_views(self):
+        return self.graph_manager.get_route_views(self.profile)
+    
+    def get_landmarks(self, count: int, generation: Optional[GraphGeneration] = None):
+        return self.graph_manager.get_landmarks(count, self.profile, generation)
+    
+    def get_edge_states(self, generation: Optional[GraphGeneration] = None):
+        return self.graph_manager.get_edge_states(self.profile, generation)
@@ -1,138 +1,297 @@
-import networkx as nx
 import numpy as np
-import threading
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 
 from .data_structures import NodeData, LinkData
+from .component_index import ComponentIndex
+from .csr_graph import CSRGraph, EDGE_METRIC_COLUMNS
+from .generation import GraphGeneration
+from .weight_profiles import COST_TERMS, DEFAULT_PROFILE, WEIGHT_PROFILES, bandwidth_penalty, profile_weights
+from ...utils.lazy import lazy_import
+
+nx = lazy_import("networkx")
 
 DOWN_NODE_PENALTY = 1e9    
 DOWN_LINK_PENALTY = 5e8   
 MIN_WEIGHT_FLOOR = 0.0001  
 
-class GraphOperations:
+class GraphBuilder:
+    # Assembles the next generation privately; nothing here is visible to readers until build()
     def __init__(self):
-        self.graph: nx.Graph = nx.Graph()
+        self.graph = nx.Graph()
         self.nodes_data: Dict[str, NodeData] = {}
         self.links_data: Dict[str, LinkData] = {}
-        self._lock = threading.RLock()
-        self.last_update: Optional[datetime] = None
-    
-    def clear_graph(self):
-        with self._lock:
-            self.graph.clear()
-            self.nodes_data.clear()
-            self.links_data.clear()
+        self.components = ComponentIndex()
+        self.edge_stability: Optional[np.ndarray] = None
     
     def add_node_from_proto(self, node_pb, timestamp: datetime):
-        with self._lock:
-            node_data = NodeData(
-                id=node_pb.id,
-                type=node_pb.type,
-                status=node_pb.status,
-                cpu_load=node_pb.metrics.cpu_load,
-                jitter_ms=node_pb.metrics.jitter_ms,
-                queue_len=node_pb.metrics.queue_len,
-                throughput_mbps=node_pb.metrics.throughput_mbps,
-                last_updated=timestamp
-            )
-            
-            self.nodes_data[node_pb.id] = node_data
-            self.graph.add_node(
-                node_pb.id,
-                type=node_pb.type,
-                status=node_pb.status,
-                cpu_load=node_pb.metrics.cpu_load,
-                jitter_ms=node_pb.metrics.jitter_ms,
-                queue_len=node_pb.metrics.queue_len,
-                throughput_mbps=node_pb.metrics.throughput_mbps
-            )
+        node_data = NodeData(
+            id=node_pb.id,
+            type=node_pb.type,
+            status=node_pb.status,
+            cpu_load=node_pb.metrics.cpu_load,
+            jitter_ms=node_pb.metrics.jitter_ms,
+            queue_len=node_pb.metrics.queue_len,
+            throughput_mbps=node_pb.metrics.throughput_mbps,
+            last_updated=timestamp
+        )
+        
+        self.nodes_data[node_pb.id] = node_data
+        self.graph.add_node(
+            node_pb.id,
+            type=node_pb.type,
+            status=node_pb.status,
+            cpu_load=node_pb.metrics.cpu_load,
+            jitter_ms=node_pb.metrics.jitter_ms,
+            queue_len=node_pb.metrics.queue_len,
+            throughput_mbps=node_pb.metrics.throughput_mbps
+        )
+        self.components.add_node(node_pb.id)
     
     def add_link_from_proto(self, link_pb, timestamp: datetime):
-        with self._lock:
-            link_id = f"{link_pb.src}_{link_pb.dst}"
-            link_data = LinkData(
-                src=link_pb.src,
-                dst=link_pb.dst,
-                available=link_pb.available,
-                delay_ms=link_pb.metrics.delay_ms,
-                jitter_ms=link_pb.metrics.jitter_ms,
-                loss_rate=link_pb.metrics.loss_rate,
-                bandwidth_mbps=link_pb.metrics.bandwidth_mbps,
-                last_updated=timestamp
-            )
-            self.links_data[link_id] = link_data
+        link_id = f"{link_pb.src}_{link_pb.dst}"
+        link_data = LinkData(
+            src=link_pb.src,
+            dst=link_pb.dst,
+            available=link_pb.available,
+            delay_ms=link_pb.metrics.delay_ms,
+            jitter_ms=link_pb.metrics.jitter_ms,
+            loss_rate=link_pb.metrics.loss_rate,
+            bandwidth_mbps=link_pb.metrics.bandwidth_mbps,
+            last_updated=timestamp
+        )
+        self.links_data[link_id] = link_data
+
+        delay_ms = link_pb.metrics.delay_ms or 0.0
+        jitter_ms = link_pb.metrics.jitter_ms or 0.0
+        loss_rate = link_pb.metrics.loss_rate or 0.0
+        bandwidth_term = bandwidth_penalty(link_pb.metrics.bandwidth_mbps or 0.0)
+        cpu_load = 0.0
+        queue_len = 0.0
 
-            bandwidth_mbps = link_pb.metrics.bandwidth_mbps or 0.0
-            bandwidth_penalty = 1000.0 / (bandwidth_mbps + 1.0)
+        node_penalty = 0.0
+        src_node = self.nodes_data.get(link_pb.src)
+        dst_node = self.nodes_data.get(link_pb.dst)
+        profile = WEIGHT_PROFILES[DEFAULT_PROFILE]
 
-            node_penalty = 0.0
-            src_node = self.nodes_data.get(link_pb.src)
-            dst_node = self.nodes_data.get(link_pb.dst)
+        for node in (src_node, dst_node):
+            if node:
+                node_penalty += node.cpu_load * profile.cpu_load + node.queue_len * profile.queue_len
+                cpu_load += node.cpu_load
+                queue_len += node.queue_len
 
-            if src_node:
-                node_penalty += src_node.cpu_load * 5.0 + src_node.queue_len * 0.5
-            if dst_node:
-                node_penalty += dst_node.cpu_load * 5.0 + dst_node.queue_len * 0.5
+        base_weight = (
+            delay_ms * profile.delay_ms +
+            jitter_ms * profile.jitter_ms +
+            loss_rate * profile.loss_rate +
+            bandwidth_term * profile.bandwidth_penalty +
+            node_penalty
+        )
 
-            base_weight = (
-                (link_pb.metrics.delay_ms or 0.0) +
-                (link_pb.metrics.jitter_ms or 0.0) * 2.0 +
-                (link_pb.metrics.loss_rate or 0.0) * 1000.0 +
-                bandwidth_penalty * 0.1 +
-                node_penalty
-            )
+        # Apply penalties for DOWN elements
+        penalized = False
+        penalty = 0.0
+        if not link_pb.available:
+            penalty = DOWN_LINK_PENALTY
+            penalized = True
+        if (src_node and src_node.status != 'UP') or (dst_node and dst_node.status != 'UP'):
+            penalty = DOWN_NODE_PENALTY
+            penalized = True
+        base_weight = max(base_weight, penalty)
 
-            # Apply penalties for DOWN elements
-            penalized = False
-            if not link_pb.available:
-                base_weight = max(base_weight, DOWN_LINK_PENALTY)
-                penalized = True
-            if (src_node and src_node.status != 'UP') or (dst_node and dst_node.status != 'UP'):
-                base_weight = max(base_weight, DOWN_NODE_PENALTY)
-                penalized = True
+        final_weight = max(base_weight, MIN_WEIGHT_FLOOR)
+
+        was_available = (
+            self.graph.has_edge(link_pb.src, link_pb.dst) and
+            self.graph[link_pb.src][link_pb.dst].get('available', False)
+        )
+        if link_pb.available:
+            self.components.add_edge(link_pb.src, link_pb.dst)
+        elif was_available:
+            self.components.mark_dirty()
+
+        self.graph.add_edge(
+            link_pb.src,
+            link_pb.dst,
+            weight=final_weight,
+            delay_ms=link_pb.metrics.delay_ms,
+            jitter_ms=link_pb.metrics.jitter_ms,
+            loss_rate=link_pb.metrics.loss_rate,
+            bandwidth_mbps=link_pb.metrics.bandwidth_mbps,
+            available=link_pb.available,
+            penalized=penalized,
+            link_id=link_id,
+            # Priced again under every other weight profile in build(); the DOWN penalty takes the
+            # place of instability, which is only known once every link is in
+            cost_terms=(delay_ms, jitter_ms, loss_rate, bandwidth_term, cpu_load, queue_len, penalty)
+        )
+    
+    def score_stability(self, link_stability: Callable[[List[str]], np.ndarray]):
+        # One vectorised pass over every link's history, in graph.edges() order
+        self.edge_stability = link_stability([link_id for _, _, link_id in self.graph.edges(data='link_id')])
+    
+    def build(self, version: int, last_update: datetime) -> GraphGeneration:
+        if self.components.is_dirty():
+            self.components.rebuild(self.graph)
+        else:
+            self.components.get_labels()
+        ingest = np.array([terms for _, _, terms in self.graph.edges(data='cost_terms')],
+                          dtype=np.float64).reshape(-1, len(COST_TERMS))
+        stability = self.edge_stability if self.edge_stability is not None else np.ones(len(ingest))
+        terms = np.column_stack((ingest[:, :-1], 1.0 - stability))
+        floors = ingest[:, -1]
+        weights = profile_weights(terms, floors, MIN_WEIGHT_FLOOR)
+        
+        default = WEIGHT_PROFILES[DEFAULT_PROFILE]
+        if default.instability:
+            # Ingest priced the default profile without instability; add it now that it is known
+            repriced = np.maximum(np.maximum(terms @ np.array(default.coefficients()), floors), MIN_WEIGHT_FLOOR)
+            for (_, _, data), weight in zip(self.graph.edges(data=True), repriced.tolist()):
+                data['weight'] = weight
+        return GraphGeneration(nx.freeze(self.graph), self.nodes_data, self.links_data, self.components, version, last_update,
+                               weights, stability)
 
-            final_weight = max(base_weight, MIN_WEIGHT_FLOOR)
 
-            self.graph.add_edge(
-                link_pb.src,
-                link_pb.dst,
-                weight=final_weight,
-                delay_ms=link_pb.metrics.delay_ms,
-                jitter_ms=link_pb.metrics.jitter_ms,
-                loss_rate=link_pb.metrics.loss_rate,
-                bandwidth_mbps=link_pb.metrics.bandwidth_mbps,
-                available=link_pb.available,
-                penalized=penalized
-            )
+class GraphOperations:
+    # Readers take the current generation and never lock; a writer builds the next one with a
+    # GraphBuilder and publishes it by swapping the pointer. A generation is freed once the
+    # last reader still holding it lets go
+    def __init__(self):
+        self._current = GraphGeneration.empty()
+    
+    def current(self) -> GraphGeneration:
+        return self._current
+    
+    def publish(self, generation: GraphGeneration):
+        self._current = generation
+    
+    @property
+    def graph(self) -> "nx.Graph":
+        return self._current.graph
+    
+    @property
+    def version(self) -> int:
+        return self._current.version
+    
+    @property
+    def last_update(self) -> Optional[datetime]:
+        return self._current.last_update
+    
+    @property
+    def nodes_data(self) -> Dict[str, NodeData]:
+        return self._current.nodes_data
+    
+    @property
+    def links_data(self) -> Dict[str, LinkData]:
+        return self._current.links_data
     
     def get_neighbors(self, node_id: str) -> List[str]:
-        with self._lock:
-            if node_id not in self.graph:
-                return []
-            return list(self.graph.neighbors(node_id))
+        graph = self._current.graph
+        if node_id not in graph:
+            return []
+        return list(graph.neighbors(node_id))
     
     def get_edge_weight(self, src: str, dst: str) -> float:
-        with self._lock:
-            if self.graph.has_edge(src, dst):
-                return self.graph[src][dst].get('weight', np.inf)
-            return np.inf
+        graph = self._current.graph
+        if graph.has_edge(src, dst):
+            return graph[src][dst].get('weight', np.inf)
+        return np.inf
+    
+    def get_graph(self, profile: Optional[str] = None) -> "nx.Graph":
+        # Frozen: safe to share, but mutating it raises. Use get_graph_copy() to modify
+        return self._graph(self._current, profile)
+    
+    def _graph(self, generation: GraphGeneration, profile: Optional[str]) -> "nx.Graph":
+        if not profile or profile == DEFAULT_PROFILE:
+            return generation.graph
+        
+        def build():
+            weights = self._profile_weights(generation, profile)
+            graph = generation.graph.copy()
+            for (src, dst), weight in zip(generation.graph.edges(), weights.tolist()):
+                graph[src][dst]['weight'] = weight
+            return nx.freeze(graph)
+        return generation.derived(f'graph:{profile}', build)
+    
+    def get_graph_copy(self) -> "nx.Graph":
+        return self._current.graph.copy()
+    
+    def get_edge_states(self, profile: Optional[str] = None,
+                        generation: Optional[GraphGeneration] = None) -> Dict[Tuple[str, str], Tuple[float, bool]]:
+        # Callers that combine several views pass the generation they read the version from
+        generation = self._current if generation is None else generation
+        
+        def build():
+            weights = None
+            if profile and profile != DEFAULT_PROFILE:
+                weights = iter(self._profile_weights(generation, profile).tolist())
+            states = {}
+            for src, dst, data in generation.graph.edges(data=True):
+                key = (src, dst) if src <= dst else (dst, src)
+                weight = next(weights) if weights is not None else data.get('weight', 1.0)
+                states[key] = (weight, data.get('available', True))
+            return states
+        return generation.derived(f'edge_states:{profile or DEFAULT_PROFILE}', build)
     
-    def get_graph_copy(self) -> nx.Graph:
-        with self._lock:
-            return self.graph.copy()
+    def get_csr(self, profile: Optional[str] = None, generation: Optional[GraphGeneration] = None) -> CSRGraph:
+        return self._csr(self._current if generation is None else generation, profile)
+    
+    def get_landmarks(self, count: int, profile: Optional[str] = None,
+                      generation: Optional[GraphGeneration] = None) -> Tuple[CSRGraph, np.ndarray]:
+        generation = self._current if generation is None else generation
+        csr = self._csr(generation, profile)
+        return csr, generation.derived(f'landmarks:{count}:{profile or DEFAULT_PROFILE}', lambda: csr.landmark_distances(count))
+    
+    def get_edge_metrics(self, profile: Optional[str] = None,
+                         generation: Optional[GraphGeneration] = None) -> Tuple[CSRGraph, np.ndarray]:
+        return self._edge_metrics(self._current if generation is None else generation, profile)
+    
+    def get_route_views(self, profile: Optional[str] = None) -> Tuple["nx.Graph", CSRGraph, np.ndarray]:
+        # Graph, CSR and edge metrics of one generation, so a path found on the graph can be scored
+        # by gathering from the arrays
+        generation = self._current
+        return (self._graph(generation, profile), *self._edge_metrics(generation, profile))
+    
+    def _edge_metrics(self, generation: GraphGeneration, profile: Optional[str]) -> Tuple[CSRGraph, np.ndarray]:
+        csr = self._csr(generation, profile)
+        
+        def build():
+            # A generation's graph never changes, so graph.edges() is still in the CSR's edge order
+            columns = EDGE_METRIC_COLUMNS[:-1]
+            metrics = np.empty((generation.graph.number_of_edges(), len(EDGE_METRIC_COLUMNS)), dtype=np.float64)
+            metrics[:, :-1] = np.array(
+                [tuple(data.get(key, 0.0) for key in columns) for _, _, data in generation.graph.edges(data=True)],
+                dtype=np.float64).reshape(-1, len(columns))
+            metrics[:, -1] = generation.edge_stability if generation.edge_stability is not None else 1.0
+            return metrics
+        if csr.edge_metrics is None:
+            csr.edge_metrics = generation.derived('edge_metrics', build)
+        return csr, csr.edge_metrics
+    
+    def _csr(self, generation: GraphGeneration, profile: Optional[str]) -> CSRGraph:
+        csr = generation.derived('csr', lambda: CSRGraph.from_graph(generation.graph, generation.version))
+        if not profile or profile == DEFAULT_PROFILE:
+            return csr
+        return generation.derived(f'csr:{profile}', lambda: csr.with_weights(self._profile_weights(generation, profile)))
+    
+    @staticmethod
+    def _profile_weights(generation: GraphGeneration, profile: str) -> np.ndarray:
+        weights = generation.profile_weights.get(profile)
+        if weights is None:
+            if profile not in WEIGHT_PROFILES:
+                raise KeyError(f"Unknown weight profile: {profile}")
+            # Only the empty generation has no priced edges
+            weights = np.zeros(generation.graph.number_of_edges())
+        return weights
     
     def is_connected(self, src: str, dst: str) -> bool:
-        with self._lock:
-            try:
-                return nx.has_path(self.graph, src, dst)
-            except nx.NodeNotFound:
-                return False
+        return self._current.components.is_connected(src, dst)
+    
+    def get_component_count(self) -> int:
+        return self._current.components.get_component_count()
     
     def get_node_count(self) -> int:
-        with self._lock:
-            return len(self.graph.nodes())
+        return self._current.graph.number_of_nodes()
     
     def get_edge_count(self) -> int:
-        with self._lock:
-            return len(self.graph.edges())
\ No newline at end of file
+        return self._current.graph.number_of_edges()
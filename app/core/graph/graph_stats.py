@@ -1,92 +1,93 @@
-import networkx as nx
-import threading
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 from datetime import datetime
+from .critical_nodes import CriticalNode, CriticalNodeIndex
+from ...utils.lazy import lazy_import
+
+nx = lazy_import("networkx")
 
 
 class GraphStats:
     def __init__(self, graph_operations):
         self.graph_ops = graph_operations
+        self.critical_nodes = CriticalNodeIndex(graph_operations)
     
     def get_graph_stats(self) -> Dict:
-        with self.graph_ops._lock:
-            if not self.graph_ops.graph.nodes():
-                return {"nodes": 0, "edges": 0, "connected": False}
-                
-            return {
-                "nodes": len(self.graph_ops.graph.nodes()),
-                "edges": len(self.graph_ops.graph.edges()),
-                "connected": nx.is_connected(self.graph_ops.graph),
-                "average_degree": self._calculate_average_degree(),
-                "last_update": self.graph_ops.last_update.isoformat() if self.graph_ops.last_update else None,
-                "density": nx.density(self.graph_ops.graph),
-                "diameter": self._safe_diameter(),
-                "clustering_coefficient": self._safe_clustering()
-            }
+        # Computed once per generation, outside any lock: ingestion and other readers never wait on it
+        generation = self.graph_ops.current()
+        return dict(generation.derived('graph_stats', lambda: self._graph_stats(generation)))
+    
+    def _graph_stats(self, generation) -> Dict:
+        graph = generation.graph
+        if not graph.nodes():
+            return {"nodes": 0, "edges": 0, "connected": False}
+            
+        return {
+            "nodes": len(graph.nodes()),
+            "edges": len(graph.edges()),
+            "connected": nx.is_connected(graph),
+            "average_degree": self._calculate_average_degree(graph),
+            "last_update": generation.last_update.isoformat() if generation.last_update else None,
+            "density": nx.density(graph),
+            "diameter": self._safe_diameter(graph),
+            "clustering_coefficient": self._safe_clustering(graph)
+        }
     
-    def _calculate_average_degree(self) -> float:
-        if not self.graph_ops.graph.nodes():
+    def _calculate_average_degree(self, graph: "nx.Graph") -> float:
+        if not graph.nodes():
             return 0.0
-        return sum(dict(self.graph_ops.graph.degree()).values()) / len(self.graph_ops.graph.nodes())
+        return sum(dict(graph.degree()).values()) / len(graph.nodes())
     
-    def _safe_diameter(self) -> Optional[int]:
+    def _safe_diameter(self, graph: "nx.Graph") -> Optional[int]:
         try:
-            if nx.is_connected(self.graph_ops.graph):
-                return nx.diameter(self.graph_ops.graph)
+            if nx.is_connected(graph):
+                return nx.diameter(graph)
             return None
         except:
             return None
     
-    def _safe_clustering(self) -> float:
+    def _safe_clustering(self, graph: "nx.Graph") -> float:
         try:
-            return nx.average_clustering(self.graph_ops.graph)
+            return nx.average_clustering(graph)
         except:
             return 0.0
     
     def get_node_centralities(self) -> Dict[str, Dict[str, float]]:
-        with self.graph_ops._lock:
-            if not self.graph_ops.graph.nodes():
-                return {}
+        # Exact betweenness is the expensive part; one reader computes it per generation, the rest reuse it
+        generation = self.graph_ops.current()
+        return generation.derived('centralities', lambda: self._node_centralities(generation.graph))
+    
+    def _node_centralities(self, graph: "nx.Graph") -> Dict[str, Dict[str, float]]:
+        if not graph.nodes():
+            return {}
+        
+        try:
+            centralities = {}
+            
+            degree_cent = nx.degree_centrality(graph)
+            
+            betweenness_cent = nx.betweenness_centrality(graph)
             
-            try:
-                centralities = {}
-                
-                degree_cent = nx.degree_centrality(self.graph_ops.graph)
-                
-                betweenness_cent = nx.betweenness_centrality(self.graph_ops.graph)
-                
-                if nx.is_connected(self.graph_ops.graph):
-                    closeness_cent = nx.closeness_centrality(self.graph_ops.graph)
-                else:
-                    closeness_cent = {node: 0.0 for node in self.graph_ops.graph.nodes()}
-                
-                for node in self.graph_ops.graph.nodes():
-                    centralities[node] = {
-                        'degree': degree_cent.get(node, 0.0),
-                        'betweenness': betweenness_cent.get(node, 0.0),
-                        'closeness': closeness_cent.get(node, 0.0)
-                    }
-                
-                return centralities
-                
-            except Exception as e:
-                pass 
-                return {}
+            if nx.is_connected(graph):
+                closeness_cent = nx.closeness_centrality(graph)
+            else:
+                closeness_cent = {node: 0.0 for node in graph.nodes()}
+            
+            for node in graph.nodes():
+                centralities[node] = {
+                    'degree': degree_cent.get(node, 0.0),
+                    'betweenness': betweenness_cent.get(node, 0.0),
+                    'closeness': closeness_cent.get(node, 0.0)
+                }
+            
+            return centralities
+            
+        except Exception as e:
+            pass 
+            return {}
     
     def get_critical_nodes(self, top_n: int = 5) -> List[str]:
-        centralities = self.get_node_centralities()
-        
-        if not centralities:
-            return []
-        
-        node_scores = {}
-        for node, cents in centralities.items():
-            score = (
-                cents['degree'] * 0.4 +
-                cents['betweenness'] * 0.4 +
-                cents['closeness'] * 0.2
-            )
-            node_scores[node] = score
-        
-        sorted_nodes = sorted(node_scores.items(), key=lambda x: x[1], reverse=True)
-        return [node for node, score in sorted_nodes[:top_n]]
\ No newline at end of file
+        # Ranked from approximate centralities kept per graph version, not from get_node_centralities
+        return self.critical_nodes.get_critical_nodes(top_n)
+    
+    def get_critical_ranking(self, top_n: int = 5) -> Tuple[int, List[CriticalNode]]:
+        return self.critical_nodes.get_ranking(top_n)
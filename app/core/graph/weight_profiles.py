@@ -0,0 +1,73 @@
+import json
+import os
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_PROFILE = "default"
+
+# Per-edge cost terms, in column order; a profile weighs each of them. All but instability
+# (1 - the link's long-run stability score) are kept at ingest
+COST_TERMS = ('delay_ms', 'jitter_ms', 'loss_rate', 'bandwidth_penalty', 'cpu_load', 'queue_len', 'instability')
+
+
+@dataclass(frozen=True)
+class WeightProfile:
+    # Coefficient of each cost term; cpu_load and queue_len are summed over both endpoints
+    delay_ms: float = 1.0
+    jitter_ms: float = 2.0
+    loss_rate: float = 1000.0
+    bandwidth_penalty: float = 0.1
+    cpu_load: float = 5.0
+    queue_len: float = 0.5
+    instability: float = 0.0
+
+    def coefficients(self) -> List[float]:
+        return [getattr(self, term) for term in COST_TERMS]
+
+
+BUILTIN_PROFILES: Dict[str, WeightProfile] = {
+    DEFAULT_PROFILE: WeightProfile(),
+    # Queueing and jitter are what add latency; bandwidth barely matters
+    "latency": WeightProfile(delay_ms=1.0, jitter_ms=1.0, loss_rate=200.0, bandwidth_penalty=0.0, cpu_load=1.0, queue_len=1.0),
+    "bandwidth": WeightProfile(delay_ms=0.1, jitter_ms=0.2, loss_rate=100.0, bandwidth_penalty=10.0, cpu_load=1.0, queue_len=0.1),
+    "reliability": WeightProfile(delay_ms=0.2, jitter_ms=4.0, loss_rate=10000.0, bandwidth_penalty=0.05, cpu_load=10.0, queue_len=1.0,
+                                 instability=200.0),
+}
+
+
+def bandwidth_penalty(bandwidth_mbps: float) -> float:
+    return 1000.0 / (bandwidth_mbps + 1.0)
+
+
+def load_profiles(spec: Optional[str] = None) -> Dict[str, WeightProfile]:
+    # HEURISTIC_WEIGHT_PROFILES='{"video": {"jitter_ms": 8, "loss_rate": 5000}}' adds or overrides
+    # profiles; terms left out keep the default profile's coefficient
+    if spec is None:
+        spec = os.environ.get("HEURISTIC_WEIGHT_PROFILES", "")
+    profiles = dict(BUILTIN_PROFILES)
+    if spec:
+        known = {f.name for f in fields(WeightProfile)}
+        for name, coefficients in json.loads(spec).items():
+            unknown = set(coefficients) - known
+            if unknown:
+                raise ValueError(f"Weight profile {name!r} has unknown terms: {', '.join(sorted(unknown))}")
+            profiles[name] = WeightProfile(**{term: float(value) for term, value in coefficients.items()})
+    return profiles
+
+
+WEIGHT_PROFILES = load_profiles()
+
+
+def profile_weights(terms: np.ndarray, floors: np.ndarray, min_weight: float) -> Dict[str, np.ndarray]:
+    # One matrix product prices every edge under every non-default profile; the default profile's
+    # weights are the graph's own 'weight' attribute
+    names = [name for name in WEIGHT_PROFILES if name != DEFAULT_PROFILE]
+    if not names:
+        return {}
+    coefficients = np.array([WEIGHT_PROFILES[name].coefficients() for name in names], dtype=np.float64)
+    weights = terms @ coefficients.T
+    np.maximum(weights, floors[:, None], out=weights)
+    np.maximum(weights, min_weight, out=weights)
+    return {name: np.ascontiguousarray(weights[:, i]) for i, name in enumerate(names)}
@@ -1,3 +1,8 @@
+import time
+
+# Taken before the heavy imports so CheckHealth can report the full cold-start cost
+PROCESS_START = time.monotonic()
+
 import asyncio
 import os
 import sys
@@ -7,26 +12,65 @@ if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
 import grpc
-from proto import heuristic_pb2_grpc, algorithm_stream_pb2_grpc
+from proto import heuristic_pb2_grpc, algorithm_stream_pb2_grpc, admin_pb2_grpc
 from app.services.heuristic_service import HeuristicServiceServicer
+from app.services.admin_service import AdminServiceServicer
+from app.utils.instrumentation import start_metrics_server
+from app.utils.lazy import prefetch
+from app.utils.logger import get_logger
+from app.utils.server_config import ServerConfig
+
+logger = get_logger(__name__)
 
 
 async def serve() -> None:
-    server = grpc.aio.server()
+    config = ServerConfig.from_env()
+    server = config.create_server()
     servicer = HeuristicServiceServicer()
+    admin = AdminServiceServicer(graph_manager=servicer.graph_manager)
+    # cprofile captures follow route searches onto the executor threads
+    admin.profiler.install(asyncio.get_running_loop())
     
-    # Register both services
+    # Register the routing services and the admin (profiling, health) service
     heuristic_pb2_grpc.add_HeuristicServiceServicer_to_server(servicer, server)
     algorithm_stream_pb2_grpc.add_AlgorithmStreamServiceServicer_to_server(servicer, server)
 
-    listen_addr = os.environ.get("HEURISTIC_LISTEN", "0.0.0.0:50052")
-    server.add_insecure_port(listen_addr)
+    # Admin gets its own server when HEURISTIC_ADMIN_LISTEN is set, with default limits
+    admin_server = None
+    if config.admin_listen:
+        admin_server = grpc.aio.server()
+        admin_pb2_grpc.add_AdminServiceServicer_to_server(admin, admin_server)
+        admin_server.add_insecure_port(config.admin_listen)
+    else:
+        admin_pb2_grpc.add_AdminServiceServicer_to_server(admin, server)
+
+    # Prometheus text exposition, e.g. HEURISTIC_METRICS_LISTEN=127.0.0.1:9102
+    start_metrics_server(os.environ.get("HEURISTIC_METRICS_LISTEN", ""))
+
+    server.add_insecure_port(config.listen)
+    if admin_server is not None:
+        await admin_server.start()
     await server.start()
+    admin.mark_serving(PROCESS_START)
+    logger.info("Listening on {} after {:.0f} ms", config.listen, admin.startup_s * 1000.0)
+    if admin_server is not None:
+        logger.info("Admin service listening on {}", config.admin_listen)
+
+    # networkx is imported lazily; warm it now so the first UpdateGraph does not pay for it
+    prefetch("networkx")
+
+    # The server answers immediately; a checkpoint, if any, is restored in the background
+    checkpoint_task = None
+    if servicer.checkpoints is not None:
+        checkpoint_task = asyncio.create_task(servicer.run_checkpoints())
+
     await server.wait_for_termination()
+    if admin_server is not None:
+        await admin_server.stop(None)
 
 
 if __name__ == "__main__":
     try:
         asyncio.run(serve())
     except KeyboardInterrupt:
-        print("Shutting down server")
+        logger.info("Shutting down server")
@@ -0,0 +1,57 @@
+import time
+from typing import Any, Optional
+
+from proto import admin_pb2, admin_pb2_grpc
+from .profiler import Profiler, ProfileBusyError
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class AdminServiceServicer(admin_pb2_grpc.AdminServiceServicer):
+    def __init__(self, profiler: Profiler = None, graph_manager=None):
+        self.profiler = profiler or Profiler()
+        self.graph_manager = graph_manager
+        self.serving_since: Optional[float] = None
+        self.startup_s = 0.0
+
+    def mark_serving(self, process_start: float):
+        # Both monotonic; called once the port is bound
+        self.serving_since = time.monotonic()
+        self.startup_s = self.serving_since - process_start
+
+    async def CheckHealth(self, request: admin_pb2.HealthRequest, context: Any) -> admin_pb2.HealthResponse:
+        # Cheap by design: no graph locks and nothing that would pull in deferred imports
+        version = self.graph_manager.get_version() if self.graph_manager is not None else 0
+        return admin_pb2.HealthResponse(
+            status="SERVING" if version > 0 else "NOT_SERVING",
+            graph_version=version,
+            uptime_s=time.monotonic() - self.serving_since if self.serving_since is not None else 0.0,
+            startup_s=self.startup_s
+        )
+    
+    async def CaptureProfile(self, request: admin_pb2.ProfileRequest, context: Any) -> admin_pb2.ProfileResponse:
+        try:
+            result = await self.profiler.capture(
+                mode=request.mode,
+                duration_s=request.duration_s,
+                request_count=request.request_count,
+                trace_memory=request.trace_memory,
+                top_n=request.top_n,
+                sample_interval_ms=request.sample_interval_ms
+            )
+        except (ProfileBusyError, ValueError) as e:
+            return admin_pb2.ProfileResponse(success=False, message=str(e))
+        except Exception as e:
+            logger.opt(exception=e).error("Profile capture failed: {}", e)
+            return admin_pb2.ProfileResponse(success=False, message=f"Profile capture failed: {str(e)}")
+        
+        return admin_pb2.ProfileResponse(
+            success=True,
+            mode=result.mode,
+            duration_s=result.duration_s,
+            requests_seen=result.requests_seen,
+            samples=result.samples,
+            profile=result.profile,
+            memory=result.memory
+        )
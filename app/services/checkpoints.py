@@ -0,0 +1,209 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from proto import heuristic_pb2
+from ..analysis import HistoryColumns
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CHECKPOINT_FORMAT = 1
+DEFAULT_INTERVAL_S = 60.0
+DEFAULT_KEEP = 2
+LATEST_FILE = "LATEST"
+
+
+@dataclass
+class GraphColumns:
+    timestamp: str
+    node_ids: np.ndarray
+    node_types: np.ndarray
+    node_status: np.ndarray
+    node_metrics: np.ndarray      # (N, 4): cpu_load, jitter_ms, queue_len, throughput_mbps
+    link_src: np.ndarray
+    link_dst: np.ndarray
+    link_available: np.ndarray
+    link_metrics: np.ndarray      # (E, 4): delay_ms, jitter_ms, loss_rate, bandwidth_mbps
+
+
+@dataclass
+class Checkpoint:
+    path: str
+    graph_version: int
+    created_at: float
+    graph: GraphColumns
+    history: Optional[HistoryColumns]
+
+
+def capture_graph(graph_manager) -> Tuple[List, List, str]:
+    # A generation never changes once published, so one read of the pointer gives a consistent view
+    generation = graph_manager.get_generation()
+    nodes = list(generation.nodes_data.values())
+    links = list(generation.links_data.values())
+    timestamp = generation.last_update.isoformat() if generation.last_update else ""
+    return nodes, links, timestamp
+
+
+def graph_columns(nodes: List, links: List, timestamp: str) -> GraphColumns:
+    return GraphColumns(
+        timestamp=timestamp,
+        node_ids=np.array([n.id for n in nodes], dtype=str),
+        node_types=np.array([n.type for n in nodes], dtype=str),
+        node_status=np.array([n.status for n in nodes], dtype=str),
+        node_metrics=np.array(
+            [(n.cpu_load, n.jitter_ms, n.queue_len, n.throughput_mbps) for n in nodes], dtype=np.float64
+        ).reshape(-1, 4),
+        link_src=np.array([l.src for l in links], dtype=str),
+        link_dst=np.array([l.dst for l in links], dtype=str),
+        link_available=np.array([l.available for l in links], dtype=bool),
+        link_metrics=np.array(
+            [(l.delay_ms, l.jitter_ms, l.loss_rate, l.bandwidth_mbps) for l in links], dtype=np.float64
+        ).reshape(-1, 4)
+    )
+
+
+def snapshot_from_columns(columns: GraphColumns) -> heuristic_pb2.GraphSnapshot:
+    # Rebuilding through a GraphSnapshot keeps weight derivation in one place (GraphOperations)
+    snapshot = heuristic_pb2.GraphSnapshot(timestamp=columns.timestamp)
+    node_metrics = columns.node_metrics.tolist()
+    for node_id, node_type, status, metrics in zip(columns.node_ids.tolist(), columns.node_types.tolist(),
+                                                   columns.node_status.tolist(), node_metrics):
+        snapshot.nodes.add(
+            id=node_id,
+            type=node_type,
+            status=status,
+            metrics=heuristic_pb2.NodeMetric(
+                cpu_load=metrics[0],
+                jitter_ms=metrics[1],
+                queue_len=int(metrics[2]),
+                throughput_mbps=metrics[3]
+            )
+        )
+
+    link_metrics = columns.link_metrics.tolist()
+    for src, dst, available, metrics in zip(columns.link_src.tolist(), columns.link_dst.tolist(),
+                                            columns.link_available.tolist(), link_metrics):
+        snapshot.links.add(
+            src=src,
+            dst=dst,
+            available=available,
+            metrics=heuristic_pb2.LinkMetric(
+                delay_ms=metrics[0],
+                jitter_ms=metrics[1],
+                loss_rate=metrics[2],
+                bandwidth_mbps=metrics[3]
+            )
+        )
+    return snapshot
+
+
+class CheckpointManager:
+    def __init__(self, directory: str, interval_s: Optional[float] = None, keep: Optional[int] = None):
+        if interval_s is None:
+            interval_s = float(os.environ.get("HEURISTIC_CHECKPOINT_INTERVAL_S", DEFAULT_INTERVAL_S))
+        if keep is None:
+            keep = int(os.environ.get("HEURISTIC_CHECKPOINT_KEEP", DEFAULT_KEEP))
+        self.directory = directory
+        self.interval_s = interval_s
+        self.keep = max(1, keep)
+        self.saved_version: Optional[int] = None
+
+    def latest(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.directory, LATEST_FILE)) as f:
+                name = f.read().strip()
+        except OSError:
+            return None
+        path = os.path.join(self.directory, name)
+        return path if name and os.path.isdir(path) else None
+
+    def save(self, graph: GraphColumns, history: Optional[HistoryColumns], graph_version: int) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        created_at = time.time()
+        name = f"ckpt-{int(created_at * 1000)}"
+        staging = tempfile.mkdtemp(prefix=".tmp-", dir=self.directory)
+        try:
+            arrays = self._arrays("graph", graph)
+            if history is not None:
+                arrays.update(self._arrays("history", history))
+            for key, array in arrays.items():
+                np.save(os.path.join(staging, f"{key}.npy"), array, allow_pickle=False)
+
+            meta = {
+                'format': CHECKPOINT_FORMAT,
+                'graph_version': graph_version,
+                'created_at': created_at,
+                'timestamp': graph.timestamp,
+                'has_history': history is not None
+            }
+            with open(os.path.join(staging, "meta.json"), "w") as f:
+                json.dump(meta, f)
+
+            path = os.path.join(self.directory, name)
+            os.replace(staging, path)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        # The pointer flips only once the checkpoint directory is complete
+        pointer = os.path.join(self.directory, LATEST_FILE)
+        with open(pointer + ".tmp", "w") as f:
+            f.write(name)
+        os.replace(pointer + ".tmp", pointer)
+
+        self.saved_version = graph_version
+        self._prune()
+        return path
+
+    def load(self, path: Optional[str] = None) -> Optional[Checkpoint]:
+        path = path or self.latest()
+        if path is None:
+            return None
+
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get('format') != CHECKPOINT_FORMAT:
+            logger.warning("Ignoring checkpoint {} with format {}", path, meta.get('format'))
+            return None
+
+        # Memory-mapped: pages are only read as rows are actually used
+        def column(key: str) -> np.ndarray:
+            return np.load(os.path.join(path, f"{key}.npy"), mmap_mode="r", allow_pickle=False)
+
+        graph = GraphColumns(timestamp=meta['timestamp'], **{
+            f.name: column(f"graph.{f.name}") for f in fields(GraphColumns) if f.name != 'timestamp'
+        })
+        history = None
+        if meta.get('has_history'):
+            # Optional columns (the rollups) may be missing from checkpoints written without them
+            history = HistoryColumns(**{
+                f.name: column(f"history.{f.name}") for f in fields(HistoryColumns)
+                if os.path.exists(os.path.join(path, f"history.{f.name}.npy"))
+            })
+
+        return Checkpoint(
+            path=path,
+            graph_version=meta['graph_version'],
+            created_at=meta['created_at'],
+            graph=graph,
+            history=history
+        )
+
+    @staticmethod
+    def _arrays(prefix: str, columns) -> Dict[str, np.ndarray]:
+        return {
+            f"{prefix}.{f.name}": getattr(columns, f.name)
+            for f in fields(columns) if isinstance(getattr(columns, f.name), np.ndarray)
+        }
+
+    def _prune(self):
+        names = sorted(n for n in os.listdir(self.directory) if n.startswith("ckpt-"))
+        for name in names[:-self.keep]:
+            shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
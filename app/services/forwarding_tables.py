@@ -0,0 +1,243 @@
+import asyncio
+import os
+import threading
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..core.graph import CSRGraph
+from ..core.graph.csr_graph import shortest_path_tree
+
+DEFAULT_POOL_MIN_NODES = 2000
+MAX_TRACKED_REMOVALS = 10000
+# Destination list meaning every node in the graph, as long as it stays under the destination cap
+ALL_DESTINATIONS = "*"
+DEFAULT_MAX_DESTINATIONS = 1000
+# Relative cost change that re-sends a row whose next hops did not change
+DEFAULT_COST_TOLERANCE = 0.01
+
+
+@dataclass
+class ForwardingTableDelta:
+    version: int
+    full: bool
+    rows: Dict[str, List[Tuple[str, str, float]]]
+    removed: List[str]
+
+
+def _build_tree_columns(indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray, destinations: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+    next_hops = np.empty((len(indptr) - 1, len(destinations)), dtype=np.int32)
+    costs = np.empty((len(indptr) - 1, len(destinations)), dtype=np.float64)
+
+    ptr, adj, wts = indptr.tolist(), indices.tolist(), weights.tolist()
+    for col, dest in enumerate(destinations):
+        # On an undirected graph the tree rooted at dest gives every node its next hop towards it
+        dist, parent = shortest_path_tree(ptr, adj, wts, dest)
+        next_hops[:, col] = parent
+        costs[:, col] = dist
+    return next_hops, costs
+
+
+class ForwardingTableManager:
+    def __init__(self, graph_manager, destinations: Optional[List[str]] = None, pool_min_nodes: Optional[int] = None, workers: Optional[int] = None,
+                 max_destinations: Optional[int] = None, cost_tolerance: Optional[float] = None):
+        self.graph_manager = graph_manager
+
+        if destinations is None:
+            configured = os.environ.get("HEURISTIC_FORWARDING_DESTINATIONS", "")
+            destinations = [d.strip() for d in configured.split(",") if d.strip()]
+        if not destinations:
+            # Every node as a destination is an N x N table; that has to be asked for
+            raise ValueError(f"Forwarding tables need HEURISTIC_FORWARDING_DESTINATIONS (node IDs, or {ALL_DESTINATIONS!r} for every node)")
+        self.destinations = destinations
+        if max_destinations is None:
+            max_destinations = int(os.environ.get("HEURISTIC_FORWARDING_MAX_DESTINATIONS", DEFAULT_MAX_DESTINATIONS))
+        self.max_destinations = max_destinations
+        if cost_tolerance is None:
+            cost_tolerance = float(os.environ.get("HEURISTIC_FORWARDING_COST_TOLERANCE", DEFAULT_COST_TOLERANCE))
+        self.cost_tolerance = cost_tolerance
+
+        if pool_min_nodes is None:
+            pool_min_nodes = int(os.environ.get("HEURISTIC_FORWARDING_POOL_MIN_NODES", DEFAULT_POOL_MIN_NODES))
+        self.pool_min_nodes = pool_min_nodes
+        self.workers = workers or int(os.environ.get("HEURISTIC_FORWARDING_WORKERS", os.cpu_count() or 1))
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+        self.version = 0
+        self._node_ids: List[str] = []
+        self._dest_ids: List[str] = []
+        self._next_hops: Optional[np.ndarray] = None
+        self._costs: Optional[np.ndarray] = None
+        # Costs as of each row's last change, so drift below the tolerance cannot add up unseen
+        self._sent_costs: Optional[np.ndarray] = None
+        self._row_versions: Dict[str, int] = {}
+        self._removed_at: Dict[str, int] = {}
+        self._removal_horizon = 0
+
+        self._listeners: Set[asyncio.Queue] = set()
+        self._rebuild_lock = threading.Lock()
+        self._lock = threading.Lock()
+
+    def rebuild(self) -> int:
+        with self._rebuild_lock:
+            return self._rebuild()
+
+    def _rebuild(self) -> int:
+        csr = self.graph_manager.get_csr()
+
+        if self.destinations == [ALL_DESTINATIONS]:
+            dest_ids = list(csr.node_ids)
+        else:
+            dest_ids = [d for d in self.destinations if d in csr.node_index_map]
+        if len(dest_ids) > self.max_destinations:
+            raise ValueError(f"{len(dest_ids)} forwarding destinations exceed HEURISTIC_FORWARDING_MAX_DESTINATIONS={self.max_destinations}")
+        dest_indices = [csr.node_index_map[d] for d in dest_ids]
+
+        next_hops, costs = self._build_columns(csr, dest_indices)
+        changed, sent_costs = self._changed_rows(csr, dest_ids, next_hops, costs)
+
+        with self._lock:
+            self.version += 1
+            for node_id in changed:
+                self._row_versions[node_id] = self.version
+
+            current = set(csr.node_ids)
+            for node_id in [n for n in self._row_versions if n not in current]:
+                del self._row_versions[node_id]
+                self._removed_at[node_id] = self.version
+            for node_id in current.intersection(self._removed_at):
+                del self._removed_at[node_id]
+            self._trim_removals()
+
+            self._node_ids = list(csr.node_ids)
+            self._dest_ids = dest_ids
+            self._next_hops = next_hops
+            self._costs = costs
+            self._sent_costs = sent_costs
+        return len(changed)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._listeners.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._listeners.discard(queue)
+
+    def notify(self):
+        for queue in self._listeners:
+            queue.put_nowait(self.version)
+
+    def get_listener_count(self) -> int:
+        return len(self._listeners)
+
+    def get_pending_count(self) -> int:
+        return sum(queue.qsize() for queue in self._listeners)
+
+    def get_delta(self, since_version: int, node_ids: Optional[Set[str]] = None) -> ForwardingTableDelta:
+        with self._lock:
+            return self._get_delta(since_version, node_ids)
+
+    def _get_delta(self, since_version: int, node_ids: Optional[Set[str]]) -> ForwardingTableDelta:
+        # Removals older than the horizon were forgotten, so such clients need everything
+        full = since_version <= 0 or since_version < self._removal_horizon or since_version > self.version
+
+        index = {node: i for i, node in enumerate(self._node_ids)}
+        rows: Dict[str, List[Tuple[str, str, float]]] = {}
+        for node_id, row_version in self._row_versions.items():
+            if node_ids and node_id not in node_ids:
+                continue
+            if full or row_version > since_version:
+                rows[node_id] = self._row_entries(index[node_id])
+
+        removed = []
+        if not full:
+            removed = [
+                node_id for node_id, removed_version in self._removed_at.items()
+                if removed_version > since_version and (not node_ids or node_id in node_ids)
+            ]
+
+        return ForwardingTableDelta(version=self.version, full=full, rows=rows, removed=removed)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _build_columns(self, csr: CSRGraph, dest_indices: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        if csr.num_nodes < self.pool_min_nodes or self.workers <= 1 or len(dest_indices) < 2:
+            return _build_tree_columns(csr.indptr, csr.indices, csr.weights, dest_indices)
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+        chunk_count = min(self.workers, len(dest_indices))
+        chunks = [dest_indices[i::chunk_count] for i in range(chunk_count)]
+        futures = [
+            self._pool.submit(_build_tree_columns, csr.indptr, csr.indices, csr.weights, chunk)
+            for chunk in chunks
+        ]
+
+        next_hops = np.empty((csr.num_nodes, len(dest_indices)), dtype=np.int32)
+        costs = np.empty((csr.num_nodes, len(dest_indices)), dtype=np.float64)
+        for i, future in enumerate(futures):
+            chunk_hops, chunk_costs = future.result()
+            # Chunks were dealt round-robin, so column i::chunk_count belongs to chunk i
+            next_hops[:, i::chunk_count] = chunk_hops
+            costs[:, i::chunk_count] = chunk_costs
+        return next_hops, costs
+
+    def _changed_rows(self, csr: CSRGraph, dest_ids: List[str], next_hops: np.ndarray,
+                      costs: np.ndarray) -> Tuple[List[str], np.ndarray]:
+        # Rows whose next hops changed or whose costs moved past the tolerance since last sent,
+        # and the sent costs carried into the new index space
+        if self._next_hops is None or set(dest_ids) != set(self._dest_ids):
+            return list(csr.node_ids), costs.copy()
+
+        # Translate the previous table into the new node/destination index space
+        prev_index = {node: i for i, node in enumerate(self._node_ids)}
+        prev_to_new = np.array(
+            [csr.node_index_map.get(node, -2) for node in self._node_ids] + [-1],
+            dtype=np.int32
+        )
+        prev_dest = {node: i for i, node in enumerate(self._dest_ids)}
+        col_map = np.array([prev_dest.get(d, -1) for d in dest_ids], dtype=np.int64)
+        row_map = np.array([prev_index.get(node, -1) for node in csr.node_ids], dtype=np.int64)
+
+        changed = row_map < 0
+        sent_costs = costs.copy()
+        known = np.nonzero(~changed)[0]
+        if len(known) and len(col_map):
+            previous = self._next_hops[row_map[known]][:, col_map]
+            # -1 (no next hop) indexes the trailing -1 sentinel of prev_to_new
+            translated = prev_to_new[previous]
+            sent = self._sent_costs[row_map[known]][:, col_map]
+            # Unreachable on both sides counts as unchanged
+            moved = ~np.isclose(costs[known], sent, rtol=self.cost_tolerance, atol=0.0)
+            changed[known] = np.any(translated != next_hops[known], axis=1) | np.any(moved, axis=1)
+            unchanged = known[~changed[known]]
+            sent_costs[unchanged] = sent[~changed[known]]
+
+        return [csr.node_ids[i] for i in np.nonzero(changed)[0]], sent_costs
+
+    def _row_entries(self, row: int) -> List[Tuple[str, str, float]]:
+        entries = []
+        hops = self._next_hops[row]
+        costs = self._costs[row]
+        for col, dest_id in enumerate(self._dest_ids):
+            hop = hops[col]
+            if hop < 0:
+                continue
+            entries.append((dest_id, self._node_ids[hop], float(costs[col])))
+        return entries
+
+    def _trim_removals(self):
+        if len(self._removed_at) <= MAX_TRACKED_REMOVALS:
+            return
+
+        oldest = sorted(self._removed_at.items(), key=lambda item: item[1])
+        drop = len(self._removed_at) - MAX_TRACKED_REMOVALS
+        for node_id, removed_version in oldest[:drop]:
+            del self._removed_at[node_id]
+            self._removal_horizon = max(self._removal_horizon, removed_version)
@@ -1,42 +1,299 @@
-from typing import List, Optional, Callable, Dict, Any
+import asyncio
+import threading
+from itertools import islice
+from typing import List, Optional, Callable, Dict, Any, Tuple
 from ..core import GraphManager
-from ..algorithms import RouteResult, AStarAlgorithm, DijkstraAlgorithm, GreedyAlgorithm
-import networkx as nx
+from ..core.graph.weight_profiles import DEFAULT_PROFILE
+from ..algorithms import RouteResult, AStarAlgorithm, DijkstraAlgorithm, GreedyAlgorithm, IncrementalSSSPEngine
+from ..algorithms import ConstrainedRouteSearch, RouteConstraints, ContractionHierarchyAlgorithm, ContractionHierarchyIndex
+from ..algorithms import AnytimeRouteSearch
+from .route_cache import RouteCache
+from .route_workers import WORKER_ALGORITHMS, RouteWorkerPool
+from .single_flight import SingleFlight
+from ..utils.instrumentation import ROUTE_EXPANDED, ROUTE_REQUESTS, ROUTE_SECONDS
+from ..utils.logger import PerformanceLogger, get_logger, log_route_calculation
+from ..utils.lazy import lazy_import
+
+nx = lazy_import("networkx")
+
+logger = get_logger(__name__)
+
+
+class ProfileRouting:
+    # Route cache, hot-source trees and contraction hierarchy for one weight profile; each is built
+    # from that profile's edge costs, so none of them can be shared across profiles
+    def __init__(self, graph_manager):
+        self.graph_manager = graph_manager
+        self.route_cache = RouteCache()
+        self.sssp = IncrementalSSSPEngine(graph_manager)
+        self.ch_index = ContractionHierarchyIndex(graph_manager)
 
 
 class HeuristicEngine:
-    def __init__(self, graph_manager: GraphManager):
+    def __init__(self, graph_manager: GraphManager, route_workers: Optional[RouteWorkerPool] = None):
         self.graph_manager = graph_manager
+        self.route_workers = route_workers
+        
+        default = ProfileRouting(graph_manager)
+        self._profiles: Dict[str, ProfileRouting] = {DEFAULT_PROFILE: default}
+        self._profiles_lock = threading.Lock()
         
         self.astar = AStarAlgorithm(graph_manager)
         self.dijkstra = DijkstraAlgorithm(graph_manager)
         self.greedy = GreedyAlgorithm(graph_manager)
-    
-    def find_optimal_route(self, src: str, dst: str, algorithm: str = "astar", on_step: Optional[Callable[[Dict[str, Any]], None]] = None) -> Optional[RouteResult]:
-        algorithm_map = {
+        self.ch_index = default.ch_index
+        self.ch = ContractionHierarchyAlgorithm(graph_manager, self.ch_index)
+        self.anytime = AnytimeRouteSearch(graph_manager)
+        
+        self.algorithms = {
             "astar": self.astar,
             "dijkstra": self.dijkstra,
-            "greedy": self.greedy
+            "greedy": self.greedy,
+            "ch": self.ch,
+            "anytime": self.anytime
         }
         
-        # If algorithm supports step callbacks, bind it
-        alg = algorithm_map[algorithm]
-        if hasattr(alg, 'set_step_callback') and callable(getattr(alg, 'set_step_callback')):
-            alg.set_step_callback(on_step)
-        return alg.find_route(src, dst)
+        self.route_cache = default.route_cache
+        self.sssp = default.sssp
+        self.route_flights = SingleFlight()
+    
+    def has_algorithm(self, algorithm: str) -> bool:
+        return algorithm in self.algorithms
+    
+    def has_weight_profile(self, profile: str) -> bool:
+        return not profile or self.graph_manager.has_weight_profile(profile)
+    
+    def _profile(self, profile: Optional[str]) -> ProfileRouting:
+        routing = self._profiles.get(profile or DEFAULT_PROFILE)
+        if routing is None:
+            if not self.graph_manager.has_weight_profile(profile):
+                raise KeyError(f"Unknown weight profile: {profile}")
+            # Created on first use; switching profiles only reads columns priced at ingest
+            with self._profiles_lock:
+                routing = self._profiles.get(profile)
+                if routing is None:
+                    routing = ProfileRouting(self.graph_manager.profile_view(profile))
+                    self._profiles[profile] = routing
+        return routing
+    
+    def find_optimal_route(self, src: str, dst: str, algorithm: str = "astar", on_step: Optional[Callable[[Dict[str, Any]], None]] = None,
+                           profile: Optional[str] = None) -> Optional[RouteResult]:
+        alg = self.algorithms[algorithm]
+        routing = self._profile(profile)
+        
+        # Pairs in different components have no route; skip the search entirely
+        if not self.graph_manager.is_connected(src, dst):
+            ROUTE_REQUESTS.labels(algorithm, 'disconnected').inc()
+            return None
+        
+        # Step streams need the search to actually run, so they bypass the cache. They also
+        # run off the event loop, so they get their own instance rather than rebinding the
+        # shared one's callback under a concurrent search
+        if on_step is not None:
+            return self._search(src, dst, algorithm, self._instance(alg, routing), routing, on_step)
+        
+        version, cached = self._cached_route(src, dst, algorithm, routing)
+        if cached is not None:
+            return cached
+        
+        if routing.graph_manager is not self.graph_manager:
+            alg = self._instance(alg, routing)
+        result = self._search(src, dst, algorithm, alg, routing)
+        if result is not None:
+            routing.route_cache.put(src, dst, algorithm, result, version)
+        return result
+    
+    async def find_optimal_route_async(self, src: str, dst: str, algorithm: str = "astar", profile: Optional[str] = None) -> Optional[RouteResult]:
+        routing = self._profile(profile)
+        if not self.graph_manager.is_connected(src, dst):
+            ROUTE_REQUESTS.labels(algorithm, 'disconnected').inc()
+            return None
+        
+        if routing.route_cache.version != self.graph_manager.get_version():
+            # Catching up with a new version grows shortest-path trees; keep that off the event loop
+            await asyncio.get_running_loop().run_in_executor(
+                None, routing.route_cache.sync, routing.graph_manager, self.dijkstra._score_path)
+        version, cached = self._cached_route(src, dst, algorithm, routing)
+        if cached is not None:
+            return cached
+        
+        # After a graph push many agents ask for the same routes at once; identical requests
+        # against the same version wait on a single search and share its result
+        return await self.route_flights.do(
+            (src, dst, algorithm, profile or DEFAULT_PROFILE, version), algorithm,
+            lambda: self._search_async(src, dst, algorithm, version, routing))
+    
+    async def _search_async(self, src: str, dst: str, algorithm: str, version: int, routing: ProfileRouting) -> Optional[RouteResult]:
+        workers = self.route_workers
+        # Until the current version is published to shared memory, answer in-process. Workers
+        # hold the default profile's weights only
+        manifest = None
+        if workers is not None and algorithm in WORKER_ALGORITHMS and routing.graph_manager is self.graph_manager:
+            manifest = workers.acquire(self.graph_manager.get_version())
+        
+        answered = False
+        result = None
+        if manifest is not None:
+            try:
+                with PerformanceLogger(f"route {algorithm} (worker)", logger, ROUTE_SECONDS.labels(algorithm)) as perf:
+                    result = await workers.route(manifest, src, dst)
+                answered = True
+            except Exception as e:
+                logger.opt(exception=e).warning("Route worker failed, answering in-process: {}", e)
+            finally:
+                workers.release(manifest)
+            if answered:
+                ROUTE_REQUESTS.labels(algorithm, 'found' if result is not None else 'no_route').inc()
+                log_route_calculation(src, dst, algorithm, result, perf.elapsed_ms)
+        
+        if not answered:
+            # Graph generations are read without locks, so the search can leave the event loop
+            alg = self._instance(self.algorithms[algorithm], routing)
+            result = await asyncio.get_running_loop().run_in_executor(None, self._search, src, dst, algorithm, alg, routing)
+        
+        if result is not None:
+            routing.route_cache.put(src, dst, algorithm, result, version)
+        return result
     
-    def find_k_shortest_paths(self, src: str, dst: str, k: int = 3) -> List[RouteResult]:
-        graph = self.graph_manager.get_graph_copy()
+    def _cached_route(self, src: str, dst: str, algorithm: str, routing: ProfileRouting) -> Tuple[int, Optional[RouteResult]]:
+        routing.route_cache.sync(routing.graph_manager, self.dijkstra._score_path)
+        version = routing.route_cache.version
+        cached = routing.route_cache.get(src, dst, algorithm)
+        if cached is not None:
+            ROUTE_REQUESTS.labels(algorithm, 'cache_hit').inc()
+        return version, cached
+    
+    def _instance(self, alg, routing: ProfileRouting):
+        # A private instance for searches that may overlap with others on the shared one
+        if alg is self.ch:
+            return ContractionHierarchyAlgorithm(routing.graph_manager, routing.ch_index)
+        return type(alg)(routing.graph_manager)
+    
+    def _search(self, src: str, dst: str, algorithm: str, alg, routing: ProfileRouting,
+                on_step: Optional[Callable[[Dict[str, Any]], None]] = None) -> Optional[RouteResult]:
+        with PerformanceLogger(f"route {algorithm}", logger, ROUTE_SECONDS.labels(algorithm)) as perf:
+            result = None
+            outcome = 'sssp'
+            if on_step is None and algorithm == "dijkstra":
+                # Hot sources keep a repaired shortest-path tree instead of rerunning Dijkstra
+                path = routing.sssp.get_path(src, dst)
+                if path is not None:
+                    result = self.dijkstra._score_path(path, *routing.graph_manager.get_edge_metrics())
+            
+            if result is None:
+                # If algorithm supports step callbacks, bind it
+                if hasattr(alg, 'set_step_callback') and callable(getattr(alg, 'set_step_callback')):
+                    alg.set_step_callback(on_step)
+                alg.nodes_expanded = 0
+                result = alg.find_route(src, dst)
+                ROUTE_EXPANDED.labels(algorithm).observe(alg.nodes_expanded)
+                outcome = 'found' if result is not None else 'no_route'
+        
+        ROUTE_REQUESTS.labels(algorithm, outcome).inc()
+        log_route_calculation(src, dst, algorithm, result, perf.elapsed_ms)
+        return result
+    
+    def find_constrained_route(self, src: str, dst: str, constraints: RouteConstraints, profile: Optional[str] = None) -> Optional[RouteResult]:
+        routing = self._profile(profile)
+        if not self.graph_manager.is_connected(src, dst):
+            ROUTE_REQUESTS.labels('constrained', 'disconnected').inc()
+            return None
+        
+        # Not cached: the route cache's repair bounds only hold for unconstrained shortest paths
+        search = ConstrainedRouteSearch(routing.graph_manager)
+        with PerformanceLogger("route constrained", logger, ROUTE_SECONDS.labels('constrained')) as perf:
+            result = search.find_route(src, dst, constraints)
+        ROUTE_EXPANDED.labels('constrained').observe(search.nodes_expanded)
+        
+        if result is not None:
+            outcome = 'found'
+        elif search.label_limit_hit:
+            outcome = 'label_limit'
+            logger.warning("Constrained search {} -> {} stopped at {} labels", src, dst, search.max_labels)
+        else:
+            outcome = 'infeasible'
+        ROUTE_REQUESTS.labels('constrained', outcome).inc()
+        log_route_calculation(src, dst, 'constrained', result, perf.elapsed_ms)
+        return result
+    
+    async def find_constrained_route_async(self, src: str, dst: str, constraints: RouteConstraints,
+                                           profile: Optional[str] = None) -> Optional[RouteResult]:
+        # The label-setting search reads one generation without locks, so it runs off the event loop
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.find_constrained_route, src, dst, constraints, profile)
+    
+    async def find_anytime_route_async(self, src: str, dst: str, deadline: Optional[float],
+                                       should_stop: Optional[Callable[[], bool]] = None,
+                                       profile: Optional[str] = None) -> Optional[RouteResult]:
+        routing = self._profile(profile)
+        if not self.graph_manager.is_connected(src, dst):
+            ROUTE_REQUESTS.labels('anytime', 'disconnected').inc()
+            return None
+        
+        # Runs to completion are optimal and shared through the cache, but a deadline-bound search is
+        # specific to its caller, so it is not coalesced
+        version, cached = self._cached_route(src, dst, 'anytime', routing)
+        if cached is not None:
+            return cached
+        
+        result = await asyncio.get_running_loop().run_in_executor(
+            None, self.find_anytime_route, src, dst, deadline, should_stop, profile)
+        if result is not None and result.suboptimality_bound == 1.0:
+            routing.route_cache.put(src, dst, 'anytime', result, version)
+        return result
+    
+    def find_anytime_route(self, src: str, dst: str, deadline: Optional[float],
+                           should_stop: Optional[Callable[[], bool]] = None, profile: Optional[str] = None) -> Optional[RouteResult]:
+        search = AnytimeRouteSearch(self._profile(profile).graph_manager)
+        with PerformanceLogger("route anytime", logger, ROUTE_SECONDS.labels('anytime')) as perf:
+            result = search.find_route(src, dst, deadline, should_stop)
+        ROUTE_EXPANDED.labels('anytime').observe(search.nodes_expanded)
+        
+        if search.stopped == 'cancelled':
+            outcome = 'cancelled'
+        elif result is None:
+            outcome = 'deadline' if search.stopped else 'no_route'
+        else:
+            outcome = 'found' if result.suboptimality_bound == 1.0 else 'bounded'
+        ROUTE_REQUESTS.labels('anytime', outcome).inc()
+        log_route_calculation(src, dst, 'anytime', result, perf.elapsed_ms)
+        return result
+    
+    def get_cache_stats(self) -> Dict[str, float]:
+        return self.route_cache.get_stats()
+    
+    def get_sssp_stats(self) -> Dict[str, int]:
+        return self.sssp.get_stats()
+    
+    def get_coalescing_stats(self) -> Dict[str, int]:
+        return self.route_flights.get_stats()
+    
+    def prepare_ch_index(self):
+        # Rebuilds the hierarchy on a topology change, otherwise only recustomises its weights.
+        # Other profiles' hierarchies are only kept current once they have been queried
+        for routing in list(self._profiles.values()):
+            if routing.ch_index is self.ch_index or routing.ch_index.hierarchy is not None:
+                routing.ch_index.prepare()
+    
+    def get_ch_stats(self) -> Dict[str, float]:
+        return self.ch_index.get_stats()
+    
+    def find_k_shortest_paths(self, src: str, dst: str, k: int = 3, profile: Optional[str] = None) -> List[RouteResult]:
+        if not self.graph_manager.is_connected(src, dst):
+            return []
+        
+        graph, csr, edge_metrics = self.graph_manager.get_route_views(profile)
         
         if src not in graph or dst not in graph:
             return []
         
         try:
-            paths = list(nx.shortest_simple_paths(graph, src, dst, weight='weight'))
+            # shortest_simple_paths enumerates every simple path lazily; only pull k of them
+            paths = islice(nx.shortest_simple_paths(graph, src, dst, weight='weight'), k)
             
             results = []
-            for path in paths[:k]: 
-                result = self.dijkstra._calculate_route_metrics(path, graph)
+            for path in paths: 
+                result = self.dijkstra._score_path(path, csr, edge_metrics)
                 results.append(result)
             
             return results
@@ -44,8 +301,11 @@ class HeuristicEngine:
         except (nx.NetworkXNoPath, nx.NodeNotFound):
             return []
     
-    def find_backup_routes(self, src: str, dst: str, primary_path: List[str]) -> List[RouteResult]:
-        graph = self.graph_manager.get_graph_copy()
+    def find_backup_routes(self, src: str, dst: str, primary_path: List[str], profile: Optional[str] = None) -> List[RouteResult]:
+        if not self.graph_manager.is_connected(src, dst):
+            return []
+        
+        graph, csr, edge_metrics = self.graph_manager.get_route_views(profile)
         
         if src not in graph or dst not in graph or len(primary_path) < 2:
             return []
@@ -61,7 +321,7 @@ class HeuristicEngine:
         
         try:
             backup_path = nx.shortest_path(backup_graph, src, dst, weight='weight')
-            backup_result = self.dijkstra._calculate_route_metrics(backup_path, graph)
+            backup_result = self.dijkstra._score_path(backup_path, csr, edge_metrics)
             return [backup_result]
             
         except (nx.NetworkXNoPath, nx.NodeNotFound):
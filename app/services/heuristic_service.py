@@ -1,129 +1,473 @@
-from typing import Any, Dict, Any as AnyType, Iterator
+from typing import Any, Dict, Any as AnyType, AsyncIterator, Optional
+import asyncio
 import datetime
+import os
+import threading
+import time
 import grpc
 
 from proto import heuristic_pb2_grpc, heuristic_pb2
 from proto import algorithm_stream_pb2_grpc, algorithm_stream_pb2
 from ..core import GraphManager
 from .heuristic_engine import HeuristicEngine
+from .route_subscriptions import RouteSubscriptionManager
+from .forwarding_tables import ForwardingTableManager, ForwardingTableDelta
+from .snapshot_recorder import SnapshotRecorder
+from .route_workers import RouteWorkerPool
+from .checkpoints import CheckpointManager, capture_graph, graph_columns, snapshot_from_columns
+from ..algorithms import RouteConstraints, RouteResult
 from ..analysis import StabilityAnalyzer
+from ..utils.instrumentation import REGISTRY, STABILITY_SECONDS, STEP_EVENTS, track_rpc, track_stream
+from ..utils.logger import get_logger, graph_version_var, log_context, next_request_id
+from ..utils.server_config import compression_from_env
+
+logger = get_logger(__name__)
+
+# Step events handed from the search thread to the stream per loop wakeup
+STEP_BATCH_SIZE = 64
+
+# Nodes returned by GetCriticalNodes when the request leaves top_n unset
+DEFAULT_CRITICAL_NODES = 5
 
 
 class HeuristicServiceServicer(heuristic_pb2_grpc.HeuristicServiceServicer, algorithm_stream_pb2_grpc.AlgorithmStreamServiceServicer):
     def __init__(self):
         self.graph_manager = GraphManager()
-        self.heuristic_engine = HeuristicEngine(self.graph_manager)
+        
+        # Routes are served by worker processes reading the graph from shared memory
+        self.route_workers: Optional[RouteWorkerPool] = None
+        if int(os.environ.get("HEURISTIC_ROUTE_WORKERS", 0) or 0) > 0:
+            self.route_workers = RouteWorkerPool()
+        
+        self.heuristic_engine = HeuristicEngine(self.graph_manager, self.route_workers)
         self.stability_analyzer = StabilityAnalyzer()
-    def RunAlgorithm(self, request: algorithm_stream_pb2.AlgorithmRunRequest, context: Any) -> Iterator[algorithm_stream_pb2.AlgorithmStreamEvent]:
+        # Every snapshot scores its links' stability for the edge metrics and the instability cost term
+        self.graph_manager.set_stability_source(self.stability_analyzer.get_link_stability_scores)
+        self.route_subscriptions = RouteSubscriptionManager(self.heuristic_engine)
+        
+        self.forwarding_tables: Optional[ForwardingTableManager] = None
+        if os.environ.get("HEURISTIC_FORWARDING_TABLES", "").lower() in ("1", "true", "yes"):
+            self.forwarding_tables = ForwardingTableManager(self.graph_manager)
+        
+        # Keep the contraction hierarchy current after every snapshot instead of on the first "ch" query
+        self.ch_index_enabled = os.environ.get("HEURISTIC_CH_INDEX", "").lower() in ("1", "true", "yes")
+        # Likewise rank critical nodes after every snapshot instead of on the first GetCriticalNodes call
+        self.critical_nodes_enabled = os.environ.get("HEURISTIC_CRITICAL_NODES_INDEX", "").lower() in ("1", "true", "yes")
+        
+        # Time kept back from a client's deadline by "anytime" routes to serialise and send the answer
+        self.anytime_margin_s = float(os.environ.get("HEURISTIC_ANYTIME_MARGIN_MS", 20)) / 1000.0
+        
+        self.checkpoints: Optional[CheckpointManager] = None
+        checkpoint_dir = os.environ.get("HEURISTIC_CHECKPOINT_DIR", "")
+        if checkpoint_dir:
+            self.checkpoints = CheckpointManager(checkpoint_dir)
+        
+        self.recorder: Optional[SnapshotRecorder] = None
+        record_path = os.environ.get("HEURISTIC_RECORD_PATH", "")
+        if record_path:
+            self.recorder = SnapshotRecorder(record_path)
+        
+        # Step streams are large and repetitive; compress them when configured (gzip/deflate)
+        self.step_compression = compression_from_env("HEURISTIC_STEP_STREAM_COMPRESSION")
+        
+        self._register_metrics()
+    
+    async def RunAlgorithm(self, request: algorithm_stream_pb2.AlgorithmRunRequest, context: Any) -> AsyncIterator[algorithm_stream_pb2.AlgorithmStreamEvent]:
         algo = request.algo
         src = request.src
         dst = request.dst
 
+        if not self.heuristic_engine.has_algorithm(algo):
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Unknown algorithm: {algo}")
+        if self.step_compression is not None:
+            context.set_compression(self.step_compression)
+
         try:
-            yield algorithm_stream_pb2.AlgorithmStreamEvent(
-                run_start=algorithm_stream_pb2.AlgorithmRunStart(
+            with track_rpc('RunAlgorithm'), log_context(next_request_id(context), self.graph_manager.get_version()):
+                yield algorithm_stream_pb2.AlgorithmStreamEvent(
+                    run_start=algorithm_stream_pb2.AlgorithmRunStart(
+                        algo=algo,
+                        src=src,
+                        dst=dst
+                    )
+                )
+
+                # The search runs on a worker thread and hands steps over in batches as it goes
+                loop = asyncio.get_running_loop()
+                batches: asyncio.Queue = asyncio.Queue()
+                pending = []
+
+                def on_step(ev: Dict[str, AnyType]):
+                    pending.append(self._build_step_event(algo, ev))
+                    if len(pending) >= STEP_BATCH_SIZE:
+                        loop.call_soon_threadsafe(batches.put_nowait, pending[:])
+                        pending.clear()
+
+                def search():
+                    try:
+                        return self.heuristic_engine.find_optimal_route(src, dst, algo, on_step=on_step)
+                    finally:
+                        loop.call_soon_threadsafe(batches.put_nowait, pending[:])
+                        loop.call_soon_threadsafe(batches.put_nowait, None)
+
+                future = loop.run_in_executor(None, search)
+                step_count = 0
+                while True:
+                    batch = await batches.get()
+                    if batch is None:
+                        break
+                    step_count += len(batch)
+                    for step_event in batch:
+                        yield step_event
+                result = await future
+                STEP_EVENTS.labels(algo).inc(step_count)
+            
+                complete_event = algorithm_stream_pb2.AlgorithmComplete(
                     algo=algo,
                     src=src,
                     dst=dst
                 )
-            )
-            step_events = []
-            
-            def on_step(ev: Dict[str, AnyType]):
-                step_event = algorithm_stream_pb2.AlgorithmStep(
-                    algo=ev.get('algo', algo),
-                    step=ev.get('step', 0),
-                    action=ev.get('action', ''),
-                    node=ev.get('node', ''),
-                    from_node=ev.get('from', ''),
-                    to_node=ev.get('to', ''),
-                    open_size=ev.get('open_size', 0),
-                    g=ev.get('g', 0.0),
-                    f=ev.get('f', 0.0),
-                    dist=ev.get('dist', 0.0)
-                )
-                
-                if 'path' in ev and ev['path']:
-                    step_event.path.extend(ev['path'])
-                
-                step_events.append(algorithm_stream_pb2.AlgorithmStreamEvent(step=step_event))
-            
-            result = self.heuristic_engine.find_optimal_route(src, dst, algo, on_step=on_step)
             
-            for step_event in step_events:
-                yield step_event
+                if result:
+                    route_result = algorithm_stream_pb2.RouteResult(
+                        path=result.path,
+                        total_weight=result.total_weight,
+                        total_delay_ms=result.total_delay,
+                        total_jitter_ms=result.total_jitter,
+                        avg_loss_rate=result.average_loss_rate,
+                        min_bandwidth_mbps=result.min_bandwidth,
+                        hop_count=result.hop_count,
+                        stability_score=result.stability_score,
+                        link_stability=result.link_stability
+                    )
+                    complete_event.result.CopyFrom(route_result)
             
-            complete_event = algorithm_stream_pb2.AlgorithmComplete(
-                algo=algo,
-                src=src,
-                dst=dst
-            )
-            
-            if result:
-                route_result = algorithm_stream_pb2.RouteResult(
-                    path=result.path,
-                    total_weight=result.total_weight,
-                    total_delay_ms=result.total_delay,
-                    total_jitter_ms=result.total_jitter,
-                    avg_loss_rate=result.average_loss_rate,
-                    min_bandwidth_mbps=result.min_bandwidth,
-                    hop_count=result.hop_count,
-                    stability_score=result.stability_score
-                )
-                complete_event.result.CopyFrom(route_result)
-            
-            yield algorithm_stream_pb2.AlgorithmStreamEvent(complete=complete_event)
+                yield algorithm_stream_pb2.AlgorithmStreamEvent(complete=complete_event)
             
         except Exception as e:
-            print(f"[HEURISTIC] Error in RunAlgorithm: {e}")
-            import traceback
-            traceback.print_exc()
-            context.abort(grpc.StatusCode.INTERNAL, f"Algorithm execution failed: {str(e)}")
+            logger.opt(exception=e).error("RunAlgorithm {} {} -> {} failed", algo, src, dst)
+            await context.abort(grpc.StatusCode.INTERNAL, f"Algorithm execution failed: {str(e)}")
+    
+    @staticmethod
+    def _build_step_event(algo: str, ev: Dict[str, AnyType]) -> algorithm_stream_pb2.AlgorithmStreamEvent:
+        step_event = algorithm_stream_pb2.AlgorithmStep(
+            algo=ev.get('algo', algo),
+            step=ev.get('step', 0),
+            action=ev.get('action', ''),
+            node=ev.get('node', ''),
+            from_node=ev.get('from', ''),
+            to_node=ev.get('to', ''),
+            open_size=ev.get('open_size', 0),
+            g=ev.get('g', 0.0),
+            f=ev.get('f', 0.0),
+            dist=ev.get('dist', 0.0)
+        )
+    
+        if 'path' in ev and ev['path']:
+            step_event.path.extend(ev['path'])
+        return algorithm_stream_pb2.AlgorithmStreamEvent(step=step_event)
     
     async def UpdateGraph(self, request: heuristic_pb2.GraphSnapshot, context: Any) -> heuristic_pb2.UpdateResponse:
-        try:
-            ts = request.timestamp or datetime.datetime.utcnow().isoformat()
-            timestamp = datetime.datetime.fromisoformat(ts.replace('Z', '+00:00'))
-            
-            self.graph_manager.update_graph(request)
-            
-            await self._update_stability_metrics(request, timestamp)
-            self.graph_manager.update_graph(request)
-
-            await self._update_stability_metrics(request, timestamp)
+        with track_rpc('UpdateGraph'), log_context(next_request_id(context), self.graph_manager.get_version()):
+            try:
+                if self.recorder is not None:
+                    self.recorder.record(request)
+                
+                ts = request.timestamp or datetime.datetime.utcnow().isoformat()
+                timestamp = datetime.datetime.fromisoformat(ts.replace('Z', '+00:00'))
+                
+                if not self.graph_manager.update_graph(request):
+                    return heuristic_pb2.UpdateResponse(success=False, message="Failed to apply graph snapshot")
+                graph_version_var.set(self.graph_manager.get_version())
+                
+                with STABILITY_SECONDS.time():
+                    await self._update_stability_metrics(request, timestamp)
+                
+                await self._publish_graph_update()
+                return heuristic_pb2.UpdateResponse(success=True)
 
-        except Exception as e:
-            print(f"[HEURISTIC] ERROR: {e}")
+            except Exception as e:
+                logger.opt(exception=e).error("UpdateGraph failed: {}", e)
+                return heuristic_pb2.UpdateResponse(success=False, message=str(e))
     
     async def RequestRoute(self, request, context):
-        try:
-            src = request.source_node_id
-            dst = request.destination_node_id
-            algorithm = getattr(request, 'algorithm', 'astar')
+        with track_rpc('RequestRoute'), log_context(next_request_id(context), self.graph_manager.get_version()):
+            algorithm = request.algorithm or 'astar'
+            profile = request.weight_profile or None
+            if not self.heuristic_engine.has_algorithm(algorithm):
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Unknown algorithm: {algorithm}")
+            if not self.heuristic_engine.has_weight_profile(profile):
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Unknown weight profile: {profile}")
             
-            route_result = self.heuristic_engine.find_optimal_route(src, dst, algorithm)
-            
-            if route_result:
-                return heuristic_pb2.RouteResponse(
-                    success=True,
-                    path=route_result.path,
-                    total_weight=route_result.total_weight,
-                    total_delay_ms=route_result.total_delay,
-                    stability_score=route_result.stability_score,
-                    hop_count=route_result.hop_count
+            try:
+                src = request.source_node_id
+                dst = request.destination_node_id
+                constraints = RouteConstraints(
+                    max_delay_ms=request.max_delay_ms,
+                    min_bandwidth_mbps=request.min_bandwidth_mbps,
+                    max_hops=request.max_hops
                 )
-            else:
+                if not constraints.is_empty():
+                    route_result = await self.heuristic_engine.find_constrained_route_async(src, dst, constraints, profile)
+                    if route_result is None:
+                        return heuristic_pb2.RouteResponse(
+                            success=False,
+                            message=f"No route from {src} to {dst} satisfies the constraints"
+                        )
+                    return self._build_route_response(src, dst, route_result)
+                
+                time_remaining = context.time_remaining()
+                if algorithm == 'anytime' and time_remaining is not None:
+                    return await self._anytime_route(src, dst, time_remaining, context, profile)
+                
+                route_result = await self.heuristic_engine.find_optimal_route_async(src, dst, algorithm, profile)
+                return self._build_route_response(src, dst, route_result)
+                    
+            except Exception as e:
+                logger.opt(exception=e).error("RequestRoute {} -> {} failed: {}", request.source_node_id, request.destination_node_id, e)
                 return heuristic_pb2.RouteResponse(
                     success=False,
-                    message=f"No route found from {src} to {dst}"
+                    message=f"Route calculation error: {str(e)}"
                 )
-                
-        except Exception as e:
-            print(f"[HEURISTIC] Route ERROR: {e}")
+    
+    async def _anytime_route(self, src: str, dst: str, time_remaining: float, context,
+                             profile: Optional[str] = None) -> heuristic_pb2.RouteResponse:
+        # Answer inside the client's deadline with the best bounded path so far, leaving time to send it;
+        # the search thread stops as soon as the RPC ends, whether by cancellation or deadline
+        deadline = time.monotonic() + max(0.0, time_remaining - self.anytime_margin_s)
+        stop = threading.Event()
+        context.add_done_callback(lambda _: stop.set())
+        try:
+            route_result = await self.heuristic_engine.find_anytime_route_async(src, dst, deadline, stop.is_set, profile)
+        finally:
+            stop.set()
+        if route_result is None and time.monotonic() >= deadline:
             return heuristic_pb2.RouteResponse(
                 success=False,
-                message=f"Route calculation error: {str(e)}"
+                message=f"Deadline reached before a route from {src} to {dst} was found"
             )
+        return self._build_route_response(src, dst, route_result)
+    
+    async def run_checkpoints(self):
+        await self.restore_checkpoint()
+        while True:
+            await asyncio.sleep(self.checkpoints.interval_s)
+            try:
+                await self.save_checkpoint()
+            except Exception as e:
+                logger.opt(exception=e).error("Checkpoint failed: {}", e)
+    
+    async def restore_checkpoint(self) -> bool:
+        loop = asyncio.get_running_loop()
+        try:
+            checkpoint = await loop.run_in_executor(None, self.checkpoints.load)
+            if checkpoint is None:
+                return False
+            snapshot = await loop.run_in_executor(None, snapshot_from_columns, checkpoint.graph)
+        except Exception as e:
+            logger.opt(exception=e).error("Could not read checkpoint: {}", e)
+            return False
+        
+        # A live push that arrived while the checkpoint was being read is newer; keep it
+        if self.graph_manager.get_version() > 0:
+            logger.info("Skipping checkpoint {}: graph already received", checkpoint.path)
+            return False
+        if not self.graph_manager.update_graph(snapshot):
+            return False
+        if checkpoint.history is not None:
+            self.stability_analyzer.history_manager.attach_columns(checkpoint.history)
+        self.checkpoints.saved_version = self.graph_manager.get_version()
+        
+        await self._publish_graph_update()
+        logger.info("Restored checkpoint {} ({:.0f}s old)", checkpoint.path, time.time() - checkpoint.created_at)
+        return True
+    
+    async def save_checkpoint(self) -> Optional[str]:
+        version = self.graph_manager.get_version()
+        if version == 0 or version == self.checkpoints.saved_version:
+            return None
+        
+        loop = asyncio.get_running_loop()
+        nodes, links, timestamp = capture_graph(self.graph_manager)
+        graph = await loop.run_in_executor(None, graph_columns, nodes, links, timestamp)
+        history = await loop.run_in_executor(None, self.stability_analyzer.history_manager.export_columns)
+        return await loop.run_in_executor(None, self.checkpoints.save, graph, history, version)
+    
+    async def _publish_graph_update(self):
+        if self.route_workers is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.route_workers.publish, self.graph_manager)
+        if self.ch_index_enabled:
+            await asyncio.get_running_loop().run_in_executor(None, self.heuristic_engine.prepare_ch_index)
+        if self.critical_nodes_enabled:
+            await asyncio.get_running_loop().run_in_executor(None, self.graph_manager.prepare_critical_nodes)
+        
+        # One recomputation per distinct subscribed pair, pushed only on change. The snapshot is
+        # already published, so a failure here is logged and does not fail UpdateGraph
+        try:
+            await self.route_subscriptions.refresh()
+        except Exception as e:
+            logger.opt(exception=e).error("Route subscription refresh failed: {}", e)
+        
+        if self.forwarding_tables is not None:
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.forwarding_tables.rebuild)
+            except Exception as e:
+                # Subscribers keep the previous tables; the snapshot itself was applied
+                logger.opt(exception=e).error("Forwarding table rebuild failed: {}", e)
+            else:
+                self.forwarding_tables.notify()
+    
+    async def SubscribeRoute(self, request: heuristic_pb2.RouteRequest, context: Any) -> AsyncIterator[heuristic_pb2.RouteResponse]:
+        src = request.source_node_id
+        dst = request.destination_node_id
+        algorithm = request.algorithm or 'astar'
+        profile = request.weight_profile or None
+        
+        if not self.heuristic_engine.has_algorithm(algorithm):
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Unknown algorithm: {algorithm}")
+        if not self.heuristic_engine.has_weight_profile(profile):
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Unknown weight profile: {profile}")
+        
+        # As in RequestRoute, constraints switch the pair to the constrained search
+        constraints = RouteConstraints(
+            max_delay_ms=request.max_delay_ms,
+            min_bandwidth_mbps=request.min_bandwidth_mbps,
+            max_hops=request.max_hops
+        )
+        queue = await self.route_subscriptions.subscribe(src, dst, algorithm, profile, constraints)
+        try:
+            with track_stream('SubscribeRoute'):
+                while True:
+                    route_result = await queue.get()
+                    yield self._build_route_response(src, dst, route_result)
+        finally:
+            self.route_subscriptions.unsubscribe(src, dst, algorithm, queue, profile, constraints)
+    
+    async def StreamForwardingTables(self, request: heuristic_pb2.ForwardingTableRequest, context: Any) -> AsyncIterator[heuristic_pb2.ForwardingTableUpdate]:
+        if self.forwarding_tables is None:
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION, "Forwarding tables are disabled (set HEURISTIC_FORWARDING_TABLES=1)")
+        
+        node_ids = set(request.node_ids) or None
+        since_version = request.since_version
+        
+        queue = self.forwarding_tables.subscribe()
+        try:
+            with track_stream('StreamForwardingTables'):
+                while True:
+                    if 0 < self.forwarding_tables.version != since_version:
+                        delta = self.forwarding_tables.get_delta(since_version, node_ids)
+                        # Versions that changed none of the requested rows are not worth a message
+                        if delta.full or delta.rows or delta.removed:
+                            yield self._build_forwarding_update(delta, since_version)
+                            since_version = delta.version
+                    await queue.get()
+        finally:
+            self.forwarding_tables.unsubscribe(queue)
+    
+    async def GetCriticalNodes(self, request: heuristic_pb2.CriticalNodesRequest, context: Any) -> heuristic_pb2.CriticalNodesResponse:
+        with track_rpc('GetCriticalNodes'), log_context(next_request_id(context), self.graph_manager.get_version()):
+            top_n = request.top_n or DEFAULT_CRITICAL_NODES
+            # Served from the ranking kept per graph version; only the first call after a topology change scores
+            version, nodes = await asyncio.get_running_loop().run_in_executor(
+                None, self.graph_manager.get_critical_ranking, top_n)
+            response = heuristic_pb2.CriticalNodesResponse(version=version)
+            for node in nodes:
+                response.nodes.add(
+                    node_id=node.node_id,
+                    score=node.score,
+                    degree=node.degree,
+                    betweenness=node.betweenness,
+                    closeness=node.closeness
+                )
+            return response
+    
+    def _register_metrics(self):
+        # Sampled at scrape time so the hot paths only pay for their own counters
+        REGISTRY.gauge_function(
+            'heuristic_route_cache', 'Route cache counters and size',
+            lambda: {(name,): value for name, value in self.heuristic_engine.get_cache_stats().items()}, ['stat'])
+        REGISTRY.gauge_function(
+            'heuristic_sssp', 'Incremental shortest-path tree counters',
+            lambda: {(name,): value for name, value in self.heuristic_engine.get_sssp_stats().items()}, ['stat'])
+        REGISTRY.gauge_function(
+            'heuristic_route_coalescing', 'Route searches started, requests that joined one in flight, searches in flight',
+            lambda: {(name,): value for name, value in self.heuristic_engine.get_coalescing_stats().items()}, ['stat'])
+        REGISTRY.gauge_function(
+            'heuristic_graph_components', 'Connected components over available links',
+            lambda: {(): self.graph_manager.get_component_count()})
+        REGISTRY.gauge_function(
+            'heuristic_graph_generations', 'Graph generations still held by readers, including the current one',
+            lambda: {(): self.graph_manager.get_live_generation_count()})
+        REGISTRY.gauge_function(
+            'heuristic_stability_history', 'Tracked stability-history entities, series, samples, estimated bytes and evictions',
+            lambda: {(name,): value for name, value in self.stability_analyzer.get_history_stats().items()}, ['stat'])
+        REGISTRY.gauge_function(
+            'heuristic_queue_depth', 'Undelivered messages waiting in stream queues',
+            self._queue_depths, ['queue'])
+        REGISTRY.gauge_function(
+            'heuristic_subscribers', 'Open streaming subscriptions',
+            self._subscriber_counts, ['kind'])
+        REGISTRY.gauge_function(
+            'heuristic_ch', 'Contraction hierarchy size, build and customisation times',
+            lambda: {(name,): value for name, value in self.heuristic_engine.get_ch_stats().items()}, ['stat'])
+        REGISTRY.gauge_function(
+            'heuristic_critical_nodes', 'Critical-node index version, size, rescoring and reuse counts, scoring time',
+            lambda: {(name,): value for name, value in self.graph_manager.get_critical_node_stats().items()}, ['stat'])
+        if self.route_workers is not None:
+            REGISTRY.gauge_function(
+                'heuristic_route_workers', 'Route worker pool and shared-memory graph segments',
+                lambda: {(name,): value for name, value in self.route_workers.get_stats().items()}, ['stat'])
+        if self.recorder is not None:
+            REGISTRY.gauge_function(
+                'heuristic_recorder_snapshots', 'Snapshots written to or dropped by the recorder',
+                lambda: {('recorded',): self.recorder.recorded, ('dropped',): self.recorder.dropped}, ['outcome'])
+    
+    def _queue_depths(self) -> Dict[tuple, float]:
+        depths = {('route_subscriptions',): self.route_subscriptions.get_pending_count()}
+        if self.forwarding_tables is not None:
+            depths[('forwarding_tables',)] = self.forwarding_tables.get_pending_count()
+        return depths
+    
+    def _subscriber_counts(self) -> Dict[tuple, float]:
+        counts = {
+            ('route',): self.route_subscriptions.get_subscription_count(),
+            ('route_pairs',): self.route_subscriptions.get_pair_count()
+        }
+        if self.forwarding_tables is not None:
+            counts[('forwarding_tables',)] = self.forwarding_tables.get_listener_count()
+        return counts
+    
+    def _build_forwarding_update(self, delta: ForwardingTableDelta, base_version: int) -> heuristic_pb2.ForwardingTableUpdate:
+        update = heuristic_pb2.ForwardingTableUpdate(
+            version=delta.version,
+            base_version=0 if delta.full else base_version,
+            full=delta.full
+        )
+        for node_id, entries in delta.rows.items():
+            row = update.rows.add(node_id=node_id)
+            for destination, next_hop, cost in entries:
+                row.entries.add(destination=destination, next_hop=next_hop, cost=cost)
+        for node_id in delta.removed:
+            update.rows.add(node_id=node_id, removed=True)
+        return update
+    
+    def _build_route_response(self, src: str, dst: str, route_result: Optional[RouteResult]) -> heuristic_pb2.RouteResponse:
+        if route_result:
+            return heuristic_pb2.RouteResponse(
+                success=True,
+                path=route_result.path,
+                total_weight=route_result.total_weight,
+                total_delay_ms=route_result.total_delay,
+                stability_score=route_result.stability_score,
+                hop_count=route_result.hop_count,
+                min_bandwidth_mbps=route_result.min_bandwidth,
+                suboptimality_bound=route_result.suboptimality_bound or 0.0,
+                link_stability=route_result.link_stability
+            )
+        return heuristic_pb2.RouteResponse(
+            success=False,
+            message=f"No route found from {src} to {dst}"
+        )
     
     async def _update_stability_metrics(self, snapshot: heuristic_pb2.GraphSnapshot, timestamp: datetime.datetime):
         for node in snapshot.nodes:
@@ -143,4 +487,7 @@ class HeuristicServiceServicer(heuristic_pb2_grpc.HeuristicServiceServicer, algo
                 'loss_rate': link.metrics.loss_rate,
                 'bandwidth_mbps': link.metrics.bandwidth_mbps
             }
-            self.stability_analyzer.update_link_metrics(link_id, timestamp, link_metrics)
\ No newline at end of file
+            self.stability_analyzer.update_link_metrics(link_id, timestamp, link_metrics)
+        
+        # Forget nodes and links that have left the topology
+        self.stability_analyzer.sweep_history(self.graph_manager.get_version(), timestamp)
\ No newline at end of file
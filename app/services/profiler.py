@@ -0,0 +1,203 @@
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from ..utils.instrumentation import RPC_SECONDS
+
+DEFAULT_DURATION_S = 10.0
+DEFAULT_MAX_DURATION_S = 120.0
+DEFAULT_TOP_N = 40
+DEFAULT_SAMPLE_INTERVAL_MS = 5.0
+# Collapsed-stack output is capped so the response stays well under the gRPC message limit
+MAX_STACKS = 2000
+PROFILE_MODES = ("cprofile", "sampling")
+
+
+class ProfileBusyError(RuntimeError):
+    pass
+
+
+@dataclass
+class ProfileResult:
+    mode: str
+    duration_s: float
+    requests_seen: int
+    samples: int
+    profile: str
+    memory: str = ""
+
+
+class StackSampler:
+    def __init__(self, interval_s: float):
+        self.interval_s = interval_s
+        self.samples = 0
+        self.stacks: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def collapsed(self, limit: int = MAX_STACKS) -> str:
+        ranked = sorted(self.stacks.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return "\n".join(f"{stack} {count}" for stack, count in ranked)
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval_s):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack.append(names.get(thread_id, str(thread_id)))
+                key = ";".join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+
+class ThreadProfiles:
+    # One cProfile.Profile per worker thread: a profiler only hooks the thread that enables it,
+    # and a worker runs one job at a time
+    def __init__(self):
+        self._profiles: Dict[int, cProfile.Profile] = {}
+
+    def run(self, fn, *args, **kwargs):
+        profile = self._profiles.get(threading.get_ident())
+        if profile is None:
+            profile = self._profiles[threading.get_ident()] = cProfile.Profile()
+        return profile.runcall(fn, *args, **kwargs)
+
+    def profiles(self):
+        return list(self._profiles.values())
+
+
+class ProfiledThreadPool(ThreadPoolExecutor):
+    # The event loop's default executor. Route searches and other run_in_executor jobs run here,
+    # so a cprofile capture wraps every job submitted while it is running
+    def __init__(self):
+        super().__init__(thread_name_prefix="asyncio")
+        self.capture: Optional[ThreadProfiles] = None
+
+    def submit(self, fn, /, *args, **kwargs):
+        capture = self.capture
+        if capture is None:
+            return super().submit(fn, *args, **kwargs)
+        return super().submit(capture.run, fn, *args, **kwargs)
+
+
+class Profiler:
+    def __init__(self, max_duration_s: Optional[float] = None):
+        if max_duration_s is None:
+            max_duration_s = float(os.environ.get("HEURISTIC_PROFILE_MAX_SECONDS", DEFAULT_MAX_DURATION_S))
+        self.max_duration_s = max_duration_s
+        self.executor: Optional[ProfiledThreadPool] = None
+        self._lock = threading.Lock()
+
+    def install(self, loop: asyncio.AbstractEventLoop):
+        # Before the first run_in_executor; without it cprofile captures see the loop thread only
+        self.executor = ProfiledThreadPool()
+        loop.set_default_executor(self.executor)
+
+    def is_busy(self) -> bool:
+        return self._lock.locked()
+
+    async def capture(self, mode: str = "cprofile", duration_s: float = 0.0, request_count: int = 0,
+                      trace_memory: bool = False, top_n: int = 0, sample_interval_ms: float = 0.0) -> ProfileResult:
+        mode = mode or "cprofile"
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        if not self._lock.acquire(blocking=False):
+            raise ProfileBusyError("A profile capture is already running")
+
+        try:
+            if duration_s <= 0:
+                duration_s = self.max_duration_s if request_count else DEFAULT_DURATION_S
+            duration_s = min(duration_s, self.max_duration_s)
+            top_n = top_n or DEFAULT_TOP_N
+
+            started_tracing = trace_memory and not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+
+            sampler = None
+            profile = None
+            threads = None
+            if mode == "sampling":
+                sampler = StackSampler((sample_interval_ms or DEFAULT_SAMPLE_INTERVAL_MS) / 1000.0)
+                sampler.start()
+            else:
+                # Handlers run on the event loop thread, which is the thread this coroutine runs on;
+                # searches run on executor threads, profiled job by job
+                if self.executor is not None:
+                    threads = self.executor.capture = ThreadProfiles()
+                profile = cProfile.Profile()
+                profile.enable()
+
+            try:
+                elapsed, requests_seen = await self._wait(duration_s, request_count)
+            finally:
+                if profile is not None:
+                    profile.disable()
+                if threads is not None:
+                    self.executor.capture = None
+                if sampler is not None:
+                    sampler.stop()
+                memory = self._memory_report(top_n) if trace_memory else ""
+                if started_tracing:
+                    tracemalloc.stop()
+
+            if profile is not None:
+                stream = io.StringIO()
+                if threads is None:
+                    stream.write("Event loop thread only: executor jobs such as route searches are not profiled; use sampling mode\n")
+                else:
+                    stream.write(f"Event loop thread and {len(threads.profiles())} executor threads\n")
+                stats = pstats.Stats(profile, stream=stream)
+                for thread_profile in threads.profiles() if threads is not None else ():
+                    stats.add(thread_profile)
+                stats.sort_stats("cumulative").print_stats(top_n)
+                return ProfileResult(mode, elapsed, requests_seen, stats.total_calls, stream.getvalue(), memory)
+            return ProfileResult(mode, elapsed, requests_seen, sampler.samples, sampler.collapsed(), memory)
+        finally:
+            self._lock.release()
+
+    async def _wait(self, duration_s: float, request_count: int):
+        start = time.perf_counter()
+        start_count = RPC_SECONDS.get_total_count()
+        while True:
+            elapsed = time.perf_counter() - start
+            requests_seen = RPC_SECONDS.get_total_count() - start_count
+            if elapsed >= duration_s or (request_count and requests_seen >= request_count):
+                return elapsed, requests_seen
+            await asyncio.sleep(min(0.01, duration_s - elapsed))
+
+    @staticmethod
+    def _memory_report(top_n: int) -> str:
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f"traced: current {current / 2**20:.1f} MiB, peak {peak / 2**20:.1f} MiB"]
+        for stat in snapshot.statistics("lineno")[:top_n]:
+            lines.append(str(stat))
+        return "\n".join(lines)
@@ -0,0 +1,307 @@
+import os
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from ..algorithms import RouteResult
+
+DEFAULT_ROUTE_CACHE_SIZE = 10000
+DEFAULT_LANDMARK_COUNT = 4
+# Shortest-path trees grown per version from the endpoints of the cheapest changed edges
+DEFAULT_DETOUR_TREES = 16
+
+# Algorithms whose result depends only on the weights along the chosen path
+# and the global shortest distances; heuristic searches also look at the
+# edges around every node they visit.
+EXACT_ALGORITHMS = {"dijkstra"}
+
+RouteKey = Tuple[str, str, str]
+EdgeKey = Tuple[str, str]
+
+
+def edge_key(u: str, v: str) -> EdgeKey:
+    return (u, v) if u <= v else (v, u)
+
+
+class RouteCache:
+    def __init__(self, max_entries: Optional[int] = None, landmark_count: Optional[int] = None,
+                 detour_trees: Optional[int] = None):
+        if max_entries is None:
+            max_entries = int(os.environ.get("HEURISTIC_ROUTE_CACHE_SIZE", DEFAULT_ROUTE_CACHE_SIZE))
+        self.max_entries = max_entries
+        if landmark_count is None:
+            landmark_count = int(os.environ.get("HEURISTIC_ROUTE_CACHE_LANDMARKS", DEFAULT_LANDMARK_COUNT))
+        self.landmark_count = landmark_count
+        if detour_trees is None:
+            detour_trees = int(os.environ.get("HEURISTIC_ROUTE_CACHE_DETOUR_TREES", DEFAULT_DETOUR_TREES))
+        self.detour_trees = detour_trees
+
+        self._entries: "OrderedDict[RouteKey, RouteResult]" = OrderedDict()
+        self._edge_index: Dict[EdgeKey, Set[RouteKey]] = {}
+        self._node_index: Dict[str, Set[RouteKey]] = {}
+
+        self.version: Optional[int] = None
+        self._edge_states: Dict[EdgeKey, Tuple[float, bool]] = {}
+        self._landmark_index: Dict[str, int] = {}
+        self._landmark_dist: Optional[np.ndarray] = None
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'updates': 0,
+            'invalidated': 0,
+            'revalidated': 0,
+            'last_invalidation_ratio': 0.0
+        }
+        self._lock = threading.RLock()
+
+    def get(self, src: str, dst: str, algorithm: str) -> Optional[RouteResult]:
+        with self._lock:
+            key = (src, dst, algorithm)
+            result = self._entries.get(key)
+            if result is None:
+                self.stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return result
+
+    def put(self, src: str, dst: str, algorithm: str, result: RouteResult, version: int):
+        with self._lock:
+            # A result computed against an older graph must not land in a newer cache
+            if version != self.version:
+                return
+
+            key = (src, dst, algorithm)
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = result
+            self._index(key, result)
+
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def sync(self, graph_manager, calculate_metrics) -> None:
+        with self._lock:
+            # Version, edge states and landmarks all come from one generation, so a publish
+            # in between cannot mix two graphs
+            generation = graph_manager.get_generation()
+            if generation.version == self.version:
+                return
+
+            edge_states = graph_manager.get_edge_states(generation=generation)
+            if self._entries:
+                self._apply_changes(self._edge_states, edge_states, graph_manager, generation, calculate_metrics)
+
+            self._edge_states = edge_states
+            self.version = generation.version
+            self._build_landmarks(graph_manager, generation)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._edge_index.clear()
+            self._node_index.clear()
+
+    def get_stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._entries)
+            return stats
+
+    def _apply_changes(self, old_states, new_states, graph_manager, generation, calculate_metrics):
+        changed_edges: Set[EdgeKey] = set()
+        decreased = []
+        topology_changed = False
+        # Upper bound on how much any distance can have shrunk since the last version
+        total_decrease = 0.0
+
+        for key, (weight, available) in new_states.items():
+            previous = old_states.get(key)
+            if previous is None:
+                topology_changed = True
+                changed_edges.add(key)
+                # A new edge saves at most the old distance between its endpoints
+                saving = max(0.0, self._old_distance_ceiling(*key) - weight)
+                decreased.append((weight, key, saving))
+                total_decrease += saving
+            elif previous != (weight, available):
+                changed_edges.add(key)
+                if weight < previous[0]:
+                    decreased.append((weight, key, previous[0] - weight))
+                    total_decrease += previous[0] - weight
+
+        for key in old_states.keys() - new_states.keys():
+            topology_changed = True
+            changed_edges.add(key)
+
+        decreased.sort()
+        node_index, trees = self._endpoint_trees(decreased, graph_manager, generation)
+        invalidate: Set[RouteKey] = set()
+        revalidate: Set[RouteKey] = set()
+
+        for route_key, result in self._entries.items():
+            if route_key[2] not in EXACT_ALGORITHMS and topology_changed:
+                invalidate.add(route_key)
+                continue
+
+            # An off-path edge that got cheaper than the whole route may open a better path;
+            # cheaper edges on the path itself only lower its cost and keep it shortest
+            path_edges = self._path_edges(result.path)
+            for weight, key, saving in decreased:
+                if weight >= result.total_weight:
+                    break
+                if key in path_edges:
+                    continue
+                if key[0] in trees and key[1] in trees:
+                    bound = self._exact_detour(route_key[0], route_key[1], key, weight, node_index, trees)
+                else:
+                    # The edge's own saving is already in its new weight
+                    bound = self._detour_bound(route_key[0], route_key[1], key, weight, total_decrease, saving)
+                if bound < result.total_weight:
+                    invalidate.add(route_key)
+                    break
+
+        for edge in changed_edges:
+            for route_key in self._edge_index.get(edge, ()):
+                if route_key in invalidate:
+                    continue
+
+                old, new = old_states.get(edge), new_states.get(edge)
+                if new is None or old is None or new[0] > old[0] or route_key[2] not in EXACT_ALGORITHMS:
+                    invalidate.add(route_key)
+                else:
+                    revalidate.add(route_key)
+
+            for node in edge:
+                for route_key in self._node_index.get(node, ()):
+                    if route_key[2] not in EXACT_ALGORITHMS:
+                        invalidate.add(route_key)
+
+        total = len(self._entries)
+        for route_key in invalidate:
+            self._remove(route_key)
+
+        revalidate -= invalidate
+        if revalidate:
+            # Path is still shortest; only its per-edge metrics need refreshing
+            csr, edge_metrics = graph_manager.get_edge_metrics(generation=generation)
+            for route_key in revalidate:
+                result = calculate_metrics(self._entries[route_key].path, csr, edge_metrics)
+                self._entries[route_key] = result
+
+        self.stats['updates'] += 1
+        self.stats['invalidated'] += len(invalidate)
+        self.stats['revalidated'] += len(revalidate)
+        self.stats['last_invalidation_ratio'] = len(invalidate) / total if total else 0.0
+
+    def _endpoint_trees(self, decreased, graph_manager, generation) -> Tuple[Dict[str, int], Dict[str, np.ndarray]]:
+        # New-version distances from both ends of the cheapest changed edges, which threaten the most routes
+        trees: Dict[str, np.ndarray] = {}
+        if self.detour_trees <= 0 or not decreased:
+            return {}, trees
+
+        csr = graph_manager.get_csr(generation=generation)
+        for _, key, _ in decreased:
+            missing = [node for node in key if node not in trees]
+            if len(trees) + len(missing) > self.detour_trees:
+                break
+            for node in missing:
+                trees[node] = csr.shortest_path_tree(csr.node_index_map[node])[0]
+        return csr.node_index_map, trees
+
+    def _exact_detour(self, src: str, dst: str, edge: EdgeKey, weight: float,
+                      node_index: Dict[str, int], trees: Dict[str, np.ndarray]) -> float:
+        # Cost of the best src->dst path through edge now; exact, so no slack for other changes
+        i = node_index.get(src)
+        j = node_index.get(dst)
+        if i is None or j is None:
+            return weight
+
+        du, dv = trees[edge[0]], trees[edge[1]]
+        return weight + float(min(du[i] + dv[j], dv[i] + du[j]))
+
+    def _detour_bound(self, src: str, dst: str, edge: EdgeKey, weight: float, total_decrease: float, saving: float) -> float:
+        # Lower bound on any src->dst path through edge, from old landmark distances (ALT). The two
+        # halves of a simple path share no edge, so together they gained at most the other edges' savings
+        if self._landmark_dist is None or total_decrease == float('inf'):
+            return weight
+
+        u, v = edge
+        halves = min(
+            self._distance_bound(src, u) + self._distance_bound(v, dst),
+            self._distance_bound(src, v) + self._distance_bound(u, dst)
+        )
+        return weight + max(0.0, halves - (total_decrease - saving))
+
+    def _old_distance_ceiling(self, a: str, b: str) -> float:
+        # Upper bound on the old a->b distance: via the landmark that comes closest to both
+        if self._landmark_dist is None:
+            return float('inf')
+        i = self._landmark_index.get(a)
+        j = self._landmark_index.get(b)
+        if i is None or j is None:
+            return float('inf')
+        return float(np.min(self._landmark_dist[:, i] + self._landmark_dist[:, j]))
+
+    def _distance_bound(self, a: str, b: str) -> float:
+        i = self._landmark_index.get(a)
+        j = self._landmark_index.get(b)
+        if i is None or j is None:
+            return 0.0
+
+        da = self._landmark_dist[:, i]
+        db = self._landmark_dist[:, j]
+        finite = np.isfinite(da) & np.isfinite(db)
+        if not finite.any():
+            return 0.0
+        return float(np.max(np.abs(da[finite] - db[finite])))
+
+    def _build_landmarks(self, graph_manager, generation):
+        self._landmark_dist = None
+        self._landmark_index = {}
+        # An empty cache gets landmarks too: entries put at this version are bounded by them at the next
+        has_exact = not self._entries or any(key[2] in EXACT_ALGORITHMS for key in self._entries)
+        if self.landmark_count <= 0 or not has_exact:
+            return
+
+        csr, landmark_dist = graph_manager.get_landmarks(self.landmark_count, generation=generation)
+        if csr.num_nodes == 0:
+            return
+
+        self._landmark_dist = landmark_dist
+        self._landmark_index = csr.node_index_map
+
+    @staticmethod
+    def _path_edges(path) -> Set[EdgeKey]:
+        return {edge_key(path[i], path[i + 1]) for i in range(len(path) - 1)}
+
+    def _index(self, key: RouteKey, result: RouteResult):
+        path = result.path
+        for i in range(len(path) - 1):
+            self._edge_index.setdefault(edge_key(path[i], path[i + 1]), set()).add(key)
+        for node in path:
+            self._node_index.setdefault(node, set()).add(key)
+
+    def _remove(self, key: RouteKey):
+        result = self._entries.pop(key, None)
+        if result is None:
+            return
+
+        path = result.path
+        for i in range(len(path) - 1):
+            ek = edge_key(path[i], path[i + 1])
+            keys = self._edge_index.get(ek)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._edge_index[ek]
+        for node in path:
+            keys = self._node_index.get(node)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._node_index[node]
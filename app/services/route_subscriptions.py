@@ -0,0 +1,147 @@
+import asyncio
+import os
+from typing import Dict, Optional, Set, Tuple
+
+from ..algorithms import RouteConstraints, RouteResult
+
+DEFAULT_ROUTE_TOLERANCE = 0.01
+
+# (src, dst, algorithm, weight profile, constraints); constrained pairs are searched with the constrained search instead
+RouteKey = Tuple[str, str, str, Optional[str], Optional[RouteConstraints]]
+
+
+class RouteSubscriptionManager:
+    def __init__(self, heuristic_engine, tolerance: Optional[float] = None):
+        self.heuristic_engine = heuristic_engine
+        if tolerance is None:
+            tolerance = float(os.environ.get("HEURISTIC_ROUTE_TOLERANCE", DEFAULT_ROUTE_TOLERANCE))
+        self.tolerance = tolerance
+
+        self._subscribers: Dict[RouteKey, Set[asyncio.Queue]] = {}
+        self._last_results: Dict[RouteKey, Optional[RouteResult]] = {}
+        # Graph version each pair's last result was computed from; older results never replace it
+        self._versions: Dict[RouteKey, int] = {}
+
+    async def subscribe(self, src: str, dst: str, algorithm: str, profile: Optional[str] = None,
+                        constraints: Optional[RouteConstraints] = None) -> asyncio.Queue:
+        key = self._key(src, dst, algorithm, profile, constraints)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+
+        if key not in self._last_results:
+            # Registered before the search so a refresh that lands meanwhile covers the pair too
+            self._subscribers.setdefault(key, set())
+            version = self._graph_version()
+            try:
+                result = await self._route(key)
+            except BaseException:
+                if not self._subscribers.get(key):
+                    self._forget(key)
+                raise
+            # A cancelled concurrent first subscriber may have dropped the pair in the meantime
+            self._subscribers.setdefault(key, set())
+            self._store(key, version, result)
+        self._subscribers[key].add(queue)
+
+        # New subscribers start from the current route, not the next change
+        self._offer(queue, self._last_results[key])
+        return queue
+
+    def unsubscribe(self, src: str, dst: str, algorithm: str, queue: asyncio.Queue, profile: Optional[str] = None,
+                    constraints: Optional[RouteConstraints] = None):
+        key = self._key(src, dst, algorithm, profile, constraints)
+        queues = self._subscribers.get(key)
+        if queues is None:
+            return
+
+        queues.discard(queue)
+        if not queues:
+            self._forget(key)
+
+    async def refresh(self) -> int:
+        # Every pair is searched through the engine's async path and pushed as soon as its result is
+        # in. Passes may overlap when snapshots arrive quickly; a result only goes out if no newer
+        # graph version has already been pushed for its pair, so an overtaken pass still delivers
+        version = self._graph_version()
+        results = await asyncio.gather(*(self._refresh_pair(key, version) for key in list(self._subscribers)),
+                                       return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return sum(results)
+
+    async def _refresh_pair(self, key: RouteKey, version: int) -> int:
+        result = await self._route(key)
+        if not self._store(key, version, result):
+            return 0
+
+        for queue in self._subscribers[key]:
+            self._offer(queue, result)
+        return 1
+
+    @staticmethod
+    def _key(src: str, dst: str, algorithm: str, profile: Optional[str],
+             constraints: Optional[RouteConstraints]) -> RouteKey:
+        if constraints is not None and constraints.is_empty():
+            constraints = None
+        return src, dst, algorithm, profile or None, constraints
+
+    async def _route(self, key: RouteKey) -> Optional[RouteResult]:
+        src, dst, algorithm, profile, constraints = key
+        if constraints is not None:
+            return await self.heuristic_engine.find_constrained_route_async(src, dst, constraints, profile)
+        return await self.heuristic_engine.find_optimal_route_async(src, dst, algorithm, profile)
+
+    def _store(self, key: RouteKey, version: int, result: Optional[RouteResult]) -> bool:
+        # Whether result is now the pair's route and differs from the one last sent
+        if key not in self._subscribers or version < self._versions.get(key, version):
+            return False
+        self._versions[key] = version
+        if key in self._last_results and not self._route_changed(self._last_results[key], result):
+            return False
+        self._last_results[key] = result
+        return True
+
+    def _forget(self, key: RouteKey):
+        self._subscribers.pop(key, None)
+        self._last_results.pop(key, None)
+        self._versions.pop(key, None)
+
+    def _graph_version(self) -> int:
+        return self.heuristic_engine.graph_manager.get_version()
+
+    def get_subscription_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def get_pair_count(self) -> int:
+        return len(self._subscribers)
+
+    def get_pending_count(self) -> int:
+        return sum(queue.qsize() for queues in self._subscribers.values() for queue in queues)
+
+    def _route_changed(self, old: Optional[RouteResult], new: Optional[RouteResult]) -> bool:
+        if old is None or new is None:
+            return old is not new
+        if old.path != new.path:
+            return True
+
+        return (
+            self._moved(old.total_weight, new.total_weight) or
+            self._moved(old.total_delay, new.total_delay) or
+            self._moved(old.stability_score, new.stability_score)
+        )
+
+    def _moved(self, old: float, new: float) -> bool:
+        scale = max(abs(old), abs(new))
+        if scale == 0.0:
+            return False
+        return abs(new - old) > self.tolerance * scale
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, result: Optional[RouteResult]):
+        # Slow subscribers only need the latest route, so replace anything unread
+        if queue.full():
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+        queue.put_nowait(result)
@@ -0,0 +1,282 @@
+import asyncio
+import atexit
+import multiprocessing
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..algorithms.base import BaseAlgorithm, RouteResult
+from ..core.graph.csr_graph import shortest_path_tree
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SEGMENT_PREFIX = "heuristic-routes"
+# Workers answer from exact shortest-path trees, which only match what the in-process dijkstra returns
+WORKER_ALGORITHMS = frozenset(('dijkstra',))
+DEFAULT_WORKER_TREES = 32
+SHM_DIR = "/dev/shm"
+
+
+@dataclass(frozen=True)
+class SegmentManifest:
+    name: str
+    version: int
+    # (key, dtype, shape, byte offset) for every array packed into the segment
+    layout: Tuple[Tuple[str, str, Tuple[int, ...], int], ...]
+    size: int
+
+
+def capture_csr_arrays(graph_manager) -> Tuple[int, Dict[str, np.ndarray]]:
+    csr, edge_metrics = graph_manager.get_edge_metrics()
+    return csr.version, {
+        'node_ids': np.array(csr.node_ids, dtype=str),
+        'indptr': csr.indptr,
+        'indices': csr.indices,
+        'weights': csr.weights,
+        'slot_edges': csr.edge_ids.astype(np.int32),
+        'edge_metrics': edge_metrics
+    }
+
+
+def _pack(name: str, version: int, arrays: Dict[str, np.ndarray]) -> Tuple[shared_memory.SharedMemory, SegmentManifest]:
+    layout = []
+    offset = 0
+    for key, array in arrays.items():
+        layout.append((key, array.dtype.str, array.shape, offset))
+        # 8-byte alignment keeps every view naturally aligned
+        offset += (array.nbytes + 7) & ~7
+    shm = shared_memory.SharedMemory(name=name, create=True, size=max(offset, 8))
+    for (key, dtype, shape, start), array in zip(layout, arrays.values()):
+        np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start)[...] = array
+    return shm, SegmentManifest(name=name, version=version, layout=tuple(layout), size=offset)
+
+
+class RouteWorkerPool:
+    def __init__(self, workers: Optional[int] = None, trees_per_worker: Optional[int] = None):
+        if workers is None:
+            workers = int(os.environ.get("HEURISTIC_ROUTE_WORKERS", 0) or 0)
+        if trees_per_worker is None:
+            trees_per_worker = int(os.environ.get("HEURISTIC_ROUTE_WORKER_TREES", DEFAULT_WORKER_TREES))
+        self.workers = max(1, workers)
+        self.trees_per_worker = trees_per_worker
+        self.published = 0
+        self.retired = 0
+
+        # spawn, not fork: the parent runs gRPC and logging threads that must not be forked
+        context = multiprocessing.get_context("spawn")
+        # One single-process executor per shard so a source's cached trees stay on one worker
+        self._executors = [
+            ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=_init_worker,
+                                initargs=(trees_per_worker,))
+            for _ in range(self.workers)
+        ]
+        self._lock = threading.Lock()
+        self._current: Optional[SegmentManifest] = None
+        self._segments: Dict[str, shared_memory.SharedMemory] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._closed = False
+
+        sweep_stale_segments()
+        atexit.register(self.shutdown)
+
+    def publish(self, graph_manager) -> Optional[SegmentManifest]:
+        version, arrays = capture_csr_arrays(graph_manager)
+        with self._lock:
+            if self._closed or (self._current is not None and self._current.version >= version):
+                return self._current
+        name = f"{SEGMENT_PREFIX}-{os.getpid()}-{version}"
+        shm, manifest = _pack(name, version, arrays)
+
+        with self._lock:
+            if self._closed or (self._current is not None and self._current.version >= version):
+                shm.close()
+                shm.unlink()
+                return self._current
+            previous = self._current
+            self._segments[name] = shm
+            self._in_flight[name] = 0
+            self._current = manifest
+            self.published += 1
+            if previous is not None:
+                self._retire(previous.name)
+        return manifest
+
+    def acquire(self, version: int) -> Optional[SegmentManifest]:
+        # Only the segment for the graph version the caller saw may serve it
+        with self._lock:
+            manifest = self._current
+            if manifest is None or manifest.version != version:
+                return None
+            self._in_flight[manifest.name] += 1
+            return manifest
+
+    def release(self, manifest: SegmentManifest):
+        with self._lock:
+            if manifest.name not in self._in_flight:
+                return
+            self._in_flight[manifest.name] -= 1
+            if self._current is not manifest:
+                self._retire(manifest.name)
+
+    async def route(self, manifest: SegmentManifest, src: str, dst: str) -> Optional[RouteResult]:
+        shard = zlib.crc32(src.encode()) % len(self._executors)
+        future = self._executors[shard].submit(_worker_route, manifest, src, dst)
+        return await asyncio.wrap_future(future)
+
+    def get_stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'workers': len(self._executors),
+                'version': self._current.version if self._current is not None else 0,
+                'segments': len(self._segments),
+                'segment_bytes': sum(shm.size for shm in self._segments.values()),
+                'in_flight': sum(self._in_flight.values()),
+                'published': self.published,
+                'retired': self.retired
+            }
+
+    def shutdown(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._current = None
+        for executor in self._executors:
+            executor.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            for name in list(self._segments):
+                self._unlink(name)
+
+    def _retire(self, name: str):
+        # Called with the lock held; old segments live until their last in-flight request finishes
+        if self._in_flight.get(name) == 0:
+            self._unlink(name)
+            self.retired += 1
+
+    def _unlink(self, name: str):
+        shm = self._segments.pop(name)
+        self._in_flight.pop(name, None)
+        shm.close()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def sweep_stale_segments():
+    # Segments left behind by a process that died without unlinking them
+    if not os.path.isdir(SHM_DIR):
+        return
+    for entry in os.listdir(SHM_DIR):
+        if not entry.startswith(SEGMENT_PREFIX + "-"):
+            continue
+        try:
+            pid = int(entry[len(SEGMENT_PREFIX) + 1:].split("-")[0])
+        except ValueError:
+            continue
+        if pid == os.getpid() or _pid_alive(pid):
+            continue
+        try:
+            os.unlink(os.path.join(SHM_DIR, entry))
+            logger.info("Removed stale shared-memory segment {}", entry)
+        except OSError:
+            pass
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class _WorkerGraph:
+    def __init__(self, manifest: SegmentManifest, max_trees: int):
+        self.manifest = manifest
+        self.shm = shared_memory.SharedMemory(name=manifest.name)
+        self.arrays = {
+            key: np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)
+            for key, dtype, shape, offset in manifest.layout
+        }
+        self.node_ids: List[str] = self.arrays['node_ids'].tolist()
+        self.index = {node: i for i, node in enumerate(self.node_ids)}
+        # The segment is shared zero-copy; the heap loop still wants plain lists (see shortest_path_tree)
+        self.ptr = self.arrays['indptr'].tolist()
+        self.adj = self.arrays['indices'].tolist()
+        self.wts = self.arrays['weights'].tolist()
+        self.max_trees = max_trees
+        self.trees: "OrderedDict[int, List[int]]" = OrderedDict()
+
+    def edge_slot(self, u: str, v: str) -> Optional[int]:
+        ui, vi = self.index.get(u), self.index.get(v)
+        if ui is None or vi is None:
+            return None
+        for slot in range(self.ptr[ui], self.ptr[ui + 1]):
+            if self.adj[slot] == vi:
+                return slot
+        return None
+
+    def route(self, src: str, dst: str) -> Optional[RouteResult]:
+        s, t = self.index.get(src), self.index.get(dst)
+        if s is None or t is None:
+            return None
+
+        parent = self.trees.get(s)
+        if parent is None:
+            _, parent_array = shortest_path_tree(self.ptr, self.adj, self.wts, s)
+            parent = parent_array.tolist()
+            self.trees[s] = parent
+            if len(self.trees) > self.max_trees:
+                self.trees.popitem(last=False)
+        else:
+            self.trees.move_to_end(s)
+
+        if s != t and parent[t] < 0:
+            return None
+        path = [self.node_ids[t]]
+        node = t
+        while node != s:
+            node = parent[node]
+            path.append(self.node_ids[node])
+        path.reverse()
+        slots = np.array([self.edge_slot(u, v) for u, v in zip(path, path[1:])], dtype=np.int64)
+        edges = self.arrays['slot_edges'][slots]
+        return _metrics._score_route(path, self.arrays['weights'][slots], self.arrays['edge_metrics'][edges])
+
+    def close(self):
+        # Views must go before the mapping can be closed
+        self.arrays = None
+        self.shm.close()
+
+
+_metrics = BaseAlgorithm(None)
+_worker_graphs: "OrderedDict[str, _WorkerGraph]" = OrderedDict()
+_worker_trees = DEFAULT_WORKER_TREES
+
+
+def _init_worker(max_trees: int):
+    global _worker_trees
+    _worker_trees = max_trees
+
+
+def _worker_route(manifest: SegmentManifest, src: str, dst: str) -> Optional[RouteResult]:
+    graph = _worker_graphs.get(manifest.name)
+    if graph is None:
+        graph = _worker_graphs[manifest.name] = _WorkerGraph(manifest, _worker_trees)
+        # Keep the newest two versions: requests pinned to the previous one may still arrive
+        while len(_worker_graphs) > 2:
+            oldest = min(_worker_graphs.values(), key=lambda g: g.manifest.version)
+            del _worker_graphs[oldest.manifest.name]
+            oldest.close()
+    return graph.route(src, dst)
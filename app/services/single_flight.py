@@ -0,0 +1,40 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from ..utils.instrumentation import COALESCE_WAIT_SECONDS, ROUTE_REQUESTS
+
+
+class SingleFlight:
+    # Concurrent calls with the same key share one in-flight computation. It runs as its own task, so a
+    # caller that is cancelled (client went away) neither cancels it nor fails the others waiting on it
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.stats = {'leaders': 0, 'coalesced': 0}
+
+    async def do(self, key: Hashable, label: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            self.stats['leaders'] += 1
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            return await asyncio.shield(task)
+
+        self.stats['coalesced'] += 1
+        ROUTE_REQUESTS.labels(label, 'coalesced').inc()
+        start = time.perf_counter()
+        try:
+            return await asyncio.shield(task)
+        finally:
+            COALESCE_WAIT_SECONDS.labels(label).observe(time.perf_counter() - start)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception retrieved even if every caller was cancelled; each waiter re-raises its own copy
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, 'in_flight': len(self._calls)}
@@ -0,0 +1,111 @@
+import os
+import queue
+import struct
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+
+from proto import heuristic_pb2
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Each frame: receive time (unix seconds, float64) and payload length, then the serialized GraphSnapshot
+FRAME_HEADER = struct.Struct("<dI")
+DEFAULT_MAX_BYTES = 256 * 2**20
+DEFAULT_KEEP = 3
+QUEUE_SIZE = 64
+
+
+class SnapshotRecorder:
+    def __init__(self, path: str, max_bytes: Optional[int] = None, keep: Optional[int] = None):
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get("HEURISTIC_RECORD_MAX_MB", DEFAULT_MAX_BYTES / 2**20)) * 2**20)
+        if keep is None:
+            keep = int(os.environ.get("HEURISTIC_RECORD_KEEP", DEFAULT_KEEP))
+        self.path = path
+        self.max_bytes = max_bytes
+        self.keep = max(1, keep)
+        self.recorded = 0
+        self.dropped = 0
+
+        # Serialisation and disk writes happen on a writer thread, never on the event loop
+        self._queue: "queue.Queue" = queue.Queue(maxsize=QUEUE_SIZE)
+        self._file = None
+        self._thread = threading.Thread(target=self._run, name="snapshot-recorder", daemon=True)
+        self._thread.start()
+
+    def record(self, snapshot: heuristic_pb2.GraphSnapshot, received_at: Optional[float] = None):
+        try:
+            self._queue.put_nowait((received_at or time.time(), snapshot))
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            received_at, snapshot = item
+            try:
+                self._write(received_at, snapshot.SerializeToString())
+                self.recorded += 1
+            except OSError as e:
+                self.dropped += 1
+                logger.error("Snapshot recording failed: {}", e)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, received_at: float, payload: bytes):
+        if self._file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._file = open(self.path, "ab")
+        elif self._file.tell() + FRAME_HEADER.size + len(payload) > self.max_bytes and self._file.tell() > 0:
+            self._rotate()
+
+        self._file.write(FRAME_HEADER.pack(received_at, len(payload)))
+        self._file.write(payload)
+        self._file.flush()
+
+    def _rotate(self):
+        self._file.close()
+        # keep counts the live file: path, path.1, ..., path.{keep - 1}
+        for i in range(self.keep - 1, 0, -1):
+            source = self.path if i == 1 else f"{self.path}.{i - 1}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i}")
+        if self.keep == 1:
+            os.remove(self.path)
+        self._file = open(self.path, "ab")
+
+
+def read_frames(path: str) -> Iterator[Tuple[float, heuristic_pb2.GraphSnapshot]]:
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(FRAME_HEADER.size)
+            if len(header) < FRAME_HEADER.size:
+                return
+            received_at, length = FRAME_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                # Truncated tail from a crash mid-write
+                return
+            yield received_at, heuristic_pb2.GraphSnapshot.FromString(payload)
+
+
+def recording_files(path: str) -> list:
+    # Oldest rotation first, the live file last
+    rotated = []
+    i = 1
+    while os.path.exists(f"{path}.{i}"):
+        rotated.append(f"{path}.{i}")
+        i += 1
+    files = list(reversed(rotated))
+    if os.path.exists(path):
+        files.append(path)
+    return files
@@ -0,0 +1,303 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond lookups up to multi-second rebuilds
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 100000)
+
+LabelValues = Tuple[str, ...]
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self._children: Dict[LabelValues, object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _format_labels(self, values: LabelValues, extra: Iterable[Tuple[str, str]] = ()) -> str:
+        pairs = list(zip(self.label_names, values)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values: LabelValues, child) -> List[str]:
+        return [f"{self.name}{self._format_labels(values)} {_format_value(child.value)}"]
+
+
+class _Value:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self.labels().dec(amount)
+
+
+class _HistogramValue:
+    __slots__ = ('buckets', 'counts', 'sum', 'count', '_lock')
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def get_total_count(self) -> int:
+        return sum(child.count for child in list(self._children.values()))
+
+    def _render_child(self, values: LabelValues, child: _HistogramValue) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, child.counts):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{self._format_labels(values, [('le', _format_value(bound))])} {cumulative}")
+        lines.append(f"{self.name}_bucket{self._format_labels(values, [('le', '+Inf')])} {child.count}")
+        lines.append(f"{self.name}_sum{self._format_labels(values)} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{self._format_labels(values)} {child.count}")
+        return lines
+
+
+class GaugeFunction(_Metric):
+    kind = 'gauge'
+
+    def __init__(self, name: str, help_text: str, func: Callable[[], Dict[LabelValues, float]], labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self.func = func
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            samples = self.func()
+        except Exception:
+            return lines
+        for values, value in sorted(samples.items()):
+            lines.append(f"{self.name}{self._format_labels(values)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            # Re-registering (e.g. a second servicer in tests) replaces the old source
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(name, lambda: Counter(name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(name, lambda: Gauge(name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(name, lambda: Histogram(name, help_text, labels, buckets))
+
+    def gauge_function(self, name: str, help_text: str, func: Callable[[], Dict[LabelValues, float]], labels: Sequence[str] = ()) -> GaugeFunction:
+        return self.register(GaugeFunction(name, help_text, func, labels))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def _get_or_create(self, name: str, factory):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = factory()
+            return metric
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+REGISTRY = MetricsRegistry()
+
+INGEST_SECONDS = REGISTRY.histogram(
+    'heuristic_ingest_seconds', 'Time spent applying a graph snapshot, by phase', ['phase'])
+GRAPH_SIZE = REGISTRY.gauge(
+    'heuristic_graph_size', 'Nodes and links in the current graph', ['kind'])
+GRAPH_VERSION = REGISTRY.gauge(
+    'heuristic_graph_version', 'Version number of the current graph')
+ROUTE_SECONDS = REGISTRY.histogram(
+    'heuristic_route_search_seconds', 'Route search time per algorithm (cache hits excluded)', ['algorithm'])
+ROUTE_EXPANDED = REGISTRY.histogram(
+    'heuristic_route_nodes_expanded', 'Nodes expanded per route search', ['algorithm'], COUNT_BUCKETS)
+ROUTE_REQUESTS = REGISTRY.counter(
+    'heuristic_route_requests_total', 'Route requests by algorithm and outcome', ['algorithm', 'outcome'])
+COALESCE_WAIT_SECONDS = REGISTRY.histogram(
+    'heuristic_route_coalesce_wait_seconds', 'Time a route request waited on an identical in-flight search', ['algorithm'])
+RPC_SECONDS = REGISTRY.histogram(
+    'heuristic_rpc_seconds', 'gRPC handler latency', ['method'])
+RPC_IN_FLIGHT = REGISTRY.gauge(
+    'heuristic_rpc_in_flight', 'gRPC handlers currently running', ['method'])
+STEP_EVENTS = REGISTRY.counter(
+    'heuristic_step_events_total', 'AlgorithmStep events streamed by RunAlgorithm', ['algorithm'])
+STABILITY_SECONDS = REGISTRY.histogram(
+    'heuristic_stability_update_seconds', 'Time spent feeding a snapshot into the stability history')
+
+
+@contextmanager
+def track_rpc(method: str):
+    in_flight = RPC_IN_FLIGHT.labels(method)
+    in_flight.inc()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        RPC_SECONDS.labels(method).observe(time.perf_counter() - start)
+        in_flight.dec()
+
+
+@contextmanager
+def track_stream(method: str):
+    # Streams live for as long as the client stays subscribed, so only their count is useful
+    in_flight = RPC_IN_FLIGHT.labels(method)
+    in_flight.inc()
+    try:
+        yield
+    finally:
+        in_flight.dec()
+
+
+def _metrics_handler(registry: MetricsRegistry):
+    # http.server is only imported when the endpoint is enabled
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+
+def start_metrics_server(listen: str, registry: MetricsRegistry = REGISTRY):
+    if not listen:
+        return None
+
+    from http.server import ThreadingHTTPServer
+
+    host, _, port = listen.rpartition(':')
+    server = ThreadingHTTPServer((host.strip('[]') or '0.0.0.0', int(port)), _metrics_handler(registry))
+    thread = threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,36 @@
+import importlib
+import threading
+from types import ModuleType
+from typing import Optional
+
+
+class LazyModule:
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+
+    def __getattr__(self, attr: str):
+        # Only reached for names not set in __init__, i.e. attributes of the real module
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+def prefetch(*names: str) -> threading.Thread:
+    # Warm the import cache off the startup path; a first real use simply waits on the import lock
+    def run():
+        for name in names:
+            importlib.import_module(name)
+
+    thread = threading.Thread(target=run, name="import-prefetch", daemon=True)
+    thread.start()
+    return thread
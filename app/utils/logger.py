@@ -1,44 +1,205 @@
-# Simple logging utilities
-
-class SimpleLogger:
-    def __init__(self, name: str):
-        self.name = name
-    
-    def debug(self, message: str):
-        pass  # Skip debug messages
-    
-    def info(self, message: str):
-        print(f"[{self.name}] {message}")
-    
-    def warning(self, message: str):
-        print(f"[{self.name}] WARNING: {message}")
-    
-    def error(self, message: str):
-        print(f"[{self.name}] ERROR: {message}")
+# Structured logging on top of loguru. Records are handed to a background writer
+# thread (enqueue=True), so RPC handlers never block on stderr.
+import contextvars
+import itertools
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from loguru import logger as _logger
+
+from .instrumentation import GRAPH_SIZE, GRAPH_VERSION
+
+DEFAULT_LEVEL = "INFO"
+# Identical warnings/errors from one call site allowed per window before they are dropped
+DEFAULT_RATE_LIMIT = 20
+DEFAULT_RATE_WINDOW_S = 10.0
+
+request_id_var: contextvars.ContextVar = contextvars.ContextVar("request_id", default="-")
+graph_version_var: contextvars.ContextVar = contextvars.ContextVar("graph_version", default=0)
+
+_request_ids = itertools.count(1)
+_configured = False
+_configure_lock = threading.Lock()
+
+
+class ModuleLevelFilter:
+    def __init__(self, default_level: str, module_levels: Dict[str, str]):
+        self.default_no = _logger.level(default_level.upper()).no
+        # Longest prefix wins, so "app.services.route_cache" overrides "app.services"
+        self.module_levels = sorted(
+            ((module, _logger.level(level.upper()).no) for module, level in module_levels.items()),
+            key=lambda item: len(item[0]), reverse=True)
+        self._cache: Dict[str, int] = {}
+
+    def min_level(self) -> int:
+        return min([self.default_no] + [no for _, no in self.module_levels])
+
+    def level_for(self, name: Optional[str]) -> int:
+        name = name or ""
+        level = self._cache.get(name)
+        if level is None:
+            level = self.default_no
+            for module, no in self.module_levels:
+                if name == module or name.startswith(module + "."):
+                    level = no
+                    break
+            self._cache[name] = level
+        return level
+
+    def __call__(self, record) -> bool:
+        return record["level"].no >= self.level_for(record["name"])
+
+
+class RateLimiter:
+    def __init__(self, limit: int, window_s: float, min_level: str = "WARNING"):
+        self.limit = limit
+        self.window_s = window_s
+        self.min_level_no = _logger.level(min_level).no
+        self._windows: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, record) -> bool:
+        if self.limit <= 0 or record["level"].no < self.min_level_no:
+            return True
+
+        key = (record["name"], record["function"], record["line"])
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.window_s:
+                suppressed = window[2] if window is not None else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record["extra"]["suppressed"] = suppressed
+                return True
+
+            window[1] += 1
+            if window[1] > self.limit:
+                window[2] += 1
+                return False
+            return True
+
+
+def _add_context(record):
+    extra = record["extra"]
+    extra.setdefault("component", record["name"])
+    extra.setdefault("request_id", request_id_var.get())
+    extra.setdefault("graph_version", graph_version_var.get())
+
+
+def _text_format(record) -> str:
+    line = ("{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <7} | {extra[component]} | "
+            "req={extra[request_id]} v={extra[graph_version]} | {message}")
+    if record["extra"].get("suppressed"):
+        line += " ({extra[suppressed]} similar messages suppressed)"
+    return line + "\n{exception}"
+
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    levels = {}
+    for item in spec.split(","):
+        module, _, level = item.partition("=")
+        if module.strip() and level.strip():
+            levels[module.strip()] = level.strip()
+    return levels
+
+
+def configure_logging(level: Optional[str] = None, module_levels: Optional[Dict[str, str]] = None,
+                      json_output: Optional[bool] = None, sink=None, enqueue: bool = True):
+    global _configured
+    with _configure_lock:
+        if level is None:
+            level = os.environ.get("HEURISTIC_LOG_LEVEL", DEFAULT_LEVEL)
+        if module_levels is None:
+            module_levels = _parse_levels(os.environ.get("HEURISTIC_LOG_LEVELS", ""))
+        if json_output is None:
+            json_output = os.environ.get("HEURISTIC_LOG_FORMAT", "").lower() == "json"
+
+        levels = ModuleLevelFilter(level, module_levels)
+        limiter = RateLimiter(
+            int(os.environ.get("HEURISTIC_LOG_RATE_LIMIT", DEFAULT_RATE_LIMIT)),
+            float(os.environ.get("HEURISTIC_LOG_RATE_WINDOW_S", DEFAULT_RATE_WINDOW_S)))
+
+        _logger.remove()
+        _logger.configure(patcher=_add_context)
+        _logger.add(
+            sink or sys.stderr,
+            level=levels.min_level(),
+            filter=lambda record: levels(record) and limiter(record),
+            format="{message}" if json_output else _text_format,
+            serialize=json_output,
+            enqueue=enqueue,
+            backtrace=False,
+            diagnose=False
+        )
+        _configured = True
+
+
+def get_logger(name: str):
+    if not _configured:
+        configure_logging()
+    return _logger.bind(component=name)
+
+
+def next_request_id(context=None) -> str:
+    # Clients may pass their own id so their logs and ours line up
+    if context is not None:
+        for key, value in context.invocation_metadata() or ():
+            if key == "x-request-id":
+                return value
+    return f"{next(_request_ids):x}"
+
+
+@contextmanager
+def log_context(request_id: Optional[str] = None, graph_version: Optional[int] = None):
+    tokens = []
+    if request_id is not None:
+        tokens.append((request_id_var, request_id_var.set(request_id)))
+    if graph_version is not None:
+        tokens.append((graph_version_var, graph_version_var.set(graph_version)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
 
 
 class PerformanceLogger:
-    def __init__(self, operation: str, logger):
+    def __init__(self, operation: str, logger, histogram=None):
         self.operation = operation
         self.logger = logger
-    
+        self.histogram = histogram
+        self.elapsed_ms = 0.0
+        self._start = 0.0
+
     def __enter__(self):
+        self._start = time.perf_counter()
         return self
-    
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        pass  # Skip performance logging
-
 
-def get_logger(name: str):
-    return SimpleLogger(name)
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        elapsed = time.perf_counter() - self._start
+        self.elapsed_ms = elapsed * 1000.0
+        if self.histogram is not None:
+            self.histogram.observe(elapsed)
+        self.logger.opt(depth=1).debug("{} took {:.2f} ms", self.operation, self.elapsed_ms)
 
 
-def log_graph_update(nodes_count: int, links_count: int, update_time_ms: float):
-    print(f"[HEURISTIC] Graph updated: {nodes_count} nodes, {links_count} links")
+def log_graph_update(nodes_count: int, links_count: int, update_time_ms: float, version: int = 0):
+    GRAPH_SIZE.labels('nodes').set(nodes_count)
+    GRAPH_SIZE.labels('links').set(links_count)
+    GRAPH_VERSION.set(version)
+    # depth=1 attributes the record (and its module level) to the caller
+    _logger.opt(depth=1).info("Graph updated: {} nodes, {} links in {:.1f} ms", nodes_count, links_count, update_time_ms)
 
 
 def log_route_calculation(src: str, dst: str, algorithm: str, result, calculation_time_ms: float):
+    # Routes are the hot path; formatting only happens when debug is enabled for the caller
+    log = _logger.opt(depth=1)
     if result:
-        print(f"[HEURISTIC] Route found [{algorithm}]: {src} -> {dst} ({result.hop_count} hops)")
+        log.debug("Route found [{}]: {} -> {} ({} hops, {:.2f} ms)", algorithm, src, dst, result.hop_count, calculation_time_ms)
     else:
-        print(f"[HEURISTIC] No route found [{algorithm}]: {src} -> {dst}")
\ No newline at end of file
+        log.debug("No route found [{}]: {} -> {} ({:.2f} ms)", algorithm, src, dst, calculation_time_ms)
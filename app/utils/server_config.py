@@ -0,0 +1,88 @@
+import os
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import grpc
+
+COMPRESSION = {
+    "none": grpc.Compression.NoCompression,
+    "gzip": grpc.Compression.Gzip,
+    "deflate": grpc.Compression.Deflate
+}
+
+
+def _int_env(name: str) -> Optional[int]:
+    value = os.environ.get(name, "")
+    return int(value) if value else None
+
+
+def _mb_env(name: str) -> Optional[int]:
+    value = os.environ.get(name, "")
+    if not value:
+        return None
+    # Negative means unlimited, which gRPC spells -1
+    megabytes = float(value)
+    return -1 if megabytes < 0 else int(megabytes * 2**20)
+
+
+def compression_from_env(name: str) -> Optional[grpc.Compression]:
+    value = os.environ.get(name, "").lower()
+    if not value:
+        return None
+    if value not in COMPRESSION:
+        raise ValueError(f"{name} must be one of {', '.join(COMPRESSION)}, got {value!r}")
+    return COMPRESSION[value]
+
+
+@dataclass
+class ServerConfig:
+    listen: str = "0.0.0.0:50052"
+    # Admin RPCs on their own server (and port), so profiling and health checks are not queued behind routing load
+    admin_listen: str = ""
+    max_concurrent_rpcs: Optional[int] = None
+    max_concurrent_streams: Optional[int] = None
+    max_receive_message_bytes: Optional[int] = None
+    max_send_message_bytes: Optional[int] = None
+    keepalive_time_ms: Optional[int] = None
+    keepalive_timeout_ms: Optional[int] = None
+    keepalive_permit_without_calls: Optional[bool] = None
+    min_ping_interval_ms: Optional[int] = None
+    compression: Optional[grpc.Compression] = None
+
+    @classmethod
+    def from_env(cls) -> 'ServerConfig':
+        permit = os.environ.get("HEURISTIC_KEEPALIVE_PERMIT_WITHOUT_CALLS", "")
+        return cls(
+            listen=os.environ.get("HEURISTIC_LISTEN", cls.listen),
+            admin_listen=os.environ.get("HEURISTIC_ADMIN_LISTEN", ""),
+            max_concurrent_rpcs=_int_env("HEURISTIC_MAX_CONCURRENT_RPCS"),
+            max_concurrent_streams=_int_env("HEURISTIC_MAX_CONCURRENT_STREAMS"),
+            max_receive_message_bytes=_mb_env("HEURISTIC_MAX_RECEIVE_MESSAGE_MB"),
+            max_send_message_bytes=_mb_env("HEURISTIC_MAX_SEND_MESSAGE_MB"),
+            keepalive_time_ms=_int_env("HEURISTIC_KEEPALIVE_TIME_MS"),
+            keepalive_timeout_ms=_int_env("HEURISTIC_KEEPALIVE_TIMEOUT_MS"),
+            keepalive_permit_without_calls=permit.lower() in ("1", "true", "yes") if permit else None,
+            min_ping_interval_ms=_int_env("HEURISTIC_MIN_PING_INTERVAL_MS"),
+            compression=compression_from_env("HEURISTIC_COMPRESSION")
+        )
+
+    def options(self) -> List[Tuple[str, int]]:
+        # Only explicitly configured options are passed; everything else keeps gRPC's defaults
+        options = [
+            ("grpc.max_concurrent_streams", self.max_concurrent_streams),
+            ("grpc.max_receive_message_length", self.max_receive_message_bytes),
+            ("grpc.max_send_message_length", self.max_send_message_bytes),
+            ("grpc.keepalive_time_ms", self.keepalive_time_ms),
+            ("grpc.keepalive_timeout_ms", self.keepalive_timeout_ms),
+            ("grpc.keepalive_permit_without_calls",
+             None if self.keepalive_permit_without_calls is None else int(self.keepalive_permit_without_calls)),
+            ("grpc.http2.min_recv_ping_interval_without_data_ms", self.min_ping_interval_ms)
+        ]
+        return [(key, value) for key, value in options if value is not None]
+
+    def create_server(self) -> grpc.aio.Server:
+        return grpc.aio.server(
+            options=self.options(),
+            maximum_concurrent_rpcs=self.max_concurrent_rpcs,
+            compression=self.compression
+        )
@@ -0,0 +1 @@
+# Benchmark suite: synthetic SAGSIN topologies and timing runners
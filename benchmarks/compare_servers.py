@@ -0,0 +1,125 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.load_test import free_port, run as run_load, start_server
+
+
+def export_tree(ref: str, directory: str) -> str:
+    # A clean copy of the baseline revision, independent of the working tree
+    archive = os.path.join(directory, "baseline.tar")
+    subprocess.run(['git', 'archive', '--format=tar', '-o', archive, ref], cwd=ROOT, check=True)
+    tree = os.path.join(directory, "tree")
+    with tarfile.open(archive) as tar:
+        tar.extractall(tree)
+    return tree
+
+
+def parse_env(items: List[str]) -> Dict[str, str]:
+    env = {}
+    for item in items:
+        key, _, value = item.partition("=")
+        env[key] = value
+    return env
+
+
+async def measure(root: str, env: Dict[str, str], args) -> Dict:
+    port = free_port()
+    server = start_server(port, root=root, env=env)
+    try:
+        load_args = argparse.Namespace(
+            target=f"127.0.0.1:{port}", server_pid=server.pid, nodes=args.nodes, clients=args.clients,
+            duration=args.duration, push_interval=args.push_interval, churn=args.churn,
+            stream_ratio=args.stream_ratio, seed=args.seed)
+        return await run_load(load_args)
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+async def compare(args) -> Dict:
+    with tempfile.TemporaryDirectory(prefix="heuristic-baseline-") as directory:
+        baseline_root = export_tree(args.baseline, directory)
+        runs = {'baseline': [], 'current': []}
+        # Alternate the two servers so drift on the machine hits both equally
+        for _ in range(args.rounds):
+            runs['baseline'].append(await measure(baseline_root, parse_env(args.baseline_env), args))
+            runs['current'].append(await measure(ROOT, parse_env(args.env), args))
+
+    rpcs = {}
+    for label, reports in runs.items():
+        for report in reports:
+            for name, stats in report['rpcs'].items():
+                entry = rpcs.setdefault(name, {}).setdefault(label, {'throughput_per_s': [], 'p99_ms': []})
+                entry['throughput_per_s'].append(stats['throughput_per_s'])
+                entry['p99_ms'].append(stats['p99_ms'])
+
+    summary = {}
+    for name, labels in rpcs.items():
+        summary[name] = {
+            label: {metric: sorted(values)[len(values) // 2] for metric, values in metrics.items()}
+            for label, metrics in labels.items()
+        }
+    return {
+        'config': {
+            'baseline': args.baseline, 'baseline_env': args.baseline_env, 'env': args.env,
+            'rounds': args.rounds, 'nodes': args.nodes, 'clients': args.clients,
+            'duration_s': args.duration, 'stream_ratio': args.stream_ratio
+        },
+        'rpcs': summary,
+        'runs': runs
+    }
+
+
+def print_report(report: Dict):
+    config = report['config']
+    print(f"# {config['baseline']} vs working tree: {config['nodes']} nodes, {config['clients']} clients, "
+          f"{config['duration_s']}s x {config['rounds']} rounds (medians)")
+    print(f"{'rpc':<22} {'base req/s':>11} {'req/s':>9} {'delta':>8} {'base p99':>9} {'p99':>9}")
+    for name, labels in report['rpcs'].items():
+        base = labels.get('baseline', {'throughput_per_s': 0.0, 'p99_ms': 0.0})
+        current = labels.get('current', {'throughput_per_s': 0.0, 'p99_ms': 0.0})
+        delta = (current['throughput_per_s'] / base['throughput_per_s'] - 1.0) * 100.0 if base['throughput_per_s'] else 0.0
+        print(f"{name:<22} {base['throughput_per_s']:>11.1f} {current['throughput_per_s']:>9.1f} {delta:>7.1f}% "
+              f"{base['p99_ms']:>9.2f} {current['p99_ms']:>9.2f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the load test against a baseline revision and the working tree")
+    parser.add_argument('--baseline', default='HEAD', help="git revision to compare against")
+    parser.add_argument('--env', action='append', default=[], help="KEY=VALUE for the working-tree server (repeatable)")
+    parser.add_argument('--baseline-env', action='append', default=[], help="KEY=VALUE for the baseline server (repeatable)")
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--nodes', type=int, default=1000)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=15.0)
+    parser.add_argument('--push-interval', type=float, default=4.0)
+    parser.add_argument('--churn', type=float, default=0.02)
+    parser.add_argument('--stream-ratio', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="write JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(compare(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
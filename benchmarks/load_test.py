@@ -0,0 +1,264 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import grpc
+import psutil
+
+from proto import heuristic_pb2, heuristic_pb2_grpc
+from proto import algorithm_stream_pb2, algorithm_stream_pb2_grpc
+from benchmarks.topology import TopologyGenerator
+
+ALGORITHMS = ["astar", "dijkstra", "greedy"]
+PROBE_INTERVAL_S = 0.05
+
+
+class LatencyRecorder:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.counters: Dict[str, int] = {}
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record(self, name: str, seconds: float):
+        self.samples.setdefault(name, []).append(seconds * 1000.0)
+
+    def error(self, name: str):
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+    def summary(self, duration_s: float) -> Dict[str, Dict]:
+        result = {}
+        for name in sorted(set(self.samples) | set(self.errors)):
+            values = sorted(self.samples.get(name, []))
+            result[name] = {
+                'count': len(values),
+                'errors': self.errors.get(name, 0),
+                'throughput_per_s': len(values) / duration_s if duration_s else 0.0,
+                'p50_ms': percentile(values, 50),
+                'p95_ms': percentile(values, 95),
+                'p99_ms': percentile(values, 99),
+                'max_ms': values[-1] if values else 0.0
+            }
+        return result
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    rank = min(len(values) - 1, max(0, int(round(pct / 100.0 * len(values) + 0.5)) - 1))
+    return values[rank]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, root: str = ROOT, env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+    env = dict(os.environ, **(env or {}), HEURISTIC_LISTEN=f"127.0.0.1:{port}")
+    return subprocess.Popen([sys.executable, '-m', 'app.main'], cwd=root, env=env)
+
+
+async def wait_for_server(channel: grpc.aio.Channel, timeout_s: float = 30.0):
+    await asyncio.wait_for(channel.channel_ready(), timeout_s)
+
+
+async def push_snapshots(stub, generator: TopologyGenerator, state, interval_s: float, churn: float,
+                         recorder: LatencyRecorder, stop: asyncio.Event, node_ids: List[str]):
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), interval_s)
+            return
+        except asyncio.TimeoutError:
+            pass
+
+        state = generator.churn(state, churn)
+        snapshot = generator.to_snapshot(state)
+        node_ids[:] = [n.id for n in snapshot.nodes]
+
+        start = time.perf_counter()
+        try:
+            await stub.UpdateGraph(snapshot)
+            recorder.record('UpdateGraph', time.perf_counter() - start)
+        except grpc.aio.AioRpcError:
+            recorder.error('UpdateGraph')
+
+
+async def route_client(stub, stream_stub, rng: random.Random, stream_ratio: float,
+                       recorder: LatencyRecorder, stop: asyncio.Event, node_ids: List[str]):
+    while not stop.is_set():
+        if len(node_ids) < 2:
+            await asyncio.sleep(0.01)
+            continue
+
+        src, dst = rng.sample(node_ids, 2)
+        algorithm = rng.choice(ALGORITHMS)
+        name = 'RunAlgorithm' if rng.random() < stream_ratio else 'RequestRoute'
+        start = time.perf_counter()
+        try:
+            if name == 'RunAlgorithm':
+                request = algorithm_stream_pb2.AlgorithmRunRequest(algo=algorithm, src=src, dst=dst)
+                async for _event in stream_stub.RunAlgorithm(request):
+                    recorder.count('RunAlgorithm.events')
+            else:
+                request = heuristic_pb2.RouteRequest(source_node_id=src, destination_node_id=dst, algorithm=algorithm)
+                await stub.RequestRoute(request)
+            recorder.record(name, time.perf_counter() - start)
+        except grpc.aio.AioRpcError:
+            recorder.error(name)
+
+
+async def probe_server_loop(stub, recorder: LatencyRecorder, stop: asyncio.Event):
+    # A route request for unknown nodes returns without any search, so its latency
+    # is dominated by how long the server's event loop takes to get to it
+    request = heuristic_pb2.RouteRequest(source_node_id='__probe__', destination_node_id='__probe__')
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            await stub.RequestRoute(request)
+            recorder.record('server_loop_lag', time.perf_counter() - start)
+        except grpc.aio.AioRpcError:
+            recorder.error('server_loop_lag')
+        await asyncio.sleep(PROBE_INTERVAL_S)
+
+
+async def probe_client_loop(recorder: LatencyRecorder, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL_S)
+        recorder.record('client_loop_lag', max(0.0, time.perf_counter() - start - PROBE_INTERVAL_S))
+
+
+async def sample_rss(process: Optional[psutil.Process], samples: List[int], stop: asyncio.Event):
+    while process is not None and not stop.is_set():
+        try:
+            samples.append(process.memory_info().rss)
+        except psutil.Error:
+            return
+        await asyncio.sleep(0.5)
+
+
+async def run(args) -> Dict:
+    server = None
+    target = args.target
+    server_pid = args.server_pid
+    if not target:
+        port = free_port()
+        server = start_server(port)
+        target = f"127.0.0.1:{port}"
+        server_pid = server.pid
+
+    try:
+        async with grpc.aio.insecure_channel(target) as channel:
+            await wait_for_server(channel)
+            stub = heuristic_pb2_grpc.HeuristicServiceStub(channel)
+            stream_stub = algorithm_stream_pb2_grpc.AlgorithmStreamServiceStub(channel)
+
+            recorder = LatencyRecorder()
+            stop = asyncio.Event()
+            node_ids: List[str] = []
+            rss_samples: List[int] = []
+            process = psutil.Process(server_pid) if server_pid else None
+
+            generator = TopologyGenerator(args.seed)
+            # Clients start once the first snapshot is in
+            state = generator.generate(args.nodes)
+            first = generator.to_snapshot(state)
+            await stub.UpdateGraph(first)
+            node_ids[:] = [n.id for n in first.nodes]
+
+            rng = random.Random(args.seed)
+            tasks = [
+                asyncio.create_task(push_snapshots(stub, generator, state, args.push_interval, args.churn, recorder, stop, node_ids)),
+                asyncio.create_task(probe_server_loop(stub, recorder, stop)),
+                asyncio.create_task(probe_client_loop(recorder, stop)),
+                asyncio.create_task(sample_rss(process, rss_samples, stop)),
+            ]
+            tasks += [
+                asyncio.create_task(route_client(stub, stream_stub, random.Random(rng.random()), args.stream_ratio, recorder, stop, node_ids))
+                for _ in range(args.clients)
+            ]
+
+            start = time.perf_counter()
+            await asyncio.sleep(args.duration)
+            stop.set()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            elapsed = time.perf_counter() - start
+
+            return {
+                'config': {
+                    'nodes': args.nodes,
+                    'clients': args.clients,
+                    'push_interval_s': args.push_interval,
+                    'churn': args.churn,
+                    'stream_ratio': args.stream_ratio,
+                    'duration_s': elapsed
+                },
+                'rpcs': recorder.summary(elapsed),
+                'counters': dict(recorder.counters),
+                'server_rss_mb': {
+                    'max': max(rss_samples) / 2**20 if rss_samples else None,
+                    'final': rss_samples[-1] / 2**20 if rss_samples else None
+                }
+            }
+    finally:
+        if server is not None:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+
+def print_report(report: Dict):
+    config = report['config']
+    print(f"# {config['nodes']} nodes, {config['clients']} clients, push every {config['push_interval_s']}s, {config['duration_s']:.1f}s")
+    print(f"{'rpc':<22} {'count':>8} {'err':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, stats in report['rpcs'].items():
+        print(f"{name:<22} {stats['count']:>8} {stats['errors']:>5} {stats['throughput_per_s']:>9.1f} "
+              f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['max_ms']:>9.2f}")
+    for name, value in report['counters'].items():
+        print(f"{name}: {value}")
+    rss = report['server_rss_mb']
+    if rss['max'] is not None:
+        print(f"server RSS: max {rss['max']:.1f} MB, final {rss['final']:.1f} MB")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test a local heuristic gRPC server")
+    parser.add_argument('--target', help="host:port of a running server (default: start app.main locally)")
+    parser.add_argument('--server-pid', type=int, help="pid of --target for RSS sampling")
+    parser.add_argument('--nodes', type=int, default=1000)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--push-interval', type=float, default=4.0)
+    parser.add_argument('--churn', type=float, default=0.02)
+    parser.add_argument('--stream-ratio', type=float, default=0.1, help="fraction of client calls that use RunAlgorithm")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="write JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
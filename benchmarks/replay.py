@@ -0,0 +1,216 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import grpc
+
+from proto import heuristic_pb2, heuristic_pb2_grpc
+from app.core import GraphManager
+from app.analysis import StabilityAnalyzer
+from app.services.heuristic_engine import HeuristicEngine
+from app.services.snapshot_recorder import read_frames, recording_files
+from benchmarks.load_test import ALGORITHMS, LatencyRecorder, free_port, start_server, wait_for_server
+from benchmarks.run import _feed_stability
+
+
+class InProcessTarget:
+    def __init__(self):
+        self.graph_manager = GraphManager()
+        self.stability_analyzer = StabilityAnalyzer()
+        self.engine = HeuristicEngine(self.graph_manager)
+
+    async def ingest(self, snapshot, recorder: LatencyRecorder):
+        start = time.perf_counter()
+        ok = self.graph_manager.update_graph(snapshot)
+        recorder.record('ingest.update_graph', time.perf_counter() - start)
+        if not ok:
+            recorder.error('ingest.update_graph')
+            return
+
+        start = time.perf_counter()
+        _feed_stability(self.stability_analyzer, snapshot)
+        recorder.record('ingest.stability', time.perf_counter() - start)
+
+    async def route(self, src: str, dst: str, algorithm: str):
+        return self.engine.find_optimal_route(src, dst, algorithm)
+
+
+class GrpcTarget:
+    def __init__(self, channel: grpc.aio.Channel):
+        self.stub = heuristic_pb2_grpc.HeuristicServiceStub(channel)
+
+    async def ingest(self, snapshot, recorder: LatencyRecorder):
+        start = time.perf_counter()
+        try:
+            response = await self.stub.UpdateGraph(snapshot)
+            recorder.record('UpdateGraph', time.perf_counter() - start)
+            if not response.success:
+                recorder.error('UpdateGraph')
+        except grpc.aio.AioRpcError:
+            recorder.error('UpdateGraph')
+
+    async def route(self, src: str, dst: str, algorithm: str):
+        return await self.stub.RequestRoute(
+            heuristic_pb2.RouteRequest(source_node_id=src, destination_node_id=dst, algorithm=algorithm))
+
+
+def load_frames(paths: List[str]):
+    files = []
+    for path in paths:
+        # A base recording path expands to its rotated files, oldest first
+        files.extend(recording_files(path))
+    frames = []
+    for path in files:
+        frames.extend(read_frames(path))
+    return frames
+
+
+async def feed(target, frames, speed: float, recorder: LatencyRecorder, node_ids: List[str], lag: List[float]):
+    if not frames:
+        return
+    first = frames[0][0]
+    start = time.perf_counter()
+    for received_at, snapshot in frames:
+        if speed > 0:
+            due = start + (received_at - first) / speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif delay < -0.001:
+                # How far ingest has fallen behind the recorded schedule
+                lag.append(-delay)
+        await target.ingest(snapshot, recorder)
+        node_ids[:] = [n.id for n in snapshot.nodes]
+        await asyncio.sleep(0)
+
+
+async def query(target, rng: random.Random, algorithms: List[str], interval_s: float,
+                recorder: LatencyRecorder, stop: asyncio.Event, node_ids: List[str]):
+    while not stop.is_set():
+        if len(node_ids) < 2:
+            await asyncio.sleep(0.01)
+            continue
+        src, dst = rng.sample(node_ids, 2)
+        algorithm = rng.choice(algorithms)
+        name = f"route.{algorithm}"
+        start = time.perf_counter()
+        try:
+            await target.route(src, dst, algorithm)
+            recorder.record(name, time.perf_counter() - start)
+        except grpc.aio.AioRpcError:
+            recorder.error(name)
+        await asyncio.sleep(interval_s)
+
+
+async def replay(args) -> Dict:
+    frames = load_frames(args.recording)
+    if args.limit:
+        frames = frames[:args.limit]
+
+    server = None
+    channel = None
+    target_addr = args.target
+    if args.server and not target_addr:
+        port = free_port()
+        server = start_server(port)
+        target_addr = f"127.0.0.1:{port}"
+
+    try:
+        if target_addr:
+            channel = grpc.aio.insecure_channel(target_addr)
+            await wait_for_server(channel)
+            target = GrpcTarget(channel)
+        else:
+            target = InProcessTarget()
+
+        recorder = LatencyRecorder()
+        stop = asyncio.Event()
+        node_ids: List[str] = []
+        lag: List[float] = []
+        rng = random.Random(args.seed)
+
+        interval_s = args.clients / args.query_rate if args.query_rate > 0 else 0.0
+        queries = [
+            asyncio.create_task(query(target, random.Random(rng.random()), args.algorithms.split(','), interval_s, recorder, stop, node_ids))
+            for _ in range(args.clients if args.query_rate > 0 else 0)
+        ]
+
+        start = time.perf_counter()
+        await feed(target, frames, args.speed, recorder, node_ids, lag)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await asyncio.gather(*queries, return_exceptions=True)
+
+        recorded_span = frames[-1][0] - frames[0][0] if len(frames) > 1 else 0.0
+        return {
+            'config': {
+                'recording': args.recording,
+                'frames': len(frames),
+                'recorded_span_s': recorded_span,
+                'speed': args.speed,
+                'target': target_addr or 'in-process',
+                'query_rate': args.query_rate,
+                'duration_s': elapsed
+            },
+            'rpcs': recorder.summary(elapsed),
+            'counters': dict(recorder.counters),
+            'schedule_lag_ms': {
+                'late_frames': len(lag),
+                'max': max(lag) * 1000.0 if lag else 0.0
+            }
+        }
+    finally:
+        if channel is not None:
+            await channel.close()
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+
+def print_report(report: Dict):
+    config = report['config']
+    print(f"# {config['frames']} frames ({config['recorded_span_s']:.1f}s recorded) replayed "
+          f"into {config['target']} at {'max' if config['speed'] <= 0 else str(config['speed']) + 'x'} "
+          f"speed in {config['duration_s']:.1f}s")
+    print(f"{'operation':<22} {'count':>8} {'err':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, stats in report['rpcs'].items():
+        print(f"{name:<22} {stats['count']:>8} {stats['errors']:>5} "
+              f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['max_ms']:>9.2f}")
+    lag = report['schedule_lag_ms']
+    if lag['late_frames']:
+        print(f"ingest fell behind the recording on {lag['late_frames']} frames (max {lag['max']:.1f} ms)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay a recorded GraphSnapshot stream (HEURISTIC_RECORD_PATH)")
+    parser.add_argument('recording', nargs='+', help="recording file(s); a base path includes its rotated files")
+    parser.add_argument('--speed', type=float, default=1.0, help="1 = real time, N = N times faster, 0 = as fast as possible")
+    parser.add_argument('--target', help="host:port of a running server (default: in-process GraphManager)")
+    parser.add_argument('--server', action='store_true', help="start app.main locally and replay over gRPC")
+    parser.add_argument('--query-rate', type=float, default=50.0, help="route queries per second across all clients (0 = none)")
+    parser.add_argument('--clients', type=int, default=4)
+    parser.add_argument('--algorithms', default=','.join(ALGORITHMS))
+    parser.add_argument('--limit', type=int, default=0, help="replay only the first N frames")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="write JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(replay(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
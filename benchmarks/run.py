@@ -0,0 +1,293 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from app.algorithms import ContractionHierarchy
+from app.core import GraphManager
+from app.services.heuristic_engine import HeuristicEngine
+from app.analysis import StabilityAnalyzer
+from benchmarks.topology import TopologyGenerator
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+SNAPSHOT_COUNT = 5
+ROUTE_PAIRS = 20
+
+
+class BenchmarkContext:
+    def __init__(self, node_count: int, seed: int, churn_rate: float):
+        generator = TopologyGenerator(seed)
+        self.node_count = node_count
+        self.snapshots = generator.snapshots(node_count, SNAPSHOT_COUNT, churn_rate)
+        self.graph_manager = GraphManager()
+        self.graph_manager.update_graph(self.snapshots[-1])
+        self.engine = HeuristicEngine(self.graph_manager)
+        self.pairs = self._route_pairs(seed)
+
+    def _route_pairs(self, seed: int):
+        rng = random.Random(seed)
+        nodes = [n.id for n in self.snapshots[-1].nodes]
+        pairs = []
+        for _ in range(ROUTE_PAIRS * 20):
+            src, dst = rng.sample(nodes, 2)
+            if self.graph_manager.is_connected(src, dst):
+                pairs.append((src, dst))
+            if len(pairs) == ROUTE_PAIRS:
+                break
+        return pairs
+
+
+class Benchmark:
+    def __init__(self, name: str, func: Callable[[BenchmarkContext], int], max_nodes: Optional[int] = None,
+                 setup: Optional[Callable[[BenchmarkContext], None]] = None):
+        self.name = name
+        self.func = func
+        self.max_nodes = max_nodes
+        # Runs once before timing, for state the benchmark needs but should not be charged for
+        self.setup = setup
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, max_nodes: Optional[int] = None, setup: Optional[Callable[[BenchmarkContext], None]] = None):
+    def register(func):
+        BENCHMARKS.append(Benchmark(name, func, max_nodes, setup))
+        return func
+    return register
+
+
+# Each benchmark returns the number of operations it timed, so results are per-op
+
+@benchmark("graph.update_graph")
+def bench_update_graph(ctx: BenchmarkContext) -> int:
+    graph_manager = GraphManager()
+    for snapshot in ctx.snapshots:
+        graph_manager.update_graph(snapshot)
+    return len(ctx.snapshots)
+
+
+def _algorithm_benchmark(algorithm: str, pair_limit: int):
+    def run(ctx: BenchmarkContext) -> int:
+        alg = ctx.engine.algorithms[algorithm]
+        pairs = ctx.pairs[:pair_limit]
+        for src, dst in pairs:
+            alg.find_route(src, dst)
+        return len(pairs)
+    return run
+
+
+benchmark("algorithm.dijkstra")(_algorithm_benchmark("dijkstra", ROUTE_PAIRS))
+# A* recomputes a hop-count BFS inside its heuristic, which is quadratic per query
+benchmark("algorithm.astar", max_nodes=1000)(_algorithm_benchmark("astar", 5))
+benchmark("algorithm.greedy")(_algorithm_benchmark("greedy", ROUTE_PAIRS))
+# Queries only; the hierarchy is built up front and timed separately by ch.build
+benchmark("algorithm.ch", setup=lambda ctx: ctx.engine.prepare_ch_index())(_algorithm_benchmark("ch", ROUTE_PAIRS))
+
+
+@benchmark("ch.build")
+def bench_ch_build(ctx: BenchmarkContext) -> int:
+    csr, edge_metrics = ctx.graph_manager.get_edge_metrics()
+    edge_weights = np.empty(csr.num_edges, dtype=np.float64)
+    edge_weights[csr.edge_ids] = csr.weights
+    ContractionHierarchy(csr.node_ids, csr.edge_endpoints).customized(edge_weights, edge_metrics, csr.version)
+    return 1
+
+
+@benchmark("ch.customize", setup=lambda ctx: ctx.engine.prepare_ch_index())
+def bench_ch_customize(ctx: BenchmarkContext) -> int:
+    # Same topology, fresh weights: what every metrics-only snapshot costs
+    hierarchy = ctx.engine.ch_index.hierarchy
+    rng = np.random.default_rng(len(hierarchy.edge_weights))
+    edge_weights = hierarchy.edge_weights * rng.uniform(0.5, 1.5, len(hierarchy.edge_weights))
+    hierarchy.customized(edge_weights, hierarchy.edge_metrics, hierarchy.version)
+    return 1
+
+
+@benchmark("engine.find_k_shortest_paths", max_nodes=10000)
+def bench_k_shortest(ctx: BenchmarkContext) -> int:
+    pairs = ctx.pairs[:5]
+    for src, dst in pairs:
+        ctx.engine.find_k_shortest_paths(src, dst, k=3)
+    return len(pairs)
+
+
+@benchmark("engine.find_backup_routes", max_nodes=10000)
+def bench_backup_routes(ctx: BenchmarkContext) -> int:
+    pairs = ctx.pairs[:5]
+    for src, dst in pairs:
+        primary = ctx.engine.dijkstra.find_route(src, dst)
+        ctx.engine.find_backup_routes(src, dst, primary.path if primary else [])
+    return len(pairs)
+
+
+@benchmark("stats.get_graph_stats", max_nodes=1000)
+def bench_graph_stats(ctx: BenchmarkContext) -> int:
+    ctx.graph_manager.get_graph_stats()
+    return 1
+
+
+@benchmark("stats.get_critical_nodes", max_nodes=10000)
+def bench_critical_nodes(ctx: BenchmarkContext) -> int:
+    ctx.graph_manager.get_critical_nodes(5)
+    return 1
+
+
+def _feed_stability(analyzer: StabilityAnalyzer, snapshot):
+    timestamp = datetime.datetime.fromisoformat(snapshot.timestamp.replace('Z', '+00:00'))
+    for node in snapshot.nodes:
+        analyzer.update_node_metrics(node.id, timestamp, {
+            'cpu_load': node.metrics.cpu_load,
+            'jitter_ms': node.metrics.jitter_ms,
+            'queue_len': float(node.metrics.queue_len),
+            'throughput_mbps': node.metrics.throughput_mbps
+        })
+    for link in snapshot.links:
+        analyzer.update_link_metrics(f"{link.src}_{link.dst}", timestamp, {
+            'delay_ms': link.metrics.delay_ms,
+            'jitter_ms': link.metrics.jitter_ms,
+            'loss_rate': link.metrics.loss_rate,
+            'bandwidth_mbps': link.metrics.bandwidth_mbps
+        })
+
+
+@benchmark("stability.update_metrics")
+def bench_stability_update(ctx: BenchmarkContext) -> int:
+    analyzer = StabilityAnalyzer()
+    for snapshot in ctx.snapshots:
+        _feed_stability(analyzer, snapshot)
+    return len(ctx.snapshots)
+
+
+@benchmark("stability.get_network_stability", max_nodes=10000)
+def bench_network_stability(ctx: BenchmarkContext) -> int:
+    if not hasattr(ctx, 'stability_analyzer'):
+        ctx.stability_analyzer = StabilityAnalyzer()
+        for snapshot in ctx.snapshots:
+            _feed_stability(ctx.stability_analyzer, snapshot)
+    ctx.stability_analyzer.get_network_stability()
+    return 1
+
+
+def run_benchmark(bench: Benchmark, ctx: BenchmarkContext, repeats: int) -> Dict:
+    if bench.setup is not None:
+        bench.setup(ctx)
+    samples = []
+    ops = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        ops = bench.func(ctx)
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed * 1000.0 / max(1, ops))
+
+    return {
+        'name': bench.name,
+        'nodes': ctx.node_count,
+        'links': len(ctx.snapshots[-1].links),
+        'ops_per_repeat': ops,
+        'repeats': repeats,
+        'min_ms': min(samples),
+        'median_ms': statistics.median(samples),
+        'mean_ms': statistics.fmean(samples),
+        'max_ms': max(samples)
+    }
+
+
+def compare(results: Dict, baseline_path: str, threshold: float) -> int:
+    with open(baseline_path) as f:
+        baseline = json.load(f)['results']
+
+    regressions = 0
+    print(f"\n{'benchmark':<42} {'base ms':>10} {'new ms':>10} {'ratio':>7}")
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        ratio = result['median_ms'] / base['median_ms'] if base['median_ms'] else float('inf')
+        marker = ''
+        if ratio > 1.0 + threshold:
+            marker = '  SLOWER'
+            regressions += 1
+        elif ratio < 1.0 - threshold:
+            marker = '  faster'
+        print(f"{key:<42} {base['median_ms']:>10.3f} {result['median_ms']:>10.3f} {ratio:>7.2f}{marker}")
+    return regressions
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=ROOT, stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="SAGSIN heuristic benchmark suite")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help="comma-separated node counts")
+    parser.add_argument('--filter', default='', help="only run benchmarks whose name contains one of these (comma-separated)")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--churn', type=float, default=0.02, help="fraction of links changed per snapshot")
+    parser.add_argument('--output', help="write JSON results to this file")
+    parser.add_argument('--compare', help="baseline JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10, help="relative change reported as a regression")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    filters = args.filter.split(',')
+    results: Dict[str, Dict] = {}
+
+    for size in sizes:
+        selected = [b for b in BENCHMARKS if any(f in b.name for f in filters) and (b.max_nodes is None or size <= b.max_nodes)]
+        if not selected:
+            continue
+
+        print(f"# {size} nodes: generating topology", flush=True)
+        ctx = BenchmarkContext(size, args.seed, args.churn)
+        for bench in selected:
+            result = run_benchmark(bench, ctx, args.repeats)
+            results[f"{bench.name}@{size}"] = result
+            print(f"{bench.name:<36} {size:>7} nodes  median {result['median_ms']:10.3f} ms/op", flush=True)
+
+        ch, dijkstra = results.get(f"algorithm.ch@{size}"), results.get(f"algorithm.dijkstra@{size}")
+        if ch and dijkstra and ch['median_ms']:
+            ch['speedup_vs_dijkstra'] = dijkstra['median_ms'] / ch['median_ms']
+            print(f"{'ch query speedup over dijkstra':<36} {size:>7} nodes  {ch['speedup_vs_dijkstra']:10.1f}x", flush=True)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'churn': args.churn,
+            'repeats': args.repeats
+        },
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+import argparse
+import asyncio
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import grpc
+
+from proto import admin_pb2, admin_pb2_grpc, heuristic_pb2, heuristic_pb2_grpc
+from benchmarks.load_test import free_port
+from benchmarks.topology import TopologyGenerator
+
+MILESTONES = ['port_bound', 'health_ok', 'first_update', 'serving', 'first_route']
+POLL_INTERVAL_S = 0.005
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+
+
+def port_open(port: int) -> bool:
+    with socket.socket() as sock:
+        sock.settimeout(POLL_INTERVAL_S)
+        return sock.connect_ex(('127.0.0.1', port)) == 0
+
+
+async def measure_once(snapshot: heuristic_pb2.GraphSnapshot, src: str, dst: str,
+                       timeout_s: float) -> Tuple[Dict[str, float], str]:
+    port = free_port()
+    env = dict(os.environ, HEURISTIC_LISTEN=f"127.0.0.1:{port}")
+    env.pop("HEURISTIC_CHECKPOINT_DIR", None)
+    stderr = tempfile.TemporaryFile(mode="w+")
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-X', 'importtime', '-m', 'app.main'],
+                               cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=stderr)
+    times: Dict[str, float] = {}
+    channel = None
+    try:
+        deadline = start + timeout_s
+        while not port_open(port):
+            if process.poll() is not None or time.perf_counter() > deadline:
+                raise RuntimeError("server did not bind its port")
+            await asyncio.sleep(POLL_INTERVAL_S)
+        times['port_bound'] = time.perf_counter() - start
+
+        channel = grpc.aio.insecure_channel(f"127.0.0.1:{port}")
+        admin = admin_pb2_grpc.AdminServiceStub(channel)
+        stub = heuristic_pb2_grpc.HeuristicServiceStub(channel)
+
+        health = await admin.CheckHealth(admin_pb2.HealthRequest(), wait_for_ready=True, timeout=timeout_s)
+        times['health_ok'] = time.perf_counter() - start
+        times['reported_startup'] = health.startup_s
+
+        response = await stub.UpdateGraph(snapshot, timeout=timeout_s)
+        if not response.success:
+            raise RuntimeError(f"UpdateGraph failed: {response.message}")
+        times['first_update'] = time.perf_counter() - start
+
+        health = await admin.CheckHealth(admin_pb2.HealthRequest(), timeout=timeout_s)
+        if health.status != "SERVING":
+            raise RuntimeError(f"unexpected health status {health.status}")
+        times['serving'] = time.perf_counter() - start
+
+        await stub.RequestRoute(heuristic_pb2.RouteRequest(
+            source_node_id=src, destination_node_id=dst, algorithm='astar'), timeout=timeout_s)
+        times['first_route'] = time.perf_counter() - start
+    finally:
+        if channel is not None:
+            await channel.close()
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        stderr.seek(0)
+        log = stderr.read()
+        stderr.close()
+    return times, log
+
+
+def import_breakdown(log: str, top: int) -> Dict[str, List]:
+    # -X importtime prints one line per module: self us | cumulative us | indented name
+    packages: Dict[str, int] = {}
+    modules: List[Tuple[int, str]] = []
+    for line in log.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = int(match.group(1)), int(match.group(2)), match.group(3), match.group(4)
+        modules.append((self_us, name))
+        if len(indent) == 1:
+            # Top-level import: its cumulative time covers everything it pulled in
+            package = name.split('.')[0]
+            packages[package] = packages.get(package, 0) + cumulative_us
+    return {
+        'packages': sorted(((p, us / 1000.0) for p, us in packages.items()), key=lambda item: item[1], reverse=True)[:top],
+        'modules': [(name, us / 1000.0) for us, name in sorted(modules, reverse=True)[:top]]
+    }
+
+
+async def run(args) -> Dict:
+    generator = TopologyGenerator(args.seed)
+    state = generator.generate(args.nodes)
+    snapshot = generator.to_snapshot(state)
+    node_ids = [n.id for n in snapshot.nodes]
+    src, dst = node_ids[0], node_ids[-1]
+
+    runs: List[Dict[str, float]] = []
+    log = ""
+    for _ in range(args.runs):
+        times, log = await measure_once(snapshot, src, dst, args.timeout)
+        runs.append(times)
+
+    milestones = {}
+    for name in MILESTONES + ['reported_startup']:
+        values = [r[name] * 1000.0 for r in runs]
+        milestones[name] = {'median_ms': statistics.median(values), 'min_ms': min(values), 'max_ms': max(values)}
+
+    return {
+        'config': {'runs': args.runs, 'nodes': len(snapshot.nodes), 'links': len(snapshot.links)},
+        'milestones': milestones,
+        # From the last run; prefetched (deferred) imports show up here too
+        'imports': import_breakdown(log, args.top)
+    }
+
+
+def print_report(report: Dict):
+    config = report['config']
+    print(f"# cold start over {config['runs']} runs, first snapshot {config['nodes']} nodes / {config['links']} links")
+    print(f"{'milestone':<18} {'median ms':>10} {'min ms':>9} {'max ms':>9}")
+    for name, stats in report['milestones'].items():
+        print(f"{name:<18} {stats['median_ms']:>10.1f} {stats['min_ms']:>9.1f} {stats['max_ms']:>9.1f}")
+    print()
+    print(f"{'package (cumulative)':<40} {'ms':>8}")
+    for name, ms in report['imports']['packages']:
+        print(f"{name:<40} {ms:>8.1f}")
+    print()
+    print(f"{'module (self)':<40} {'ms':>8}")
+    for name, ms in report['imports']['modules']:
+        print(f"{name:<40} {ms:>8.1f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Cold-start benchmark: process launch to first served route")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--nodes', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--top', type=int, default=15, help="rows in the import-time breakdown")
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--output', help="write JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+import math
+import random
+import datetime
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+
+from proto import heuristic_pb2
+
+# Node mix roughly follows a SAGSIN deployment: a LEO constellation carrying
+# most of the traffic, a thin ground segment and a long tail of mobile nodes.
+NODE_MIX = {
+    'satellite': 0.35,
+    'ground_station': 0.05,
+    'ship': 0.10,
+    'drone': 0.20,
+    'mobile_device': 0.30
+}
+
+# (delay_ms, jitter_ms, loss_rate, bandwidth_mbps) centre values per link class
+LINK_PROFILES = {
+    ('satellite', 'satellite'): (12.0, 1.0, 0.001, 800.0),
+    ('ground_station', 'satellite'): (25.0, 2.0, 0.002, 500.0),
+    ('satellite', 'ship'): (30.0, 4.0, 0.010, 50.0),
+    ('drone', 'satellite'): (28.0, 5.0, 0.015, 30.0),
+    ('drone', 'ground_station'): (5.0, 1.5, 0.005, 150.0),
+    ('drone', 'drone'): (3.0, 2.0, 0.010, 80.0),
+    ('drone', 'ship'): (6.0, 2.5, 0.012, 40.0),
+    ('ground_station', 'mobile_device'): (8.0, 3.0, 0.020, 40.0),
+    ('drone', 'mobile_device'): (4.0, 3.5, 0.025, 20.0),
+    ('ground_station', 'ground_station'): (2.0, 0.2, 0.0005, 10000.0),
+}
+
+
+@dataclass
+class TopologyState:
+    nodes: Dict[str, str] = field(default_factory=dict)
+    positions: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    links: Dict[Tuple[str, str], bool] = field(default_factory=dict)
+    adjacency: Dict[str, Set[Tuple[str, str]]] = field(default_factory=dict)
+    by_type: Dict[str, List[str]] = field(default_factory=dict)
+    timestamp: datetime.datetime = field(default_factory=lambda: datetime.datetime(2025, 1, 1))
+    next_id: int = 0
+
+
+class TopologyGenerator:
+    def __init__(self, seed: int = 42, push_interval_s: float = 4.0):
+        self.seed = seed
+        self.push_interval_s = push_interval_s
+        self.rng = random.Random(seed)
+
+    def generate(self, node_count: int) -> TopologyState:
+        state = TopologyState()
+        counts = self._type_counts(node_count)
+
+        self._add_constellation(state, counts['satellite'])
+        for node_type in ('ground_station', 'ship', 'drone', 'mobile_device'):
+            for _ in range(counts[node_type]):
+                self._add_surface_node(state, node_type)
+
+        self._connect_ground_segment(state)
+        return state
+
+    def churn(self, state: TopologyState, rate: float = 0.02) -> TopologyState:
+        rng = self.rng
+        state.timestamp += datetime.timedelta(seconds=self.push_interval_s)
+        satellites = state.by_type.get('satellite', [])
+
+        for key in list(state.links):
+            if rng.random() >= rate:
+                continue
+            a, b = key
+            a_type, b_type = state.nodes[a], state.nodes[b]
+
+            if a_type == 'satellite' and b_type == 'satellite':
+                # Inter-satellite links flap as planes cross
+                if rng.random() < 0.3:
+                    state.links[key] = not state.links[key]
+            elif 'satellite' in (a_type, b_type):
+                # Satellites move on: the surface end hands over to another satellite
+                surface = b if a_type == 'satellite' else a
+                self._unlink(state, key)
+                self._link(state, surface, rng.choice(satellites))
+            else:
+                state.links[key] = rng.random() > 0.1
+
+        # Drones and mobile devices leave the topology and new ones join
+        mobile = state.by_type.get('drone', []) + state.by_type.get('mobile_device', [])
+        for node_id in mobile:
+            if rng.random() < rate / 2:
+                self._remove_node(state, node_id)
+                node_type = rng.choice(('drone', 'mobile_device'))
+                self._attach(state, self._add_surface_node(state, node_type), node_type)
+        return state
+
+    def to_snapshot(self, state: TopologyState) -> heuristic_pb2.GraphSnapshot:
+        # Metrics are a pure function of seed and time so reruns produce identical snapshots
+        rng = random.Random(f"{self.seed}-{state.timestamp.isoformat()}")
+        snapshot = heuristic_pb2.GraphSnapshot(timestamp=state.timestamp.isoformat() + 'Z')
+
+        for node_id, node_type in state.nodes.items():
+            loaded = node_type in ('ground_station', 'satellite')
+            snapshot.nodes.add(
+                id=node_id,
+                type=node_type,
+                status='UP' if rng.random() > 0.01 else 'DOWN',
+                metrics=heuristic_pb2.NodeMetric(
+                    cpu_load=min(1.0, rng.betavariate(2, 5) * (1.5 if loaded else 1.0)),
+                    jitter_ms=rng.expovariate(1.0),
+                    queue_len=rng.randint(0, 20 if loaded else 5),
+                    throughput_mbps=rng.uniform(10.0, 1000.0 if loaded else 100.0)
+                )
+            )
+
+        for (a, b), available in state.links.items():
+            profile = LINK_PROFILES.get(tuple(sorted((state.nodes[a], state.nodes[b]))), (20.0, 3.0, 0.01, 50.0))
+            delay, jitter, loss, bandwidth = profile
+            snapshot.links.add(
+                src=a,
+                dst=b,
+                available=available,
+                metrics=heuristic_pb2.LinkMetric(
+                    delay_ms=max(0.1, rng.gauss(delay, delay * 0.15)),
+                    jitter_ms=max(0.0, rng.gauss(jitter, jitter * 0.3)),
+                    loss_rate=min(1.0, max(0.0, rng.gauss(loss, loss * 0.5))),
+                    bandwidth_mbps=max(1.0, rng.gauss(bandwidth, bandwidth * 0.2))
+                )
+            )
+        return snapshot
+
+    def snapshots(self, node_count: int, count: int, churn_rate: float = 0.02) -> List[heuristic_pb2.GraphSnapshot]:
+        state = self.generate(node_count)
+        result = [self.to_snapshot(state)]
+        for _ in range(count - 1):
+            state = self.churn(state, churn_rate)
+            result.append(self.to_snapshot(state))
+        return result
+
+    def _type_counts(self, node_count: int) -> Dict[str, int]:
+        counts = {t: max(1, int(node_count * share)) for t, share in NODE_MIX.items()}
+        counts['satellite'] += node_count - sum(counts.values())
+        return counts
+
+    def _add_constellation(self, state: TopologyState, count: int):
+        # Walker-style shells: planes of satellites with intra-plane rings and cross-plane links
+        planes = max(1, int(math.sqrt(count / 2)))
+        per_plane = max(1, count // planes)
+        grid: List[List[str]] = []
+        remaining = count
+        for p in range(planes):
+            plane = []
+            size = per_plane if p < planes - 1 else remaining
+            for s in range(size):
+                node_id = self._new_node(state, 'satellite')
+                state.positions[node_id] = ((360.0 * p / planes) % 360.0, 360.0 * s / max(1, size))
+                plane.append(node_id)
+            remaining -= size
+            grid.append(plane)
+
+        for p, plane in enumerate(grid):
+            for s, node_id in enumerate(plane):
+                if len(plane) > 1:
+                    self._link(state, node_id, plane[(s + 1) % len(plane)])
+                neighbour_plane = grid[(p + 1) % len(grid)]
+                if neighbour_plane is not plane and neighbour_plane:
+                    self._link(state, node_id, neighbour_plane[s % len(neighbour_plane)])
+
+    def _add_surface_node(self, state: TopologyState, node_type: str) -> str:
+        node_id = self._new_node(state, node_type)
+        state.positions[node_id] = (self.rng.uniform(0, 360), self.rng.uniform(0, 360))
+        return node_id
+
+    def _connect_ground_segment(self, state: TopologyState):
+        for node_id, node_type in list(state.nodes.items()):
+            if node_type != 'satellite':
+                self._attach(state, node_id, node_type)
+
+        stations = [n for n, t in state.nodes.items() if t == 'ground_station']
+        for a, b in zip(stations, stations[1:]):
+            if self.rng.random() < 0.5:
+                self._link(state, a, b)
+
+    def _attach(self, state: TopologyState, node_id: str, node_type: str):
+        targets = {
+            'ground_station': [('satellite', 3)],
+            'ship': [('satellite', 1), ('drone', 1)],
+            'drone': [('ground_station', 1), ('drone', 2), ('satellite', 1)],
+            'mobile_device': [('drone', 1), ('ground_station', 1)]
+        }.get(node_type, [])
+
+        for target_type, count in targets:
+            for other in self._nearest(state, node_id, state.by_type.get(target_type, []), count):
+                self._link(state, node_id, other)
+
+    def _nearest(self, state: TopologyState, node_id: str, candidates: List[str], count: int) -> List[str]:
+        # Sample before ranking so attachment stays linear on 100k-node topologies
+        sample = list(candidates) if len(candidates) <= 64 else self.rng.sample(candidates, 64)
+        sample = [n for n in sample if n != node_id]
+        x, y = state.positions[node_id]
+        sample.sort(key=lambda n: (state.positions[n][0] - x) ** 2 + (state.positions[n][1] - y) ** 2)
+        return sample[:count]
+
+    def _new_node(self, state: TopologyState, node_type: str) -> str:
+        node_id = f"{node_type}-{state.next_id}"
+        state.next_id += 1
+        state.nodes[node_id] = node_type
+        state.adjacency[node_id] = set()
+        state.by_type.setdefault(node_type, []).append(node_id)
+        return node_id
+
+    def _remove_node(self, state: TopologyState, node_id: str):
+        node_type = state.nodes.pop(node_id, None)
+        if node_type is None:
+            return
+        state.positions.pop(node_id, None)
+        state.by_type[node_type].remove(node_id)
+        for key in list(state.adjacency.get(node_id, ())):
+            self._unlink(state, key)
+        state.adjacency.pop(node_id, None)
+
+    @staticmethod
+    def _link(state: TopologyState, a: str, b: str, available: bool = True):
+        if a == b:
+            return
+        key = (a, b) if a < b else (b, a)
+        state.links[key] = available
+        state.adjacency[a].add(key)
+        state.adjacency[b].add(key)
+
+    @staticmethod
+    def _unlink(state: TopologyState, key: Tuple[str, str]):
+        state.links.pop(key, None)
+        for node_id in key:
+            if node_id in state.adjacency:
+                state.adjacency[node_id].discard(key)
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: admin.proto
+# Protobuf Python Version: 6.31.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    6,
+    31,
+    1,
+    '',
+    'admin.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0b\x61\x64min.proto\x12\theuristic\"\x8a\x01\n\x0eProfileRequest\x12\x0c\n\x04mode\x18\x01 \x01(\t\x12\x12\n\nduration_s\x18\x02 \x01(\x01\x12\x15\n\rrequest_count\x18\x03 \x01(\r\x12\x14\n\x0ctrace_memory\x18\x04 \x01(\x08\x12\r\n\x05top_n\x18\x05 \x01(\r\x12\x1a\n\x12sample_interval_ms\x18\x06 \x01(\x01\"\x9e\x01\n\x0fProfileResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x0c\n\x04mode\x18\x03 \x01(\t\x12\x12\n\nduration_s\x18\x04 \x01(\x01\x12\x15\n\rrequests_seen\x18\x05 \x01(\r\x12\x0f\n\x07samples\x18\x06 \x01(\x04\x12\x0f\n\x07profile\x18\x07 \x01(\t\x12\x0e\n\x06memory\x18\x08 \x01(\t\"\x0f\n\rHealthRequest\"\\\n\x0eHealthResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x15\n\rgraph_version\x18\x02 \x01(\x04\x12\x10\n\x08uptime_s\x18\x03 \x01(\x01\x12\x11\n\tstartup_s\x18\x04 \x01(\x01\x32\x9b\x01\n\x0c\x41\x64minService\x12G\n\x0e\x43\x61ptureProfile\x12\x19.heuristic.ProfileRequest\x1a\x1a.heuristic.ProfileResponse\x12\x42\n\x0b\x43heckHealth\x12\x18.heuristic.HealthRequest\x1a\x19.heuristic.HealthResponseb\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'admin_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_PROFILEREQUEST']._serialized_start=27
+  _globals['_PROFILEREQUEST']._serialized_end=165
+  _globals['_PROFILERESPONSE']._serialized_start=168
+  _globals['_PROFILERESPONSE']._serialized_end=326
+  _globals['_HEALTHREQUEST']._serialized_start=328
+  _globals['_HEALTHREQUEST']._serialized_end=343
+  _globals['_HEALTHRESPONSE']._serialized_start=345
+  _globals['_HEALTHRESPONSE']._serialized_end=437
+  _globals['_ADMINSERVICE']._serialized_start=440
+  _globals['_ADMINSERVICE']._serialized_end=595
+# @@protoc_insertion_point(module_scope)
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0fheuristic.proto\x12\theuristic\"]\n\nNodeMetric\x12\x10\n\x08\x63pu_load\x18\x01 \x01(\x01\x12\x11\n\tjitter_ms\x18\x02 \x01(\x01\x12\x11\n\tqueue_len\x18\x03 \x01(\x05\x12\x17\n\x0fthroughput_mbps\x18\x04 \x01(\x01\"X\n\x04Node\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x0e\n\x06status\x18\x03 \x01(\t\x12&\n\x07metrics\x18\x04 \x01(\x0b\x32\x15.heuristic.NodeMetric\"\\\n\nLinkMetric\x12\x10\n\x08\x64\x65lay_ms\x18\x01 \x01(\x01\x12\x11\n\tjitter_ms\x18\x02 \x01(\x01\x12\x11\n\tloss_rate\x18\x03 \x01(\x01\x12\x16\n\x0e\x62\x61ndwidth_mbps\x18\x04 \x01(\x01\"[\n\x04Link\x12\x0b\n\x03src\x18\x01 \x01(\t\x12\x0b\n\x03\x64st\x18\x02 \x01(\t\x12\x11\n\tavailable\x18\x03 \x01(\x08\x12&\n\x07metrics\x18\x04 \x01(\x0b\x32\x15.heuristic.LinkMetric\"b\n\rGraphSnapshot\x12\x11\n\ttimestamp\x18\x01 \x01(\t\x12\x1e\n\x05nodes\x18\x02 \x03(\x0b\x32\x0f.heuristic.Node\x12\x1e\n\x05links\x18\x03 \x03(\x0b\x32\x0f.heuristic.Link\"2\n\x0eUpdateResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t2V\n\x10HeuristicService\x12\x42\n\x0bUpdateGraph\x12\x18.heuristic.GraphSnapshot\x1a\x19.heuristic.UpdateResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0fheuristic.proto\x12\theuristic\"]\n\nNodeMetric\x12\x10\n\x08\x63pu_load\x18\x01 \x01(\x01\x12\x11\n\tjitter_ms\x18\x02 \x01(\x01\x12\x11\n\tqueue_len\x18\x03 \x01(\x05\x12\x17\n\x0fthroughput_mbps\x18\x04 \x01(\x01\"X\n\x04Node\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x0e\n\x06status\x18\x03 \x01(\t\x12&\n\x07metrics\x18\x04 \x01(\x0b\x32\x15.heuristic.NodeMetric\"\\\n\nLinkMetric\x12\x10\n\x08\x64\x65lay_ms\x18\x01 \x01(\x01\x12\x11\n\tjitter_ms\x18\x02 \x01(\x01\x12\x11\n\tloss_rate\x18\x03 \x01(\x01\x12\x16\n\x0e\x62\x61ndwidth_mbps\x18\x04 \x01(\x01\"[\n\x04Link\x12\x0b\n\x03src\x18\x01 \x01(\t\x12\x0b\n\x03\x64st\x18\x02 \x01(\t\x12\x11\n\tavailable\x18\x03 \x01(\x08\x12&\n\x07metrics\x18\x04 \x01(\x0b\x32\x15.heuristic.LinkMetric\"b\n\rGraphSnapshot\x12\x11\n\ttimestamp\x18\x01 \x01(\t\x12\x1e\n\x05nodes\x18\x02 \x03(\x0b\x32\x0f.heuristic.Node\x12\x1e\n\x05links\x18\x03 \x03(\x0b\x32\x0f.heuristic.Link\"2\n\x0eUpdateResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"\xb2\x01\n\x0cRouteRequest\x12\x16\n\x0esource_node_id\x18\x01 \x01(\t\x12\x1b\n\x13\x64\x65stination_node_id\x18\x02 \x01(\t\x12\x11\n\talgorithm\x18\x03 \x01(\t\x12\x14\n\x0cmax_delay_ms\x18\x04 \x01(\x01\x12\x1a\n\x12min_bandwidth_mbps\x18\x05 \x01(\x01\x12\x10\n\x08max_hops\x18\x06 \x01(\r\x12\x16\n\x0eweight_profile\x18\x07 \x01(\t\"\xea\x01\n\rRouteResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x0c\n\x04path\x18\x03 \x03(\t\x12\x14\n\x0ctotal_weight\x18\x04 \x01(\x01\x12\x16\n\x0etotal_delay_ms\x18\x05 \x01(\x01\x12\x17\n\x0fstability_score\x18\x06 \x01(\x01\x12\x11\n\thop_count\x18\x07 \x01(\x05\x12\x1a\n\x12min_bandwidth_mbps\x18\x08 \x01(\x01\x12\x1b\n\x13suboptimality_bound\x18\t \x01(\x01\x12\x16\n\x0elink_stability\x18\n \x01(\x01\"A\n\x16\x46orwardingTableRequest\x12\x15\n\rsince_version\x18\x01 \x01(\x04\x12\x10\n\x08node_ids\x18\x02 \x03(\t\"F\n\x0f\x46orwardingEntry\x12\x13\n\x0b\x64\x65stination\x18\x01 \x01(\t\x12\x10\n\x08next_hop\x18\x02 \x01(\t\x12\x0c\n\x04\x63ost\x18\x03 \x01(\x01\"c\n\x12\x46orwardingTableRow\x12\x0f\n\x07node_id\x18\x01 \x01(\t\x12+\n\x07\x65ntries\x18\x02 \x03(\x0b\x32\x1a.heuristic.ForwardingEntry\x12\x0f\n\x07removed\x18\x03 \x01(\x08\"y\n\x15\x46orwardingTableUpdate\x12\x0f\n\x07version\x18\x01 \x01(\x04\x12\x14\n\x0c\x62\x61se_version\x18\x02 \x01(\x04\x12\x0c\n\x04\x66ull\x18\x03 \x01(\x08\x12+\n\x04rows\x18\x04 \x03(\x0b\x32\x1d.heuristic.ForwardingTableRow\"%\n\x14\x43riticalNodesRequest\x12\r\n\x05top_n\x18\x01 \x01(\r\"f\n\x0c\x43riticalNode\x12\x0f\n\x07node_id\x18\x01 \x01(\t\x12\r\n\x05score\x18\x02 \x01(\x01\x12\x0e\n\x06\x64\x65gree\x18\x03 \x01(\x01\x12\x13\n\x0b\x62\x65tweenness\x18\x04 \x01(\x01\x12\x11\n\tcloseness\x18\x05 \x01(\x01\"P\n\x15\x43riticalNodesResponse\x12\x0f\n\x07version\x18\x01 \x01(\x04\x12&\n\x05nodes\x18\x02 \x03(\x0b\x32\x17.heuristic.CriticalNode2\x98\x03\n\x10HeuristicService\x12\x42\n\x0bUpdateGraph\x12\x18.heuristic.GraphSnapshot\x1a\x19.heuristic.UpdateResponse\x12\x41\n\x0cRequestRoute\x12\x17.heuristic.RouteRequest\x1a\x18.heuristic.RouteResponse\x12\x45\n\x0eSubscribeRoute\x12\x17.heuristic.RouteRequest\x1a\x18.heuristic.RouteResponse0\x01\x12_\n\x16StreamForwardingTables\x12!.heuristic.ForwardingTableRequest\x1a .heuristic.ForwardingTableUpdate0\x01\x12U\n\x10GetCriticalNodes\x12\x1f.heuristic.CriticalNodesRequest\x1a .heuristic.CriticalNodesResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -43,6 +43,24 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_GRAPHSNAPSHOT']._serialized_end=500
   _globals['_UPDATERESPONSE']._serialized_start=502
   _globals['_UPDATERESPONSE']._serialized_end=552
-  _globals['_HEURISTICSERVICE']._serialized_start=554
-  _globals['_HEURISTICSERVICE']._serialized_end=640
+  _globals['_ROUTEREQUEST']._serialized_start=555
+  _globals['_ROUTEREQUEST']._serialized_end=733
+  _globals['_ROUTERESPONSE']._serialized_start=736
+  _globals['_ROUTERESPONSE']._serialized_end=970
+  _globals['_FORWARDINGTABLEREQUEST']._serialized_start=972
+  _globals['_FORWARDINGTABLEREQUEST']._serialized_end=1037
+  _globals['_FORWARDINGENTRY']._serialized_start=1039
+  _globals['_FORWARDINGENTRY']._serialized_end=1109
+  _globals['_FORWARDINGTABLEROW']._serialized_start=1111
+  _globals['_FORWARDINGTABLEROW']._serialized_end=1210
+  _globals['_FORWARDINGTABLEUPDATE']._serialized_start=1212
+  _globals['_FORWARDINGTABLEUPDATE']._serialized_end=1333
+  _globals['_CRITICALNODESREQUEST']._serialized_start=1335
+  _globals['_CRITICALNODESREQUEST']._serialized_end=1372
+  _globals['_CRITICALNODE']._serialized_start=1374
+  _globals['_CRITICALNODE']._serialized_end=1476
+  _globals['_CRITICALNODESRESPONSE']._serialized_start=1478
+  _globals['_CRITICALNODESRESPONSE']._serialized_end=1558
+  _globals['_HEURISTICSERVICE']._serialized_start=1561
+  _globals['_HEURISTICSERVICE']._serialized_end=1969
 # @@protoc_insertion_point(module_scope)
@@ -39,6 +39,26 @@ class HeuristicServiceStub(object):
                 request_serializer=heuristic__pb2.GraphSnapshot.SerializeToString,
                 response_deserializer=heuristic__pb2.UpdateResponse.FromString,
                 _registered_method=True)
+        self.RequestRoute = channel.unary_unary(
+                '/heuristic.HeuristicService/RequestRoute',
+                request_serializer=heuristic__pb2.RouteRequest.SerializeToString,
+                response_deserializer=heuristic__pb2.RouteResponse.FromString,
+                _registered_method=True)
+        self.SubscribeRoute = channel.unary_stream(
+                '/heuristic.HeuristicService/SubscribeRoute',
+                request_serializer=heuristic__pb2.RouteRequest.SerializeToString,
+                response_deserializer=heuristic__pb2.RouteResponse.FromString,
+                _registered_method=True)
+        self.StreamForwardingTables = channel.unary_stream(
+                '/heuristic.HeuristicService/StreamForwardingTables',
+                request_serializer=heuristic__pb2.ForwardingTableRequest.SerializeToString,
+                response_deserializer=heuristic__pb2.ForwardingTableUpdate.FromString,
+                _registered_method=True)
+        self.GetCriticalNodes = channel.unary_unary(
+                '/heuristic.HeuristicService/GetCriticalNodes',
+                request_serializer=heuristic__pb2.CriticalNodesRequest.SerializeToString,
+                response_deserializer=heuristic__pb2.CriticalNodesResponse.FromString,
+                _registered_method=True)
 
 
 class HeuristicServiceServicer(object):
@@ -50,6 +70,30 @@ class HeuristicServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def RequestRoute(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SubscribeRoute(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamForwardingTables(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetCriticalNodes(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_HeuristicServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -58,6 +102,26 @@ def add_HeuristicServiceServicer_to_server(servicer, server):
                     request_deserializer=heuristic__pb2.GraphSnapshot.FromString,
                     response_serializer=heuristic__pb2.UpdateResponse.SerializeToString,
             ),
+            'RequestRoute': grpc.unary_unary_rpc_method_handler(
+                    servicer.RequestRoute,
+                    request_deserializer=heuristic__pb2.RouteRequest.FromString,
+                    response_serializer=heuristic__pb2.RouteResponse.SerializeToString,
+            ),
+            'SubscribeRoute': grpc.unary_stream_rpc_method_handler(
+                    servicer.SubscribeRoute,
+                    request_deserializer=heuristic__pb2.RouteRequest.FromString,
+                    response_serializer=heuristic__pb2.RouteResponse.SerializeToString,
+            ),
+            'StreamForwardingTables': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamForwardingTables,
+                    request_deserializer=heuristic__pb2.ForwardingTableRequest.FromString,
+                    response_serializer=heuristic__pb2.ForwardingTableUpdate.SerializeToString,
+            ),
+            'GetCriticalNodes': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetCriticalNodes,
+                    request_deserializer=heuristic__pb2.CriticalNodesRequest.FromString,
+                    response_serializer=heuristic__pb2.CriticalNodesResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'heuristic.HeuristicService', rpc_method_handlers)
@@ -95,3 +159,111 @@ class HeuristicService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def RequestRoute(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/heuristic.HeuristicService/RequestRoute',
+            heuristic__pb2.RouteRequest.SerializeToString,
+            heuristic__pb2.RouteResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SubscribeRoute(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/heuristic.HeuristicService/SubscribeRoute',
+            heuristic__pb2.RouteRequest.SerializeToString,
+            heuristic__pb2.RouteResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StreamForwardingTables(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/heuristic.HeuristicService/StreamForwardingTables',
+            heuristic__pb2.ForwardingTableRequest.SerializeToString,
+            heuristic__pb2.ForwardingTableUpdate.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetCriticalNodes(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/heuristic.HeuristicService/GetCriticalNodes',
+            heuristic__pb2.CriticalNodesRequest.SerializeToString,
+            heuristic__pb2.CriticalNodesResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)